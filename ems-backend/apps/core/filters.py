@@ -0,0 +1,12 @@
+import django_filters
+from .models import InviteCode
+
+
+class InviteCodeFilter(django_filters.FilterSet):
+    label = django_filters.CharFilter(field_name='label', lookup_expr='icontains')
+    created_from = django_filters.DateFilter(field_name='created_at', lookup_expr='date__gte')
+    created_to = django_filters.DateFilter(field_name='created_at', lookup_expr='date__lte')
+
+    class Meta:
+        model = InviteCode
+        fields = ['is_used', 'label', 'created_from', 'created_to']
@@ -0,0 +1,42 @@
+# Generated by Django 4.2 on 2026-10-19 11:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_feature_usage(apps, schema_editor):
+    Tenant = apps.get_model('core', 'Tenant')
+    FeatureUsage = apps.get_model('core', 'FeatureUsage')
+    counters = [
+        FeatureUsage(tenant_id=tenant_id, feature=feature, count=int(count or 0))
+        for tenant_id, usage in Tenant.objects.values_list('id', 'feature_usage')
+        for feature, count in (usage or {}).items()
+    ]
+    FeatureUsage.objects.bulk_create(counters, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_contactmessage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeatureUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('feature', models.CharField(max_length=50)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feature_counters', to='core.tenant')),
+            ],
+            options={
+                'unique_together': {('tenant', 'feature')},
+            },
+        ),
+        migrations.RunPython(copy_feature_usage, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='tenant',
+            name='feature_usage',
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2 on 2026-10-19 11:52
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_employee_count(apps, schema_editor):
+    Tenant = apps.get_model('core', 'Tenant')
+    tenants = list(Tenant.objects.annotate(
+        actual=Count('employee_profiles', filter=Q(employee_profiles__is_deleted=False))
+    ))
+    for tenant in tenants:
+        tenant.employee_count = tenant.actual
+    Tenant.objects.bulk_update(tenants, ['employee_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_featureusage'),
+        ('employees', '0005_alter_designation_title_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tenant',
+            name='employee_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_employee_count, migrations.RunPython.noop),
+    ]
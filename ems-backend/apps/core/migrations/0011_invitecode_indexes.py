@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-19 11:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_tenant_employee_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invitecode',
+            index=models.Index(fields=['is_used', '-created_at'], name='core_invite_is_used_78898c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invitecode',
+            index=models.Index(fields=['created_at'], name='core_invite_created_4f0ba5_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tenant',
+            name='employee_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
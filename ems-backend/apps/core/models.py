@@ -1,7 +1,12 @@
 from django.conf import settings
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
 import secrets
 
+from .tenancy import invalidate_tenant_cache
+
 
 class TimeStampedModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -30,7 +35,10 @@ class Tenant(TimeStampedModel, SoftDeleteModel):
     slug = models.SlugField(max_length=100, unique=True)
     is_active = models.BooleanField(default=True)
     subscription_tier = models.CharField(max_length=20, choices=SUBSCRIPTION_CHOICES, default='FREE')
-    feature_usage = models.JSONField(default=dict, blank=True)
+    # Denormalized count of non-deleted EmployeeProfiles, maintained by EmployeeProfile.save()
+    # and repaired nightly by apps.core.tasks.reconcile_employee_counts. Only ever written
+    # with F() updates; save() leaves it out so a stale instance cannot overwrite it.
+    employee_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ['name']
@@ -38,6 +46,41 @@ class Tenant(TimeStampedModel, SoftDeleteModel):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if {'name', 'slug'} <= set(field_names):
+            instance._loaded_identity = (instance.name, instance.slug)
+        return instance
+
+    def save(self, *args, **kwargs):
+        from apps.recruitment.utils import invalidate_public_job_feed
+        from .utils import invalidate_host_stats
+
+        if not self._state.adding and not args and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields if not f.primary_key and f.name != 'employee_count'
+            ]
+        super().save(*args, **kwargs)
+        invalidate_tenant_cache(self.pk)
+        invalidate_host_stats()
+        # The public job board is cached per slug; drop it under the old and new slug
+        loaded = getattr(self, '_loaded_identity', None)
+        if loaded is not None and loaded != (self.name, self.slug):
+            invalidate_public_job_feed(None, loaded[1], self.slug)
+        self._loaded_identity = (self.name, self.slug)
+
+    def delete(self, *args, **kwargs):
+        from apps.recruitment.utils import invalidate_public_job_feed
+        from .utils import invalidate_feature_usage, invalidate_host_stats
+
+        invalidate_tenant_cache(self.pk)
+        invalidate_feature_usage(self.pk)
+        result = super().delete(*args, **kwargs)
+        invalidate_host_stats()
+        invalidate_public_job_feed(None, self.slug)
+        return result
+
     @property
     def employee_limit(self):
         """Returns the maximum number of employees allowed for the current tier."""
@@ -52,8 +95,37 @@ class Tenant(TimeStampedModel, SoftDeleteModel):
     @property
     def current_employee_count(self):
         """Returns the number of active employees for this tenant."""
-        from apps.employees.models import EmployeeProfile
-        return EmployeeProfile.objects.filter(tenant=self, is_deleted=False).count()
+        return self.employee_count
+
+    @classmethod
+    def adjust_employee_count(cls, tenant_id, delta):
+        """Atomically shift a tenant's head-count by ``delta``, never dropping below zero."""
+        if not tenant_id or not delta:
+            return
+        cls.objects.filter(pk=tenant_id).update(employee_count=Greatest(F('employee_count') + delta, 0))
+        invalidate_tenant_cache(tenant_id)
+
+    @property
+    def feature_usage(self):
+        """Returns trial usage counts as a ``{feature: count}`` mapping."""
+        from .utils import get_feature_usage_counts
+        return dict(get_feature_usage_counts(self.pk))
+
+
+class FeatureUsage(models.Model):
+    """
+    Per-tenant trial usage counter for a gated feature.
+    Incremented in place with F() expressions so concurrent requests never lose updates.
+    """
+    tenant = models.ForeignKey('core.Tenant', on_delete=models.CASCADE, related_name='feature_counters')
+    feature = models.CharField(max_length=50)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('tenant', 'feature')
+
+    def __str__(self):
+        return f"{self.tenant_id}:{self.feature} = {self.count}"
 
 
 class Announcement(TimeStampedModel):
@@ -109,16 +181,33 @@ class InviteCode(TimeStampedModel):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_used', '-created_at']),
+            models.Index(fields=['created_at']),
+        ]
 
     def __str__(self):
         status = "Used" if self.is_used else "Available"
         return f"{self.code} [{status}]"
 
+    @staticmethod
+    def new_code():
+        return secrets.token_urlsafe(16)[:24]  # 24-char URL-safe string
+
     @classmethod
     def generate(cls, created_by=None, label=''):
         """Generate a new cryptographically secure invite code."""
-        code = secrets.token_urlsafe(16)[:24]  # 24-char URL-safe string
-        return cls.objects.create(code=code, label=label, created_by=created_by)
+        return cls.objects.create(code=cls.new_code(), label=label, created_by=created_by)
+
+    @classmethod
+    def generate_batch(cls, count, created_by=None, label=''):
+        """Generate ``count`` invite codes with a single bulk INSERT."""
+        codes = {cls.new_code() for _ in range(count)}
+        while len(codes) < count:
+            codes.add(cls.new_code())
+        return cls.objects.bulk_create(
+            [cls(code=code, label=label, created_by=created_by) for code in codes]
+        )
 
 
 class AuditLog(TimeStampedModel):
@@ -157,3 +246,36 @@ class ContactMessage(TimeStampedModel):
 
     def __str__(self):
         return f"Message from {self.name} ({self.email})"
+
+
+class EmailOutbox(TimeStampedModel):
+    """
+    Transactional email outbox. Rows are written in the same transaction as the
+    change they announce and sent later, in batches, by
+    apps.core.tasks.dispatch_email_outbox.
+    """
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('SENT', 'Sent'),
+        ('FAILED', 'Failed'),
+    ]
+
+    tenant = models.ForeignKey('core.Tenant', on_delete=models.SET_NULL, null=True, blank=True, related_name='outbox_emails')
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=255, blank=True)
+    recipients = models.JSONField(default=list)
+    # Queuing the same key twice sends one email
+    dedupe_key = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'next_attempt_at'], name='core_outbox_due_idx')]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.status})"
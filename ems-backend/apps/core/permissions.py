@@ -1,5 +1,8 @@
 from rest_framework.permissions import BasePermission
 
+from .tenancy import resolve_tenant
+from .utils import FEATURE_TRIAL_LIMIT, get_feature_usage
+
 
 class IsAdminOrHRManager(BasePermission):
     """Only ADMIN or HR_MANAGER roles can access"""
@@ -100,7 +103,7 @@ class HasBusinessTier(BasePermission):
         user = request.user
         if not (user and user.is_authenticated):
             return False
-        tenant = getattr(user, 'tenant', None)
+        tenant = resolve_tenant(request)
         if not tenant:
             return False
         
@@ -109,10 +112,9 @@ class HasBusinessTier(BasePermission):
             return True
             
         # Starter/Free tiers allow access IF they have trial uses left
-        usage = tenant.feature_usage or {}
         # We check the view's specific feature key (to be defined in the view)
         feature_key = getattr(view, 'feature_key', None)
-        if feature_key and usage.get(feature_key, 0) < 10:
+        if feature_key and get_feature_usage(tenant, feature_key) < FEATURE_TRIAL_LIMIT:
             return True
             
         return False
@@ -126,7 +128,7 @@ class HasEnterpriseTier(BasePermission):
         user = request.user
         if not (user and user.is_authenticated):
             return False
-        tenant = getattr(user, 'tenant', None)
+        tenant = resolve_tenant(request)
         if not tenant:
             return False
         
@@ -135,9 +137,8 @@ class HasEnterpriseTier(BasePermission):
             return True
             
         # Business/Starter tiers allow access IF they have trial uses left
-        usage = tenant.feature_usage or {}
         feature_key = getattr(view, 'feature_key', None)
-        if feature_key and usage.get(feature_key, 0) < 10:
+        if feature_key and get_feature_usage(tenant, feature_key) < FEATURE_TRIAL_LIMIT:
             return True
             
         return False
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Announcement, Tenant, AuditLog, ContactMessage
+from .models import Announcement, Tenant, AuditLog, ContactMessage, InviteCode
 
 
 class TenantSerializer(serializers.ModelSerializer):
@@ -8,6 +8,21 @@ class TenantSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'slug', 'is_active', 'subscription_tier', 'created_at']
         read_only_fields = ['id', 'slug', 'created_at']
 
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
+
+
+class InviteCodeSerializer(serializers.ModelSerializer):
+    used_by = serializers.CharField(source='used_by.name', read_only=True, default=None)
+
+    class Meta:
+        model = InviteCode
+        fields = ['id', 'code', 'label', 'is_used', 'used_by', 'used_at', 'created_at']
+        read_only_fields = fields
+
 
 class AnnouncementSerializer(serializers.ModelSerializer):
     created_by_name = serializers.SerializerMethodField()
@@ -31,3 +31,141 @@ def send_email_task(self, subject, message, recipient_list, from_email=None, htm
         logger.error(f"Error sending email: {exc}. Retrying...")
         # Retry with exponential backoff if possible, or simple retry
         raise self.retry(exc=exc)
+
+
+@shared_task
+def reconcile_employee_counts():
+    """
+    Periodic repair of the denormalized Tenant.employee_count.
+    Recounts active profiles for every tenant in one grouped query and rewrites
+    only the rows that have drifted (e.g. after queryset updates or hard deletes).
+    """
+    from django.db.models import Count, Q
+    from .models import Tenant
+    from .tenancy import invalidate_tenant_cache
+
+    tenants = Tenant.objects.annotate(
+        actual=Count('employee_profiles', filter=Q(employee_profiles__is_deleted=False))
+    ).only('id', 'employee_count')
+
+    drifted = []
+    for tenant in tenants:
+        if tenant.employee_count != tenant.actual:
+            tenant.employee_count = tenant.actual
+            drifted.append(tenant)
+
+    if drifted:
+        Tenant.objects.bulk_update(drifted, ['employee_count'], batch_size=500)
+        for tenant in drifted:
+            invalidate_tenant_cache(tenant.id)
+        logger.warning(f"Reconciled employee_count for {len(drifted)} tenants")
+    return f"Reconciled {len(drifted)} tenants"
+
+
+@shared_task
+def refresh_host_stats():
+    """Rebuild the cached super-admin dashboard snapshot."""
+    from .utils import refresh_host_stats_snapshot
+    stats = refresh_host_stats_snapshot()
+    return f"Host stats refreshed for {stats['total_tenants']} tenants"
+
+
+def _outbox_message(row):
+    from django.core.mail import EmailMultiAlternatives
+
+    message = EmailMultiAlternatives(
+        subject=row.subject,
+        body=row.body,
+        from_email=row.from_email or settings.DEFAULT_FROM_EMAIL,
+        to=row.recipients,
+    )
+    if row.html_body:
+        message.attach_alternative(row.html_body, 'text/html')
+    return message
+
+
+@shared_task
+def dispatch_email_outbox(batch_size=None, max_batches=50):
+    """
+    Drain the email outbox. Each batch of due row ids is read, then claimed by
+    primary key under SELECT ... FOR UPDATE SKIP LOCKED (and leased so
+    overlapping dispatchers skip it), then sent over one SMTP connection.
+    Failed rows are retried with exponential backoff until
+    EMAIL_OUTBOX_MAX_ATTEMPTS, then marked FAILED.
+    """
+    from datetime import timedelta
+    from django.core.mail import get_connection
+    from django.db import transaction
+    from django.db.models import Q
+    from django.utils import timezone
+    from .models import EmailOutbox
+
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    max_attempts = settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    sent_total = failed_total = 0
+
+    for _ in range(max_batches):
+        now = timezone.now()
+        due = EmailOutbox.objects.filter(status='PENDING', next_attempt_at__lte=now)
+        ids = list(due.order_by('next_attempt_at', 'id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+        with transaction.atomic():
+            # Locked by primary key: Oracle cannot combine FOR UPDATE with a LIMIT
+            batch = list(
+                due.select_for_update(skip_locked=True).filter(pk__in=ids).order_by('next_attempt_at', 'id')
+            )
+            if not batch:
+                break  # Another dispatcher holds these rows
+            EmailOutbox.objects.filter(pk__in=[row.pk for row in batch]).update(
+                next_attempt_at=now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS)
+            )
+
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+            connection_error = None
+        except Exception as exc:
+            connection_error = exc
+
+        for row in batch:
+            try:
+                if connection_error:
+                    raise connection_error
+                connection.send_messages([_outbox_message(row)])
+            except Exception as exc:
+                row.attempts += 1
+                row.last_error = str(exc)[:1000]
+                row.updated_at = timezone.now()
+                if row.attempts >= max_attempts:
+                    row.status = 'FAILED'
+                    failed_total += 1
+                else:
+                    row.next_attempt_at = timezone.now() + timedelta(seconds=60 * 2 ** (row.attempts - 1))
+            else:
+                row.status = 'SENT'
+                row.attempts += 1
+                row.sent_at = timezone.now()
+                row.last_error = ''
+                row.updated_at = row.sent_at
+                sent_total += 1
+        if not connection_error:
+            connection.close()
+
+        EmailOutbox.objects.bulk_update(
+            batch, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at', 'updated_at'],
+        )
+        if connection_error:
+            logger.error(f"Email outbox: SMTP connection failed, {len(batch)} emails deferred: {connection_error}")
+            break
+
+    # Finished rows may hold one-time credentials (welcome emails); keep them only briefly,
+    # whether they were sent or given up on
+    cutoff = timezone.now() - timedelta(days=settings.EMAIL_OUTBOX_RETENTION_DAYS)
+    EmailOutbox.objects.filter(
+        Q(status='SENT', sent_at__lt=cutoff) | Q(status='FAILED', updated_at__lt=cutoff)
+    ).delete()
+
+    if sent_total or failed_total:
+        logger.info(f"Email outbox: sent {sent_total}, gave up on {failed_total}")
+    return f"Sent {sent_total} outbox emails, {failed_total} failed permanently"
@@ -1,5 +1,54 @@
 from typing import Optional
 
+from django.conf import settings
+from django.core.cache import cache
+
+
+def tenant_cache_key(tenant_id) -> str:
+    return f'tenant:{tenant_id}'
+
+
+def get_cached_tenant(tenant_id) -> Optional[object]:
+    """
+    Return the Tenant with ``tenant_id`` from the shared cache, loading it from
+    the database on a miss. Entries live for TENANT_CACHE_TIMEOUT seconds and are
+    dropped whenever the tenant is saved or deleted.
+    """
+    if not tenant_id:
+        return None
+
+    key = tenant_cache_key(tenant_id)
+    tenant = cache.get(key)
+    if tenant is None:
+        from .models import Tenant
+        tenant = Tenant.objects.filter(pk=tenant_id).first()
+        if tenant is not None:
+            cache.set(key, tenant, getattr(settings, 'TENANT_CACHE_TIMEOUT', 60))
+    return tenant
+
+
+def invalidate_tenant_cache(tenant_id) -> None:
+    if tenant_id:
+        cache.delete(tenant_cache_key(tenant_id))
+
+
+def tenant_for_user(user) -> Optional[object]:
+    """
+    Resolve a user's tenant without a lazy FK load. The resolved object is stored
+    on the user so later ``user.tenant`` accesses reuse the same instance.
+    """
+    tenant_id = getattr(user, 'tenant_id', None)
+    if not tenant_id:
+        return None
+
+    if user._meta.get_field('tenant').is_cached(user):
+        return user.tenant
+
+    tenant = get_cached_tenant(tenant_id)
+    if tenant is not None:
+        user.tenant = tenant
+    return tenant
+
 
 def resolve_tenant(request) -> Optional[object]:
     """Resolve tenant from request context, falling back to authenticated user's tenant."""
@@ -9,7 +58,10 @@ def resolve_tenant(request) -> Optional[object]:
 
     user = getattr(request, 'user', None)
     if user and getattr(user, 'is_authenticated', False):
-        return getattr(user, 'tenant', None)
+        tenant = tenant_for_user(user)
+        # Memoize on the underlying HttpRequest so DRF views, permissions and
+        # middleware all share the object resolved for this request.
+        setattr(getattr(request, '_request', request), 'tenant', tenant)
+        return tenant
 
     return None
-
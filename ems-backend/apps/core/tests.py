@@ -60,3 +60,220 @@ class AnnouncementTests(APITestCase):
         response = self.client.get(self.announcement_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 1)
+
+
+class TenantResolutionTests(APITestCase):
+    def setUp(self):
+        from apps.core.models import Tenant
+        self.tenant = Tenant.objects.create(name='Acme', slug='acme', subscription_tier='STARTER')
+        self.user = User.objects.create_user(
+            email='owner@acme.com',
+            password='password123',
+            role='ADMIN',
+            tenant=self.tenant,
+        )
+
+    def test_resolve_tenant_is_memoized_per_request(self):
+        """The tenant is loaded once and shared by every consumer of the request"""
+        from django.test import RequestFactory
+        from apps.core.tenancy import resolve_tenant
+
+        request = RequestFactory().get('/')
+        request.user = User.objects.get(pk=self.user.pk)
+        first = resolve_tenant(request)
+        with self.assertNumQueries(0):
+            self.assertIs(resolve_tenant(request), first)
+            self.assertIs(request.user.tenant, first)
+
+    def test_tenant_save_invalidates_cache(self):
+        """Saving a tenant drops the cached copy"""
+        from apps.core.tenancy import get_cached_tenant
+
+        self.assertEqual(get_cached_tenant(self.tenant.id).subscription_tier, 'STARTER')
+        self.tenant.subscription_tier = 'BUSINESS'
+        self.tenant.save()
+        self.assertEqual(get_cached_tenant(self.tenant.id).subscription_tier, 'BUSINESS')
+
+    def test_stale_tenant_save_keeps_employee_count(self):
+        """A full save from a stale or cached instance does not overwrite the head-count"""
+        from apps.core.models import Tenant
+
+        stale = Tenant.objects.get(pk=self.tenant.pk)
+        Tenant.adjust_employee_count(self.tenant.pk, 3)
+        stale.subscription_tier = 'BUSINESS'
+        stale.save()
+
+        self.tenant.refresh_from_db()
+        self.assertEqual(self.tenant.employee_count, 3)
+        self.assertEqual(self.tenant.subscription_tier, 'BUSINESS')
+
+        host = User.objects.create_superuser(email='host@example.com', password='password123')
+        self.client.force_authenticate(user=host)
+        Tenant.adjust_employee_count(self.tenant.pk, 1)
+        response = self.client.patch(f'/api/core/host/tenants/{self.tenant.pk}/', {'is_active': False})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.tenant.refresh_from_db()
+        self.assertEqual(self.tenant.employee_count, 4)
+        self.assertFalse(self.tenant.is_active)
+
+    def test_increment_feature_usage_counts_atomically(self):
+        """Trial usage is tracked in the counter table, not on the tenant row"""
+        from django.test import RequestFactory
+        from apps.core.utils import get_feature_usage, increment_feature_usage
+
+        request = RequestFactory().post('/')
+        request.user = self.user
+        increment_feature_usage(request, 'ai_resumes')
+        increment_feature_usage(request, 'ai_resumes')
+        self.assertEqual(get_feature_usage(self.tenant, 'ai_resumes'), 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.tenant.feature_usage, {'ai_resumes': 2})
+
+        # An increment drops the cached counts
+        increment_feature_usage(request, 'ai_resumes')
+        self.assertEqual(get_feature_usage(self.tenant, 'ai_resumes'), 3)
+
+
+class HostStatsTests(APITestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        from apps.core.models import Tenant
+        cache.clear()
+        self.superuser = User.objects.create_superuser(email='host@example.com', password='password123')
+        for i in range(3):
+            tenant = Tenant.objects.create(name=f'Tenant {i}', slug=f'tenant-{i}')
+            User.objects.create_user(email=f'user{i}@example.com', password='password123', tenant=tenant)
+
+    def test_host_stats_query_count_is_constant(self):
+        """Dashboard stats do not issue per-tenant queries or create AISettings rows"""
+        from apps.recruitment.models import AISettings
+
+        self.client.force_authenticate(user=self.superuser)
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('host-stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_tenants'], 3)
+        self.assertEqual(response.data['recent_signups'][0]['user_count'], 1)
+        self.assertEqual(AISettings.objects.count(), 0)
+
+    def test_tenant_update_refreshes_host_stats(self):
+        """Suspending a tenant shows on the dashboard right away, not at the next snapshot refresh"""
+        from apps.core.models import Tenant
+
+        tenant = Tenant.objects.get(slug='tenant-0')
+        self.client.force_authenticate(user=self.superuser)
+        self.assertEqual(self.client.get(reverse('host-stats')).data['active_tenants'], 3)
+
+        response = self.client.patch(f'/api/core/host/tenants/{tenant.id}/', {'is_active': False})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(reverse('host-stats')).data['active_tenants'], 2)
+
+
+class HostInviteCodeTests(APITestCase):
+    def setUp(self):
+        self.superuser = User.objects.create_superuser(email='host@example.com', password='password123')
+        self.client.force_authenticate(user=self.superuser)
+        self.url = reverse('host-invite-codes-list')
+
+    def test_bulk_generate_and_filtered_listing(self):
+        """Codes are bulk-created and the listing is paginated and filterable"""
+        response = self.client.post(f'{self.url}bulk-generate/', {'count': 30, 'label': 'Spring campaign'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(set(response.data['codes'])), 30)
+
+        response = self.client.get(self.url, {'is_used': 'false', 'label': 'spring'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 30)
+        self.assertEqual(len(response.data['results']), 25)
+
+    def test_bulk_generate_rejects_out_of_range_count(self):
+        response = self.client.post(f'{self.url}bulk-generate/', {'count': 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class EmailOutboxTests(APITestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def test_queued_emails_are_deduplicated_and_sent_over_one_connection(self):
+        from unittest import mock
+        from django.core import mail
+        from django.core.mail import get_connection
+        from apps.core.models import EmailOutbox
+        from apps.core.tasks import dispatch_email_outbox
+        from ems_core.utils_email import send_email_in_background
+
+        with mock.patch('apps.core.tasks.dispatch_email_outbox.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                for n in range(3):
+                    send_email_in_background('Welcome', 'Hello', [f'user{n}@example.com'], dedupe_key=f'welcome:{n}')
+                send_email_in_background('Welcome', 'Hello again', ['user0@example.com'], dedupe_key='welcome:0')
+        delay.assert_called_once_with()
+        self.assertEqual(EmailOutbox.objects.count(), 3)
+
+        with mock.patch('django.core.mail.get_connection', wraps=get_connection) as connect:
+            dispatch_email_outbox(batch_size=10)
+        self.assertEqual(connect.call_count, 1)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['user0@example.com', 'user1@example.com', 'user2@example.com'])
+        self.assertEqual(set(EmailOutbox.objects.values_list('status', flat=True)), {'SENT'})
+
+    def test_queue_emails_skips_existing_and_racing_dedupe_keys(self):
+        """Dedupe works without bulk_create(ignore_conflicts), which Oracle lacks"""
+        from unittest import mock
+        from apps.core.models import EmailOutbox
+        from ems_core.utils_email import queue_emails
+
+        def email(key, to):
+            return {'subject': 'Hi', 'message': 'Hello', 'recipient_list': [to], 'dedupe_key': key}
+
+        queue_emails([email('a', 'a@example.com')])
+        queue_emails([email('a', 'a@example.com'), email('b', 'b@example.com'), email('b', 'b@example.com')])
+        self.assertEqual(sorted(EmailOutbox.objects.values_list('dedupe_key', flat=True)), ['a', 'b'])
+
+        # A key queued concurrently, after the pre-filter ran, is skipped row by row
+        with mock.patch('django.db.models.query.QuerySet.values_list', return_value=[]):
+            queue_emails([email('b', 'b@example.com'), email('c', 'c@example.com'), email(None, 'd@example.com')])
+        self.assertEqual(EmailOutbox.objects.count(), 4)
+        self.assertTrue(EmailOutbox.objects.filter(dedupe_key='c').exists())
+
+    def test_failed_sends_back_off_then_give_up(self):
+        from unittest import mock
+        from django.test import override_settings
+        from django.utils import timezone
+        from apps.core.models import EmailOutbox
+        from apps.core.tasks import dispatch_email_outbox
+
+        row = EmailOutbox.objects.create(subject='Hi', body='Hello', recipients=['a@example.com'])
+        failing = mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('SMTP down'),
+        )
+        with failing, override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2):
+            dispatch_email_outbox()
+            row.refresh_from_db()
+            self.assertEqual((row.status, row.attempts, row.last_error), ('PENDING', 1, 'SMTP down'))
+            self.assertGreater(row.next_attempt_at, timezone.now())
+
+            EmailOutbox.objects.filter(pk=row.pk).update(next_attempt_at=timezone.now())
+            dispatch_email_outbox()
+            row.refresh_from_db()
+            self.assertEqual((row.status, row.attempts), ('FAILED', 2))
+
+    def test_finished_rows_are_pruned_after_retention(self):
+        from datetime import timedelta
+        from django.test import override_settings
+        from django.utils import timezone
+        from apps.core.models import EmailOutbox
+        from apps.core.tasks import dispatch_email_outbox
+
+        old = timezone.now() - timedelta(days=8)
+        sent = EmailOutbox.objects.create(subject='Welcome', body='Temporary password: x', recipients=['a@example.com'])
+        failed = EmailOutbox.objects.create(subject='Welcome', body='Temporary password: y', recipients=['b@example.com'])
+        recent = EmailOutbox.objects.create(subject='Welcome', body='Temporary password: z', recipients=['c@example.com'])
+        EmailOutbox.objects.filter(pk=sent.pk).update(status='SENT', sent_at=old, updated_at=old)
+        EmailOutbox.objects.filter(pk=failed.pk).update(status='FAILED', updated_at=old)
+        EmailOutbox.objects.filter(pk=recent.pk).update(status='FAILED')
+
+        with override_settings(EMAIL_OUTBOX_RETENTION_DAYS=7):
+            dispatch_email_outbox()
+        self.assertEqual(list(EmailOutbox.objects.values_list('pk', flat=True)), [recent.pk])
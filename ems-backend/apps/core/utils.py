@@ -1,9 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
 def chunked(seq, size):
     for i in range(0, len(seq), size):
         yield seq[i : i + size]
 
 from .tenancy import resolve_tenant
 
+# Number of free uses a lower-tier tenant gets before a gated feature locks.
+FEATURE_TRIAL_LIMIT = 10
+FEATURE_USAGE_CACHE_TIMEOUT = 60 * 60  # Dropped on every increment, so this only bounds memory
+
+
+def feature_usage_cache_key(tenant_id):
+    return f'tenant:{tenant_id}:feature_usage'
+
+
+def get_feature_usage_counts(tenant_id):
+    """
+    Returns the tenant's trial usage as a ``{feature: count}`` mapping, read from the
+    cache so tier permission checks do not query the counter table on every request.
+    """
+    key = feature_usage_cache_key(tenant_id)
+    counts = cache.get(key)
+    if counts is None:
+        from .models import FeatureUsage
+        counts = dict(FeatureUsage.objects.filter(tenant_id=tenant_id).values_list('feature', 'count'))
+        cache.set(key, counts, FEATURE_USAGE_CACHE_TIMEOUT)
+    return counts
+
+
+def invalidate_feature_usage(tenant_id):
+    key = feature_usage_cache_key(tenant_id)
+    cache.delete(key)
+    # Drop it again once the increment is visible, in case a reader re-cached the old count meanwhile
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def get_feature_usage(tenant, feature_key):
+    """Returns how many times the tenant has used a gated feature."""
+    return get_feature_usage_counts(tenant.pk).get(feature_key, 0)
+
+
 def increment_feature_usage(request, feature_key):
     """
     Increments the usage count for a specific feature for the current tenant.
@@ -12,21 +55,77 @@ def increment_feature_usage(request, feature_key):
     tenant = resolve_tenant(request)
     if not tenant:
         return
-    
+
     # We only track usage if they are NOT on the tier that unlocks it fully
     business_features = {'payroll_runs', 'ai_resumes'}
     enterprise_features = {'workforce_analytics', 'audit_logs'}
-    
+
     tier = tenant.subscription_tier
     should_increment = False
-    
+
     if feature_key in business_features and tier in {'FREE', 'STARTER'}:
         should_increment = True
     elif feature_key in enterprise_features and tier in {'FREE', 'STARTER', 'BUSINESS'}:
         should_increment = True
-        
+
     if should_increment:
-        usage = tenant.feature_usage or {}
-        usage[feature_key] = usage.get(feature_key, 0) + 1
-        tenant.feature_usage = usage
-        tenant.save(update_fields=['feature_usage'])
+        from .models import FeatureUsage
+        counter = FeatureUsage.objects.filter(tenant=tenant, feature=feature_key)
+        if not counter.update(count=F('count') + 1):
+            try:
+                with transaction.atomic():
+                    FeatureUsage.objects.create(tenant=tenant, feature=feature_key, count=1)
+            except IntegrityError:
+                # A concurrent request created the row first; fall back to the atomic increment.
+                counter.update(count=F('count') + 1)
+        invalidate_feature_usage(tenant.pk)
+
+
+HOST_STATS_CACHE_KEY = 'host:stats'
+HOST_STATS_CACHE_TIMEOUT = 15 * 60  # Outlives the 5-minute beat refresh so the page never misses
+
+
+def build_host_stats():
+    """
+    Platform-wide statistics for the super-admin dashboard.
+    Runs a fixed number of queries regardless of how many tenants exist.
+    """
+    from apps.recruitment.models import AISettings
+    from apps.recruitment.utils import get_resume_cache_stats
+    from .models import Tenant
+
+    ai_usage = AISettings.objects.filter(tenant=OuterRef('pk')).values('resume_parse_count')[:1]
+    user_counts = (
+        get_user_model().objects.filter(tenant=OuterRef('pk'))
+        .order_by().values('tenant').annotate(total=Count('id')).values('total')
+    )
+    tenants = Tenant.objects.annotate(
+        user_count=Coalesce(Subquery(user_counts, output_field=IntegerField()), Value(0)),
+        ai_usage_count=Coalesce(Subquery(ai_usage, output_field=IntegerField()), Value(0)),
+    ).order_by('-created_at').values(
+        'id', 'name', 'slug', 'is_active', 'subscription_tier', 'created_at',
+        'user_count', 'ai_usage_count',
+    )
+    totals = Tenant.objects.aggregate(
+        total_tenants=Count('id'),
+        active_tenants=Count('id', filter=Q(is_active=True)),
+    )
+
+    return {
+        **totals,
+        'total_users': get_user_model().objects.count(),
+        'recent_signups': list(tenants),
+        'resume_parse_cache': get_resume_cache_stats(),
+        'generated_at': timezone.now(),
+    }
+
+
+def invalidate_host_stats():
+    """Drop the snapshot after a tenant changes, so the dashboard rebuilds it on its next load."""
+    cache.delete(HOST_STATS_CACHE_KEY)
+
+
+def refresh_host_stats_snapshot():
+    stats = build_host_stats()
+    cache.set(HOST_STATS_CACHE_KEY, stats, HOST_STATS_CACHE_TIMEOUT)
+    return stats
@@ -1,5 +1,5 @@
 from django.contrib.auth import get_user_model
-from django.db.models import Count
+from django.core.cache import cache
 from rest_framework import viewsets, mixins
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAdminUser, IsAuthenticated, BasePermission, AllowAny
@@ -11,9 +11,10 @@ from .tenancy import resolve_tenant
 from .permissions import IsAdminOrHRManager, HasEnterpriseTier
 from .serializers import (
     AnnouncementSerializer, TenantSerializer, AuditLogSerializer, 
-    ContactMessageSerializer
+    ContactMessageSerializer, InviteCodeSerializer
 )
-from .utils import increment_feature_usage
+from .filters import InviteCodeFilter
+from .utils import increment_feature_usage, refresh_host_stats_snapshot, HOST_STATS_CACHE_KEY
 from rest_framework import generics, throttling
 from ems_core.utils_email import send_email_in_background
 
@@ -59,32 +60,11 @@ class HostStatsView(APIView):
     permission_classes = [IsSuperUser]
 
     def get(self, request):
-        tenants = Tenant.objects.annotate(user_count=Count('users')).order_by('-created_at')
-        total_users = User.objects.count()
-        active_tenants = tenants.filter(is_active=True).count()
-
-        tenant_data = []
-        for t in tenants:
-            from apps.recruitment.models import AISettings
-            ai_settings = AISettings.get_settings(t)
-
-            tenant_data.append({
-                'id': t.id,
-                'name': t.name,
-                'slug': t.slug,
-                'is_active': t.is_active,
-                'subscription_tier': t.subscription_tier,
-                'created_at': t.created_at,
-                'user_count': t.user_count,
-                'ai_usage_count': ai_settings.resume_parse_count,
-            })
-
-        return Response({
-            'total_tenants': tenants.count(),
-            'active_tenants': active_tenants,
-            'total_users': total_users,
-            'recent_signups': tenant_data,
-        })
+        # Served from the snapshot kept warm by the refresh_host_stats beat task
+        stats = cache.get(HOST_STATS_CACHE_KEY)
+        if stats is None:
+            stats = refresh_host_stats_snapshot()
+        return Response(stats)
 
 
 class HostTenantViewSet(mixins.ListModelMixin,
@@ -98,25 +78,16 @@ class HostTenantViewSet(mixins.ListModelMixin,
     lookup_field = 'id'
 
 
-class HostInviteCodeViewSet(viewsets.GenericViewSet):
+class HostInviteCodeViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
     """Manage one-time invite codes for company registration."""
+    queryset = InviteCode.objects.select_related('used_by')
+    serializer_class = InviteCodeSerializer
     permission_classes = [IsSuperUser]
+    filterset_class = InviteCodeFilter
+    search_fields = ['label', 'code']
+    ordering_fields = ['created_at', 'used_at']
 
-    def list(self, request):
-        codes = InviteCode.objects.select_related('used_by', 'created_by').all()
-        data = [
-            {
-                'id': c.id,
-                'code': c.code,
-                'label': c.label,
-                'is_used': c.is_used,
-                'used_by': c.used_by.name if c.used_by else None,
-                'used_at': c.used_at,
-                'created_at': c.created_at,
-            }
-            for c in codes
-        ]
-        return Response(data)
+    MAX_BULK_GENERATE = 500
 
     @action(detail=False, methods=['post'], url_path='generate')
     def generate(self, request):
@@ -129,6 +100,27 @@ class HostInviteCodeViewSet(viewsets.GenericViewSet):
             'created_at': invite.created_at,
         }, status=201)
 
+    @action(detail=False, methods=['post'], url_path='bulk-generate')
+    def bulk_generate(self, request):
+        """Create up to MAX_BULK_GENERATE codes in one INSERT for onboarding campaigns."""
+        try:
+            count = int(request.data.get('count', 0))
+        except (TypeError, ValueError):
+            count = 0
+        if not 1 <= count <= self.MAX_BULK_GENERATE:
+            return Response(
+                {'detail': f'count must be between 1 and {self.MAX_BULK_GENERATE}.'},
+                status=400,
+            )
+
+        label = request.data.get('label', '')
+        invites = InviteCode.generate_batch(count, created_by=request.user, label=label)
+        return Response({
+            'count': len(invites),
+            'label': label,
+            'codes': [invite.code for invite in invites],
+        }, status=201)
+
     @action(detail=True, methods=['delete'], url_path='revoke')
     def revoke(self, request, pk=None):
         try:
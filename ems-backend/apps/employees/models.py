@@ -52,13 +52,42 @@ class EmployeeProfile(models.Model):
     class Meta:
         unique_together = ('tenant', 'employee_id')
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'is_deleted' in field_names and 'tenant_id' in field_names:
+            instance._counted_in = instance._headcount_key()
+        return instance
+
+    def _headcount_key(self):
+        """Tenant this profile is counted against, or None when it does not count."""
+        return None if self.is_deleted else self.tenant_id
+
     def save(self, *args, **kwargs):
         # Automatically sync tenant to the associated user
         if self.tenant and self.user and self.user.tenant != self.tenant:
             self.user.tenant = self.tenant
             self.user.save(update_fields=['tenant'])
+        adding = self._state.adding
         super().save(*args, **kwargs)
 
+        # Keep Tenant.employee_count in step with creates, soft-deletes and reactivations.
+        # Instances loaded without tenant/is_deleted are left to the nightly reconciliation.
+        counted_in = self._headcount_key()
+        previously_counted_in = None if adding else getattr(self, '_counted_in', counted_in)
+        if counted_in != previously_counted_in:
+            from apps.core.models import Tenant
+            Tenant.adjust_employee_count(previously_counted_in, -1)
+            Tenant.adjust_employee_count(counted_in, 1)
+        self._counted_in = counted_in
+
+    def delete(self, *args, **kwargs):
+        counted_in = getattr(self, '_counted_in', None)
+        result = super().delete(*args, **kwargs)
+        from apps.core.models import Tenant
+        Tenant.adjust_employee_count(counted_in, -1)
+        return result
+
     @property
     def full_name(self):
         return f"{self.user.first_name} {self.user.last_name}".strip()
@@ -1,42 +1,99 @@
+from collections import defaultdict
+
 from celery import shared_task
+from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
+import logging
+
 from .models import EmployeeDocument
-from ems_core.utils_email import send_tenant_email
+from ems_core.utils_email import queue_emails
+
+logger = logging.getLogger(__name__)
+
+EXPIRY_WARNING_DAYS = 30
+# Documents read per query, and listed per digest email (the rest are summarised)
+EXPIRY_CHUNK_SIZE = 1000
+EXPIRY_DIGEST_MAX_LINES = 200
+
 
 @shared_task
 def check_document_expiry():
     """
     Daily task to check for documents expiring within 30 days.
-    Sends an email alert to the company HR/Admin.
+    Sends each company's admins one digest email listing them, then marks
+    them notified.
     """
-    warning_date = timezone.now().date() + timedelta(days=30)
+    from django.contrib.auth import get_user_model
+    User = get_user_model()
+
+    today = timezone.now().date()
+    warning_date = today + timedelta(days=EXPIRY_WARNING_DAYS)
     expiring_docs = EmployeeDocument.objects.filter(
         expiry_date__lte=warning_date,
         is_notified=False,
-        employee__is_deleted=False
-    ).select_related('employee', 'tenant')
-
-    for doc in expiring_docs:
-        subject = f"Document Expiry Alert: {doc.employee.full_name}"
-        message = (
-            f"The {doc.doc_type} for {doc.employee.full_name} is set to expire on {doc.expiry_date}.\n\n"
-            f"Document Title: {doc.title}\n"
-            "Please ensure that renewal processes are initiated if necessary."
-        )
-        
-        # Get the primary contact (ADMIN) for the tenant
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        admin_user = User.objects.filter(tenant=doc.tenant, role='ADMIN', is_active=True).first()
-        admin_email = admin_user.email if admin_user else None
-        
-        if admin_email:
-            send_tenant_email(
-                tenant=doc.tenant,
-                subject=subject,
-                message=message,
-                recipient_list=[admin_email]
+        employee__is_deleted=False,
+        tenant__isnull=False,
+    )
+
+    tenant_ids = list(expiring_docs.order_by().values_list('tenant_id', flat=True).distinct())
+    admin_emails = defaultdict(list)
+    for tenant_id, email in User.objects.filter(
+        tenant_id__in=tenant_ids, role='ADMIN', is_active=True
+    ).exclude(email='').order_by('tenant_id', 'email').values_list('tenant_id', 'email'):
+        admin_emails[tenant_id].append(email)
+
+    notified = 0
+    for tenant_id in tenant_ids:
+        if not admin_emails[tenant_id]:
+            logger.warning(f"No active admin to notify about expiring documents for tenant {tenant_id}")
+            continue
+        notified += _send_expiry_digest(tenant_id, expiring_docs.filter(tenant_id=tenant_id), admin_emails[tenant_id], today)
+
+    return f"Notified {notified} expiring documents across {len(tenant_ids)} tenants"
+
+
+def _send_expiry_digest(tenant_id, documents, recipients, today):
+    """
+    Queue one digest for a tenant's expiring ``documents`` and mark them notified,
+    in one transaction. Documents are read in id-ordered chunks, and the final
+    update covers everything up to the last id read, so it needs no id list.
+    """
+    lines = []
+    count = 0
+    last_id = 0
+    with transaction.atomic():
+        while True:
+            chunk = list(
+                documents.filter(id__gt=last_id).order_by('id').values_list(
+                    'id', 'doc_type', 'title', 'expiry_date',
+                    'employee__user__first_name', 'employee__user__last_name',
+                )[:EXPIRY_CHUNK_SIZE]
             )
-            doc.is_notified = True
-            doc.save(update_fields=['is_notified'])
+            if not chunk:
+                break
+            for doc_id, doc_type, title, expiry_date, first_name, last_name in chunk:
+                count += 1
+                if len(lines) < EXPIRY_DIGEST_MAX_LINES:
+                    name = f"{first_name} {last_name}".strip()
+                    lines.append(f"- {name}: {doc_type} \"{title}\" expires on {expiry_date}")
+            last_id = chunk[-1][0]
+
+        if not count:
+            return 0
+        if count > len(lines):
+            lines.append(f"...and {count - len(lines)} more.")
+
+        queue_emails([{
+            'subject': f"Document Expiry Alert: {count} document{'s' if count != 1 else ''} expiring soon",
+            'message': (
+                f"The following employee documents expire within the next {EXPIRY_WARNING_DAYS} days:\n\n"
+                + "\n".join(lines)
+                + "\n\nPlease ensure that renewal processes are initiated if necessary."
+            ),
+            'recipient_list': recipients,
+            'tenant': tenant_id,
+            'dedupe_key': f'document-expiry:{tenant_id}:{today}:{last_id}',
+        }])
+        documents.filter(id__lte=last_id).update(is_notified=True)
+    return count
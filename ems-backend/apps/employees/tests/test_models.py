@@ -0,0 +1,47 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from apps.core.models import Tenant
+from apps.core.tasks import reconcile_employee_counts
+from apps.employees.models import EmployeeProfile
+
+
+def _profile(tenant, email, employee_id):
+    user = get_user_model().objects.create_user(email=email, password='Employee@123', tenant=tenant)
+    return EmployeeProfile.objects.create(
+        tenant=tenant,
+        user=user,
+        employee_id=employee_id,
+        base_salary=Decimal('1000.00'),
+        joining_date=date(2024, 1, 1),
+    )
+
+
+@pytest.mark.django_db
+def test_headcount_follows_create_soft_delete_and_reactivate():
+    tenant = Tenant.objects.create(name='Acme', slug='acme')
+    _profile(tenant, 'a@acme.com', 'E1')
+    profile = _profile(tenant, 'b@acme.com', 'E2')
+    assert Tenant.objects.get(pk=tenant.pk).current_employee_count == 2
+
+    profile = EmployeeProfile.objects.get(pk=profile.pk)
+    profile.is_deleted = True
+    profile.save(update_fields=['is_deleted'])
+    assert Tenant.objects.get(pk=tenant.pk).current_employee_count == 1
+
+    profile.is_deleted = False
+    profile.save()
+    assert Tenant.objects.get(pk=tenant.pk).current_employee_count == 2
+
+
+@pytest.mark.django_db
+def test_reconcile_employee_counts_repairs_drift():
+    tenant = Tenant.objects.create(name='Acme', slug='acme')
+    _profile(tenant, 'a@acme.com', 'E1')
+    Tenant.objects.filter(pk=tenant.pk).update(employee_count=7)
+
+    reconcile_employee_counts()
+    assert Tenant.objects.get(pk=tenant.pk).employee_count == 1
@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from apps.core.models import EmailOutbox, Tenant
+from apps.employees.models import EmployeeDocument, EmployeeProfile
+from apps.employees.tasks import check_document_expiry
+
+
+def _profile(tenant, email, employee_id):
+    user = get_user_model().objects.create_user(email=email, password='Employee@123', tenant=tenant)
+    return EmployeeProfile.objects.create(
+        tenant=tenant, user=user, employee_id=employee_id,
+        base_salary=Decimal('1000.00'), joining_date=date(2024, 1, 1),
+    )
+
+
+@pytest.mark.django_db
+def test_document_expiry_sends_one_digest_per_tenant(django_assert_max_num_queries):
+    soon = timezone.now().date() + timedelta(days=10)
+    acme = Tenant.objects.create(name='Acme', slug='acme')
+    globex = Tenant.objects.create(name='Globex', slug='globex')
+    for n, tenant in enumerate((acme, acme, globex)):
+        get_user_model().objects.create_user(
+            email=f'admin{n}@{tenant.slug}.test', password='password123', role='ADMIN', tenant=tenant, is_active=True,
+        )
+    docs = []
+    for n in range(5):
+        employee = _profile(acme, f'e{n}@acme.test', f'E{n}')
+        docs.append(EmployeeDocument.objects.create(
+            tenant=acme, employee=employee, doc_type='VISA', title=f'Visa {n}', expiry_date=soon,
+        ))
+    later = EmployeeDocument.objects.create(
+        tenant=acme, employee=employee, doc_type='PASSPORT', title='Passport', expiry_date=soon + timedelta(days=60),
+    )
+    EmployeeDocument.objects.create(
+        tenant=globex, employee=_profile(globex, 'g@globex.test', 'G1'), doc_type='CONTRACT', title='Contract',
+        expiry_date=soon,
+    )
+
+    with mock.patch('apps.employees.tasks.EXPIRY_CHUNK_SIZE', 2), \
+            mock.patch('apps.employees.tasks.EXPIRY_DIGEST_MAX_LINES', 3), \
+            django_assert_max_num_queries(24):
+        check_document_expiry()
+
+    digests = {tuple(row.recipients): row for row in EmailOutbox.objects.all()}
+    assert set(digests) == {('admin0@acme.test', 'admin1@acme.test'), ('admin2@globex.test',)}
+    acme_digest = digests[('admin0@acme.test', 'admin1@acme.test')]
+    assert acme_digest.tenant_id == acme.pk
+    assert acme_digest.subject == 'Document Expiry Alert: 5 documents expiring soon'
+    assert '...and 2 more.' in acme_digest.body
+    assert EmployeeDocument.objects.filter(is_notified=True).count() == 6
+    later.refresh_from_db()
+    assert not later.is_notified
+
+    check_document_expiry()
+    assert EmailOutbox.objects.count() == 2
@@ -14,6 +14,7 @@ from rest_framework.response import Response
 
 from apps.core.permissions import IsAdminOrHRManager, IsSelfOrAdminOrHR
 from apps.core.tenancy import resolve_tenant
+from ems_core.utils_email import send_email_in_background
 from .models import Department, Designation, EmployeeProfile
 from .serializers import DepartmentSerializer, DesignationSerializer, EmployeeProfileSerializer
 
@@ -182,6 +183,8 @@ class EmployeeProfileViewSet(viewsets.ModelViewSet):
 
             success_count = 0
             errors = []
+            # Track head-count locally; Tenant.employee_count is updated in the DB as rows land
+            headcount = tenant.current_employee_count
 
             # Process each row in its own independent transaction.
             # A failed row is completely isolated — it cannot affect other rows.
@@ -189,7 +192,7 @@ class EmployeeProfileViewSet(viewsets.ModelViewSet):
                 try:
                     with transaction.atomic():
                         # Check plan limit
-                        if tenant.current_employee_count >= tenant.employee_limit:
+                        if headcount >= tenant.employee_limit:
                             errors.append(f"Row {index + 1}: Employee limit reached. Upgrade your plan to import more.")
                             continue
 
@@ -237,22 +240,21 @@ class EmployeeProfileViewSet(viewsets.ModelViewSet):
                             temp_password = secrets.token_urlsafe(12)
                             user_obj.set_password(temp_password)
                             user_obj.save()
-                            try:
-                                from apps.core.tasks import send_email_task
-                                send_email_task.delay(
-                                    subject='Welcome to HireWix - Your Account is Ready',
-                                    message=(
-                                        f"Hello {first_name},\n\n"
-                                        f"An HR account has been created for you on the HireWix platform.\n\n"
-                                        f"Login Email: {email}\n"
-                                        f"Temporary Password: {temp_password}\n\n"
-                                        f"Please log in and update your password at your earliest convenience.\n\n"
-                                        f"Best Regards,\nHR Administration"
-                                    ),
-                                    recipient_list=[email],
-                                )
-                            except Exception as mail_err:
-                                logger.error(f"Failed to enqueue welcome email: {mail_err}")
+                            # Queued in this row's transaction; the outbox sends the whole import in batches
+                            send_email_in_background(
+                                subject='Welcome to HireWix - Your Account is Ready',
+                                message=(
+                                    f"Hello {first_name},\n\n"
+                                    f"An HR account has been created for you on the HireWix platform.\n\n"
+                                    f"Login Email: {email}\n"
+                                    f"Temporary Password: {temp_password}\n\n"
+                                    f"Please log in and update your password at your earliest convenience.\n\n"
+                                    f"Best Regards,\nHR Administration"
+                                ),
+                                recipient_list=[email],
+                                tenant=tenant,
+                                dedupe_key=f'welcome:{user_obj.pk}',
+                            )
 
                         # Prepare profile field values
                         base_salary = float(row[mapped_cols['base_salary']]) if mapped_cols['base_salary'] and pd.notna(row[mapped_cols['base_salary']]) else 0.0
@@ -275,6 +277,7 @@ class EmployeeProfileViewSet(viewsets.ModelViewSet):
                         if existing_profile:
                             # Profile exists (active, suspended, or orphaned) — just update it.
                             # No collision check needed: we already own this profile.
+                            reactivated = existing_profile.is_deleted
                             existing_profile.department = dept_obj
                             existing_profile.designation = desig_obj
                             existing_profile.employee_id = emp_id
@@ -283,6 +286,8 @@ class EmployeeProfileViewSet(viewsets.ModelViewSet):
                             existing_profile.status = 'ACTIVE'
                             existing_profile.is_deleted = False
                             existing_profile.save()
+                            if reactivated:
+                                headcount += 1
                         else:
                             # Truly new employee — check no other ACTIVE employee has this emp_id
                             id_conflict = EmployeeProfile.objects.filter(
@@ -303,6 +308,7 @@ class EmployeeProfileViewSet(viewsets.ModelViewSet):
                                 status='ACTIVE',
                                 is_deleted=False,
                             )
+                            headcount += 1
                         success_count += 1
 
                 except Exception as e:
@@ -0,0 +1,98 @@
+"""
+Team leave calendar: who is off in a date window.
+
+Overlap queries go through ``overlapping()``. On PostgreSQL it is written as a
+``daterange`` overlap so the GiST index from migration 0006 is used; elsewhere
+it is the equivalent pair of comparisons, served by the composite
+(tenant, start_date, end_date) index.
+"""
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+
+from .models import LeaveRequest
+from .workdays import get_calendar
+
+MAX_WINDOW_DAYS = 93
+CALENDAR_STATUSES = ('APPROVED', 'PENDING')
+
+# One character per day in each employee's row of the matrix
+APPROVED, PENDING, AVAILABLE, NON_WORKING = 'A', 'P', '.', '-'
+
+
+def overlapping(queryset, start, end):
+    """Requests whose [start_date, end_date] intersects [start, end]."""
+    if connection.vendor == 'postgresql':
+        table = LeaveRequest._meta.db_table
+        return queryset.filter(RawSQL(
+            f"daterange({table}.start_date, {table}.end_date, '[]') && daterange(%s, %s, '[]')",
+            (start, end),
+            output_field=BooleanField(),
+        ))
+    return queryset.filter(start_date__lte=end, end_date__gte=start)
+
+
+def team_calendar(tenant, start, end, employees, statuses=CALENDAR_STATUSES):
+    """
+    Per-day availability of ``employees`` (an EmployeeProfile queryset) between
+    ``start`` and ``end`` inclusive.
+
+    Only employees with leave in the window get a row; each row is a string with
+    one character per day (A approved, P pending, . available, - weekend or
+    holiday). ``available`` counts, for each working day, how many of the
+    employees are not on approved leave.
+    """
+    days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    calendar = get_calendar(tenant)
+    working = [calendar.is_working_day(day) for day in days]
+
+    requests = overlapping(
+        LeaveRequest.objects.filter(tenant=tenant, status__in=statuses, employee__in=employees),
+        start, end,
+    ).select_related('employee__user', 'employee__department', 'leave_type').order_by('employee_id', 'start_date')
+
+    rows = {}
+    for leave_request in requests:
+        employee = leave_request.employee
+        row = rows.get(employee.pk)
+        if row is None:
+            row = rows[employee.pk] = {
+                'employee_id': employee.pk,
+                'employee_name': employee.full_name,
+                'department': employee.department.name if employee.department else None,
+                'cells': [AVAILABLE if is_working else NON_WORKING for is_working in working],
+                'requests': [],
+            }
+        mark = APPROVED if leave_request.status == 'APPROVED' else PENDING
+        first = max((leave_request.start_date - start).days, 0)
+        last = min((leave_request.end_date - start).days, len(days) - 1)
+        cells = row['cells']
+        for i in range(first, last + 1):
+            # Approved leave wins over a pending request for the same day
+            if working[i] and cells[i] != APPROVED:
+                cells[i] = mark
+        row['requests'].append({
+            'id': leave_request.pk,
+            'leave_type': leave_request.leave_type.name if leave_request.leave_type else 'General',
+            'start_date': leave_request.start_date,
+            'end_date': leave_request.end_date,
+            'status': leave_request.status,
+        })
+
+    headcount = employees.count()
+    off = [0] * len(days)
+    for row in rows.values():
+        for i, cell in enumerate(row['cells']):
+            off[i] += cell == APPROVED
+        row['days'] = ''.join(row.pop('cells'))
+
+    return {
+        'start': start,
+        'end': end,
+        'dates': days,
+        'headcount': headcount,
+        'available': [headcount - off[i] if working[i] else None for i in range(len(days))],
+        'employees': list(rows.values()),
+    }
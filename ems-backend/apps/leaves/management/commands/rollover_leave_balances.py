@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = "Opens next year's leave balances, carrying unused days forward up to each policy's limit"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, help='Year being closed (default: last year)')
+        parser.add_argument('--tenant', type=int, help='Only roll over this tenant id')
+
+    def handle(self, *args, **options):
+        from apps.leaves.services import rollover_balances
+
+        year = options['year'] or timezone.now().year - 1
+        rolled = rollover_balances(year, tenant_id=options['tenant'])
+        self.stdout.write(self.style.SUCCESS(f'Rolled over {rolled} leave balances into {year + 1}'))
@@ -0,0 +1,37 @@
+# Generated by Django 4.2 on 2026-10-19 12:09
+
+import apps.leaves.models
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_invitecode_indexes'),
+        ('leaves', '0004_alter_leavetype_name_alter_leavetype_unique_together'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkingCalendar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekend_days', models.JSONField(default=apps.leaves.models.default_weekend_days, help_text='Weekday numbers (Mon=0 ... Sun=6) that are non-working')),
+                ('tenant', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='working_calendar', to='core.tenant')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Holiday',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('name', models.CharField(max_length=100)),
+                ('tenant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='holidays', to='core.tenant')),
+            ],
+            options={
+                'ordering': ['date'],
+                'unique_together': {('tenant', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-19 12:16
+
+from django.db import migrations, models
+
+
+def add_overlap_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return  # The composite index below covers other backends
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS leaves_leaverequest_span_gist ON leaves_leaverequest '
+        "USING GIST (tenant_id, daterange(start_date, end_date, '[]'))"
+    )
+
+
+def remove_overlap_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS leaves_leaverequest_span_gist')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leaves', '0005_working_calendar_holiday'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['tenant', 'start_date', 'end_date'], name='leaves_req_tenant_span_idx'),
+        ),
+        migrations.RunPython(add_overlap_index, remove_overlap_index),
+    ]
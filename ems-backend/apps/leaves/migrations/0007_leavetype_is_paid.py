@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 12:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leaves', '0006_leaverequest_span_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='leavetype',
+            name='is_paid',
+            field=models.BooleanField(default=True, help_text='Unpaid leave is deducted pro rata in payroll'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2 on 2026-10-19 12:45
+
+from datetime import date
+
+from django.db import migrations, models
+
+
+def mark_rolled_over(apps, schema_editor):
+    """
+    Balances up to the current year were opened by (or predate) the last rollover;
+    only balances booked ahead into a future year still need their carry-forward.
+    """
+    LeaveBalance = apps.get_model('leaves', 'LeaveBalance')
+    LeaveBalance.objects.filter(year__lte=date.today().year).update(carried_forward=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leaves', '0007_leavetype_is_paid'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='leavebalance',
+            name='carried_forward',
+            field=models.DecimalField(blank=True, decimal_places=1, editable=False, max_digits=5, null=True),
+        ),
+        migrations.RunPython(mark_rolled_over, migrations.RunPython.noop),
+    ]
@@ -7,6 +7,7 @@ class LeaveType(models.Model):
     tenant = models.ForeignKey('core.Tenant', on_delete=models.CASCADE, null=True, blank=True, related_name='leave_types')
     name = models.CharField(max_length=100)
     max_days_per_year = models.IntegerField()
+    is_paid = models.BooleanField(default=True, help_text="Unpaid leave is deducted pro rata in payroll")
 
     objects = TenantManager()
 
@@ -34,6 +35,8 @@ class LeaveBalance(models.Model):
     year = models.IntegerField()
     available_days = models.DecimalField(max_digits=5, decimal_places=1, default=0)
     used_days = models.DecimalField(max_digits=5, decimal_places=1, default=0)
+    # Days carried in from the previous year by the rollover; NULL until it has run for this balance
+    carried_forward = models.DecimalField(max_digits=5, decimal_places=1, null=True, blank=True, editable=False)
 
     objects = TenantManager()
 
@@ -58,3 +61,60 @@ class LeaveRequest(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING', db_index=True)
 
     objects = TenantManager()
+
+    class Meta:
+        indexes = [
+            # Date-window overlap lookups (team calendar); PostgreSQL also gets a daterange GiST index
+            models.Index(fields=['tenant', 'start_date', 'end_date'], name='leaves_req_tenant_span_idx'),
+        ]
+
+
+def default_weekend_days():
+    return [5, 6]  # Saturday, Sunday (date.weekday() numbering)
+
+
+class WorkingCalendar(models.Model):
+    """Per-tenant work week; days listed in weekend_days never count as working days."""
+    tenant = models.OneToOneField('core.Tenant', on_delete=models.CASCADE, null=True, blank=True, related_name='working_calendar')
+    weekend_days = models.JSONField(default=default_weekend_days, help_text="Weekday numbers (Mon=0 ... Sun=6) that are non-working")
+
+    objects = TenantManager()
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        from .workdays import invalidate_calendar
+        invalidate_calendar(self.tenant_id)
+
+    def delete(self, *args, **kwargs):
+        tenant_id = self.tenant_id
+        result = super().delete(*args, **kwargs)
+        from .workdays import invalidate_calendar
+        invalidate_calendar(tenant_id)
+        return result
+
+
+class Holiday(models.Model):
+    tenant = models.ForeignKey('core.Tenant', on_delete=models.CASCADE, null=True, blank=True, related_name='holidays')
+    date = models.DateField()
+    name = models.CharField(max_length=100)
+
+    objects = TenantManager()
+
+    class Meta:
+        unique_together = ('tenant', 'date')
+        ordering = ['date']
+
+    def __str__(self):
+        return f"{self.name} ({self.date})"
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        from .workdays import invalidate_calendar
+        invalidate_calendar(self.tenant_id)
+
+    def delete(self, *args, **kwargs):
+        tenant_id = self.tenant_id
+        result = super().delete(*args, **kwargs)
+        from .workdays import invalidate_calendar
+        invalidate_calendar(tenant_id)
+        return result
@@ -5,7 +5,10 @@ from rest_framework import serializers
 
 from apps.employees.models import EmployeeProfile
 from apps.core.tenancy import resolve_tenant
-from .models import LeaveBalance, LeavePolicyWindow, LeaveRequest, LeaveType
+from .models import Holiday, LeaveBalance, LeavePolicyWindow, LeaveRequest, LeaveType, WorkingCalendar
+from .services import apply_approval, get_or_init_balance, pending_days
+from .utils import leave_decision_email
+from .workdays import get_calendar
 
 
 
@@ -23,9 +26,52 @@ class LeavePolicyWindowSerializer(serializers.ModelSerializer):
         read_only_fields = ('tenant',)
 
 
+class HolidaySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Holiday
+        fields = '__all__'
+        read_only_fields = ('tenant',)
+
+    def validate(self, attrs):
+        # tenant is read-only, so DRF adds no validator for the (tenant, date) constraint.
+        request = self.context.get('request')
+        tenant = resolve_tenant(request) if request else None
+        day = attrs.get('date', getattr(self.instance, 'date', None))
+        duplicates = Holiday.objects.filter(tenant=tenant, date=day)
+        if self.instance is not None:
+            duplicates = duplicates.exclude(pk=self.instance.pk)
+        if duplicates.exists():
+            raise serializers.ValidationError({'date': 'A holiday already exists on this date.'})
+        return attrs
+
+
+class WorkingCalendarSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WorkingCalendar
+        fields = '__all__'
+        read_only_fields = ('tenant',)
+
+    def validate(self, attrs):
+        # One calendar per tenant; update the existing one instead of creating another.
+        request = self.context.get('request')
+        tenant = resolve_tenant(request) if request else None
+        if self.instance is None and WorkingCalendar.objects.filter(tenant=tenant).exists():
+            raise serializers.ValidationError('A working calendar already exists for this company.')
+        return attrs
+
+    def validate_weekend_days(self, value):
+        if not isinstance(value, list) or any(not isinstance(d, int) or not 0 <= d <= 6 for d in value):
+            raise serializers.ValidationError('Weekend days must be a list of weekday numbers from 0 (Monday) to 6 (Sunday).')
+        if len(set(value)) == 7:
+            raise serializers.ValidationError('At least one day of the week must be a working day.')
+        return sorted(set(value))
+
+
 class LeaveBalanceSerializer(serializers.ModelSerializer):
     employee_name = serializers.CharField(source='employee.full_name', read_only=True)
     leave_type_name = serializers.SerializerMethodField()
+    pending_days = serializers.SerializerMethodField()
+    remaining_days = serializers.SerializerMethodField()
 
     class Meta:
         model = LeaveBalance
@@ -35,6 +81,18 @@ class LeaveBalanceSerializer(serializers.ModelSerializer):
     def get_leave_type_name(self, obj):
         return obj.leave_type.name if obj.leave_type else 'General'
 
+    def _pending_days(self, obj):
+        # Listings annotate pending_days (services.with_pending_days); single objects cost one aggregate
+        if getattr(obj, 'pending_days', None) is None:
+            obj.pending_days = pending_days(obj.tenant_id, obj.employee_id, obj.leave_type_id, obj.year)
+        return obj.pending_days
+
+    def get_pending_days(self, obj):
+        return str(self._pending_days(obj))
+
+    def get_remaining_days(self, obj):
+        return str(Decimal(str(obj.available_days)) - self._pending_days(obj))
+
 
 
 class LeaveRequestSerializer(serializers.ModelSerializer):
@@ -91,40 +149,12 @@ class LeaveRequestSerializer(serializers.ModelSerializer):
 
         if employee and leave_type and start_date and end_date:
             year = start_date.year
-            duration_days = (end_date - start_date).days + 1
+            duration_days = get_calendar(tenant).working_days(start_date, end_date)
             attrs['duration_days'] = duration_days
 
-            # Auto-initialize balance if missing
-            balance, created = LeaveBalance.objects.get_or_create(
-                tenant=tenant,
-                employee=employee,
-                leave_type=leave_type,
-                year=year,
-                defaults={
-                    'available_days': Decimal(str(leave_type.max_days_per_year)),
-                    'used_days': Decimal('0.0')
-                }
-            )
-
-            # NOTE: We are NOT blocking the request if balance is insufficient
-            # per user request for "Open" leave management.
-            # We just track it.
-            pending_or_approved = LeaveRequest.objects.filter(
-                tenant=tenant,
-                employee=employee,
-                leave_type=leave_type,
-                status__in=['PENDING', 'APPROVED'],
-                start_date__year=year,
-            )
-            if self.instance:
-                pending_or_approved = pending_or_approved.exclude(pk=self.instance.pk)
-
-            already_applied_days = sum(float(req.duration_days) for req in pending_or_approved)
-            remaining = float(balance.available_days) - float(balance.used_days) - already_applied_days
-
-            # Just add a warning field or info if we wanted, but for now we just allow it.
-            # if duration_days > remaining:
-            #     pass 
+            # Auto-initialize balance if missing. Requests are not blocked on an
+            # insufficient balance ("Open" leave management); approval tracks it.
+            get_or_init_balance(tenant, employee, leave_type, year)
 
         return attrs
 
@@ -135,39 +165,23 @@ class LeaveRequestSerializer(serializers.ModelSerializer):
         instance = super().update(instance, validated_data)
 
         if previous_status != 'APPROVED' and instance.status == 'APPROVED' and instance.leave_type:
-            balance = LeaveBalance.objects.select_for_update().filter(
-                tenant=instance.tenant,
-                employee=instance.employee,
-                leave_type=instance.leave_type,
-                year=instance.start_date.year,
-            ).first()
-            if balance and Decimal(str(balance.available_days)) >= Decimal(str(instance.duration_days)):
-                balance.available_days = Decimal(str(balance.available_days)) - Decimal(str(instance.duration_days))
-                balance.used_days = Decimal(str(balance.used_days)) + Decimal(str(instance.duration_days))
-                balance.save(update_fields=['available_days', 'used_days'])
+            apply_approval(instance)
 
         # Dispatch background email on approval or rejection
         if previous_status == 'PENDING' and instance.status in ['APPROVED', 'REJECTED']:
             from ems_core.utils_email import send_email_in_background
-            
-            user = instance.employee.user
-            subject = f"Leave Request {instance.status.title()}"
-            
-            leave_name = instance.leave_type.name if instance.leave_type else 'General'
-            message = f"Hello {user.first_name},\n\nYour recent leave request has been marked as **{instance.status}**.\n\n"
-            message += f"Details:\n"
-            message += f"Leave Type: {leave_name}\n"
-            message += f"Duration: {instance.start_date} to {instance.end_date} ({instance.duration_days} days)\n"
-            
-            if instance.hr_notes:
-                message += f"\nHR Notes:\n{instance.hr_notes}\n"
-                
-            message += "\nLog in to the EMS Dashboard for full details regarding your leave balance.\n\nBest,\nHR Management"
-            
+
+            subject, message = leave_decision_email(instance)
             send_email_in_background(
                 subject=subject,
                 message=message,
-                recipient_list=[user.email]
+                recipient_list=[instance.employee.user.email],
+                tenant=instance.tenant,
             )
 
         return instance
+
+
+class LeaveDecisionSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=1000)
+    status = serializers.ChoiceField(choices=['APPROVED', 'REJECTED'])
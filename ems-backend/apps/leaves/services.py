@@ -0,0 +1,253 @@
+"""
+Leave balance ledger.
+
+``LeaveBalance.available_days`` is what is left after approved leave (approval moves
+days from available to used). Pending requests are not deducted until approved, so
+the bookable remainder is ``available_days - pending_days``. Every caller -
+request validation, approval, balance listings and reports - reads these numbers
+through this module so they agree.
+"""
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import LeaveBalance, LeavePolicyWindow, LeaveRequest, LeaveType
+
+ZERO = Decimal('0.0')
+_DAYS = DecimalField(max_digits=6, decimal_places=1)
+
+
+def get_or_init_balance(tenant, employee, leave_type, year):
+    """The employee's balance for the year, created from the leave type's allowance if missing."""
+    balance, _ = LeaveBalance.objects.get_or_create(
+        tenant=tenant,
+        employee=employee,
+        leave_type=leave_type,
+        year=year,
+        defaults={
+            'available_days': Decimal(str(leave_type.max_days_per_year)),
+            'used_days': ZERO,
+        },
+    )
+    return balance
+
+
+def pending_days(tenant, employee, leave_type, year, exclude_request_id=None):
+    """Days requested but not yet decided, summed in the database."""
+    requests = LeaveRequest.objects.filter(
+        tenant=tenant,
+        employee=employee,
+        leave_type=leave_type,
+        status='PENDING',
+        start_date__year=year,
+    )
+    if exclude_request_id:
+        requests = requests.exclude(pk=exclude_request_id)
+    return requests.aggregate(total=Coalesce(Sum('duration_days'), Value(ZERO), output_field=_DAYS))['total']
+
+
+def with_pending_days(balances):
+    """Annotate a LeaveBalance queryset with ``pending_days`` using one correlated subquery."""
+    pending = LeaveRequest.objects.filter(
+        employee=OuterRef('employee'),
+        leave_type=OuterRef('leave_type'),
+        status='PENDING',
+        start_date__year=OuterRef('year'),
+    ).order_by().values('employee').annotate(total=Sum('duration_days')).values('total')
+    return balances.annotate(pending_days=Coalesce(Subquery(pending, output_field=_DAYS), Value(ZERO)))
+
+
+def apply_approval(leave_request):
+    """
+    Move an approved request's days from available to used on its (row-locked)
+    balance. Must run inside a transaction. Returns False if the balance is
+    missing or too small, in which case it is left untouched.
+    """
+    balance = LeaveBalance.objects.select_for_update().filter(
+        tenant=leave_request.tenant,
+        employee=leave_request.employee,
+        leave_type=leave_request.leave_type,
+        year=leave_request.start_date.year,
+    ).first()
+    return deduct(balance, leave_request.duration_days)
+
+
+def deduct(balance, days):
+    if not _take(balance, days):
+        return False
+    balance.save(update_fields=['available_days', 'used_days'])
+    return True
+
+
+def _take(balance, days):
+    days = Decimal(str(days))
+    if not balance or Decimal(str(balance.available_days)) < days:
+        return False
+    balance.available_days = Decimal(str(balance.available_days)) - days
+    balance.used_days = Decimal(str(balance.used_days)) + days
+    return True
+
+
+def _balance_key(leave_request):
+    return (leave_request.tenant_id, leave_request.employee_id, leave_request.leave_type_id,
+            leave_request.start_date.year)
+
+
+def decide_pending(leave_requests, status):
+    """
+    Approve or reject many requests at once. Must run inside a transaction.
+
+    Only requests still PENDING are touched; they are row-locked, and for approvals
+    every affected balance is locked in a single query ordered by primary key, so
+    concurrent bulk decisions always lock in the same order and cannot deadlock.
+    Balances and requests are then written with one bulk_update each.
+
+    Like single approvals, a request whose balance is missing or too small is
+    still approved but leaves the balance untouched; its id is reported in
+    ``insufficient``. Returns ``(decided, insufficient)``.
+    """
+    decided = list(
+        leave_requests.filter(status='PENDING').select_for_update().order_by('pk')
+    )
+    insufficient = []
+
+    if status == 'APPROVED':
+        keys = {_balance_key(r) for r in decided if r.leave_type_id}
+        balances = {}
+        if keys:
+            match = Q()
+            for tenant_id, employee_id, leave_type_id, year in keys:
+                match |= Q(tenant_id=tenant_id, employee_id=employee_id, leave_type_id=leave_type_id, year=year)
+            locked = LeaveBalance.objects.select_for_update().filter(match).order_by('pk')
+            balances = {(b.tenant_id, b.employee_id, b.leave_type_id, b.year): b for b in locked}
+
+        changed = {}
+        for leave_request in decided:
+            if not leave_request.leave_type_id:
+                continue
+            balance = balances.get(_balance_key(leave_request))
+            if _take(balance, leave_request.duration_days):
+                changed[balance.pk] = balance
+            else:
+                insufficient.append(leave_request.pk)
+        if changed:
+            LeaveBalance.objects.bulk_update(list(changed.values()), ['available_days', 'used_days'])
+
+    for leave_request in decided:
+        leave_request.status = status
+    if decided:
+        LeaveRequest.objects.bulk_update(decided, ['status'])
+    return decided, insufficient
+
+
+def carry_forward_limits(year, tenant_id=None):
+    """
+    ``{leave_type_id: limit}`` from the policy window covering 31 December of
+    ``year`` (the latest-starting one if several do). Leave types without such a
+    window carry nothing forward.
+    """
+    year_end = date(year, 12, 31)
+    windows = LeavePolicyWindow.objects.filter(start_date__lte=year_end, end_date__gte=year_end)
+    if tenant_id is not None:
+        windows = windows.filter(tenant_id=tenant_id)
+    limits = {}
+    for leave_type_id, limit in windows.order_by('start_date').values_list('leave_type_id', 'carry_forward_limit'):
+        limits[leave_type_id] = Decimal(str(limit))
+    return limits
+
+
+def rollover_balances(year, tenant_id=None, batch_size=1000):
+    """
+    Open ``year + 1`` balances for every active employee and leave type of their
+    tenant: the leave type's yearly allowance plus whatever was left of ``year``
+    (after pending requests), capped at the policy's carry-forward limit.
+
+    Balances already opened for the new year (e.g. by a request booked into
+    January) keep their days and get the carried amount added. ``carried_forward``
+    records the rollover on each row, so the job can safely be re-run. Reads are
+    a handful of set-wide queries; only missing rows are created (in batches) and
+    top-ups are one bulk_update. Returns the number of balances opened or topped up.
+    """
+    from apps.employees.models import EmployeeProfile
+
+    next_year = year + 1
+    employees = EmployeeProfile.objects.filter(is_deleted=False)
+    leave_types = LeaveType.objects.all()
+    closing = with_pending_days(LeaveBalance.objects.filter(year=year))
+    existing = LeaveBalance.objects.filter(year=next_year)
+    if tenant_id is not None:
+        employees = employees.filter(tenant_id=tenant_id)
+        leave_types = leave_types.filter(tenant_id=tenant_id)
+        closing = closing.filter(tenant_id=tenant_id)
+        existing = existing.filter(tenant_id=tenant_id)
+
+    types_by_tenant = defaultdict(list)
+    for leave_type_id, type_tenant_id, allowance in leave_types.values_list('id', 'tenant_id', 'max_days_per_year'):
+        types_by_tenant[type_tenant_id].append((leave_type_id, Decimal(str(allowance))))
+    leftover = {
+        (employee_id, leave_type_id): Decimal(str(available)) - Decimal(str(pending))
+        for employee_id, leave_type_id, available, pending
+        in closing.values_list('employee_id', 'leave_type_id', 'available_days', 'pending_days')
+    }
+    limits = carry_forward_limits(year, tenant_id)
+    opened = {
+        (employee_id, leave_type_id): (balance_id, carried_forward)
+        for balance_id, employee_id, leave_type_id, carried_forward
+        in existing.values_list('id', 'employee_id', 'leave_type_id', 'carried_forward')
+    }
+
+    balances, top_ups = [], []
+    for employee_id, employee_tenant_id in employees.values_list('id', 'tenant_id').iterator(chunk_size=batch_size):
+        for leave_type_id, allowance in types_by_tenant.get(employee_tenant_id, ()):
+            carried = min(max(leftover.get((employee_id, leave_type_id), ZERO), ZERO), limits.get(leave_type_id, ZERO))
+            if (employee_id, leave_type_id) in opened:
+                balance_id, carried_forward = opened[(employee_id, leave_type_id)]
+                if carried_forward is None:
+                    top_ups.append(LeaveBalance(
+                        pk=balance_id, available_days=F('available_days') + carried, carried_forward=carried,
+                    ))
+                continue
+            balances.append(LeaveBalance(
+                tenant_id=employee_tenant_id,
+                employee_id=employee_id,
+                leave_type_id=leave_type_id,
+                year=next_year,
+                available_days=allowance + carried,
+                used_days=ZERO,
+                carried_forward=carried,
+            ))
+
+    # The NULL filter keeps a concurrent run from adding the same carry twice
+    topped_up = existing.filter(carried_forward__isnull=True).bulk_update(
+        top_ups, ['available_days', 'carried_forward'], batch_size=batch_size,
+    ) if top_ups else 0
+    return _create_missing_balances(balances, batch_size) + topped_up
+
+
+def _create_missing_balances(balances, batch_size):
+    """
+    Insert balances known to be missing. If a concurrent request or run opened
+    some of them meanwhile, that batch falls back to row-by-row inserts and skips
+    the existing ones (bulk_create's ignore_conflicts is unsupported on Oracle).
+    """
+    created = 0
+    for start in range(0, len(balances), batch_size):
+        batch = balances[start:start + batch_size]
+        try:
+            with transaction.atomic():
+                LeaveBalance.objects.bulk_create(batch)
+            created += len(batch)
+        except IntegrityError:
+            for balance in batch:
+                balance.pk = None
+                try:
+                    with transaction.atomic():
+                        balance.save(force_insert=True)
+                    created += 1
+                except IntegrityError:
+                    pass
+    return created
@@ -0,0 +1,19 @@
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def rollover_leave_balances_task(year=None, tenant_id=None):
+    """
+    Open next year's leave balances with carry-forward applied.
+    Scheduled on 1 January; ``year`` defaults to the year that just closed.
+    """
+    from django.utils import timezone
+    from .services import rollover_balances
+
+    year = year or timezone.now().year - 1
+    rolled = rollover_balances(year, tenant_id=tenant_id)
+    logger.info(f"Leave rollover {year} -> {year + 1}: rolled over {rolled} balances")
+    return f"Rolled over {rolled} leave balances into {year + 1}"
@@ -0,0 +1,147 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from apps.core.models import Tenant
+from apps.employees.models import EmployeeProfile
+from apps.leaves.models import LeaveBalance, LeavePolicyWindow, LeaveRequest, LeaveType
+from apps.leaves.services import (
+    _create_missing_balances, apply_approval, decide_pending, get_or_init_balance, pending_days, rollover_balances,
+    with_pending_days,
+)
+
+
+@pytest.fixture
+def ledger(db):
+    tenant = Tenant.objects.create(name='Acme', slug='acme')
+    user = get_user_model().objects.create_user(email='emp@acme.com', password='Employee@123', tenant=tenant)
+    employee = EmployeeProfile.objects.create(
+        tenant=tenant, user=user, employee_id='E1',
+        base_salary=Decimal('1000.00'), joining_date=date(2024, 1, 1),
+    )
+    leave_type = LeaveType.objects.create(tenant=tenant, name='Annual', max_days_per_year=20)
+    balance = LeaveBalance.objects.create(
+        tenant=tenant, employee=employee, leave_type=leave_type, year=2026, available_days=Decimal('20.0'),
+    )
+    return tenant, employee, leave_type, balance
+
+
+def _request(tenant, employee, leave_type, start, days, status='PENDING'):
+    return LeaveRequest.objects.create(
+        tenant=tenant, employee=employee, leave_type=leave_type, start_date=start, end_date=start,
+        duration_days=Decimal(days), reason='Trip', status=status,
+    )
+
+
+def test_pending_days_are_summed_in_one_query(ledger, django_assert_num_queries):
+    tenant, employee, leave_type, balance = ledger
+    first = _request(tenant, employee, leave_type, date(2026, 3, 2), '2.0')
+    _request(tenant, employee, leave_type, date(2026, 4, 6), '1.5')
+    _request(tenant, employee, leave_type, date(2026, 5, 4), '3.0', status='REJECTED')
+    _request(tenant, employee, leave_type, date(2025, 5, 5), '4.0')
+
+    with django_assert_num_queries(1):
+        assert pending_days(tenant, employee, leave_type, 2026) == Decimal('3.5')
+    assert pending_days(tenant, employee, leave_type, 2026, exclude_request_id=first.pk) == Decimal('1.5')
+
+    annotated = with_pending_days(LeaveBalance.objects.filter(pk=balance.pk)).get()
+    assert annotated.pending_days == Decimal('3.5')
+
+
+def test_apply_approval_moves_days_to_used(ledger):
+    tenant, employee, leave_type, balance = ledger
+    leave = _request(tenant, employee, leave_type, date(2026, 3, 2), '5.0', status='APPROVED')
+
+    assert apply_approval(leave)
+    balance.refresh_from_db()
+    assert (balance.available_days, balance.used_days) == (Decimal('15.0'), Decimal('5.0'))
+
+    leave.duration_days = Decimal('30.0')
+    assert not apply_approval(leave)
+
+
+def test_decide_pending_locks_and_writes_in_constant_queries(ledger, django_assert_num_queries):
+    tenant, employee, leave_type, balance = ledger
+    other = LeaveType.objects.create(tenant=tenant, name='Sick', max_days_per_year=2)
+    LeaveBalance.objects.create(tenant=tenant, employee=employee, leave_type=other, year=2026, available_days=Decimal('2.0'))
+    requests = [_request(tenant, employee, leave_type, date(2026, 3, day), '2.0') for day in range(2, 12)]
+    short = _request(tenant, employee, other, date(2026, 6, 1), '3.0')
+    done = _request(tenant, employee, leave_type, date(2026, 7, 1), '1.0', status='REJECTED')
+
+    # requests, balances, balance update, request update
+    with django_assert_num_queries(4):
+        decided, insufficient = decide_pending(LeaveRequest.objects.filter(tenant=tenant), 'APPROVED')
+
+    assert {r.pk for r in decided} == {r.pk for r in requests} | {short.pk}
+    assert insufficient == [short.pk]
+    balance.refresh_from_db()
+    assert (balance.available_days, balance.used_days) == (Decimal('0.0'), Decimal('20.0'))
+    assert LeaveRequest.objects.filter(status='APPROVED').count() == 11
+    done.refresh_from_db()
+    assert done.status == 'REJECTED'
+
+
+def test_rollover_caps_carry_forward_and_keeps_existing_balances(ledger, django_assert_max_num_queries):
+    tenant, employee, leave_type, balance = ledger
+    sick = LeaveType.objects.create(tenant=tenant, name='Sick', max_days_per_year=10)
+    LeavePolicyWindow.objects.create(
+        tenant=tenant, leave_type=leave_type, start_date=date(2026, 1, 1), end_date=date(2026, 12, 31),
+        carry_forward_limit=Decimal('5.0'),
+    )
+    _request(tenant, employee, leave_type, date(2026, 12, 21), '16.0')  # pending: 4 days really left
+    user = get_user_model().objects.create_user(email='new@acme.com', password='Employee@123', tenant=tenant)
+    newcomer = EmployeeProfile.objects.create(
+        tenant=tenant, user=user, employee_id='E2', base_salary=Decimal('1000.00'), joining_date=date(2026, 6, 1),
+    )
+    LeaveBalance.objects.create(tenant=tenant, employee=newcomer, leave_type=sick, year=2027, available_days=Decimal('1.0'))
+
+    with django_assert_max_num_queries(9):
+        assert rollover_balances(2026) == 4
+
+    opened = {
+        (b.employee_id, b.leave_type_id): b.available_days for b in LeaveBalance.objects.filter(year=2027)
+    }
+    assert opened == {
+        (employee.pk, leave_type.pk): Decimal('24.0'),
+        (employee.pk, sick.pk): Decimal('10.0'),
+        (newcomer.pk, leave_type.pk): Decimal('20.0'),
+        (newcomer.pk, sick.pk): Decimal('1.0'),
+    }
+    assert rollover_balances(2026) == 0
+
+
+def test_rollover_tops_up_balances_opened_early(ledger):
+    tenant, employee, leave_type, balance = ledger
+    LeavePolicyWindow.objects.create(
+        tenant=tenant, leave_type=leave_type, start_date=date(2026, 1, 1), end_date=date(2026, 12, 31),
+        carry_forward_limit=Decimal('5.0'),
+    )
+    # Leave booked into January opens the 2027 balance before the rollover runs
+    early = get_or_init_balance(tenant, employee, leave_type, 2027)
+    LeaveBalance.objects.filter(pk=early.pk).update(available_days=Decimal('18.0'), used_days=Decimal('2.0'))
+
+    assert rollover_balances(2026) == 1
+    assert rollover_balances(2026) == 0
+
+    early.refresh_from_db()
+    assert (early.available_days, early.used_days, early.carried_forward) == (
+        Decimal('23.0'), Decimal('2.0'), Decimal('5.0'),
+    )
+
+
+def test_rollover_inserts_skip_balances_opened_concurrently(ledger):
+    tenant, employee, leave_type, balance = ledger
+    sick = LeaveType.objects.create(tenant=tenant, name='Sick', max_days_per_year=10)
+    # Opened by a request after the rollover read the existing 2027 rows
+    LeaveBalance.objects.create(tenant=tenant, employee=employee, leave_type=leave_type, year=2027, available_days=1)
+    missing = [
+        LeaveBalance(tenant=tenant, employee=employee, leave_type=lt, year=2027, available_days=days)
+        for lt, days in ((leave_type, 20), (sick, 10))
+    ]
+
+    assert _create_missing_balances(missing, batch_size=10) == 1
+    assert dict(LeaveBalance.objects.filter(year=2027).values_list('leave_type_id', 'available_days')) == {
+        leave_type.pk: Decimal('1.0'), sick.pk: Decimal('10.0'),
+    }
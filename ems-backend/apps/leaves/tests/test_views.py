@@ -0,0 +1,129 @@
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from apps.core.models import EmailOutbox, Tenant
+from apps.employees.models import EmployeeProfile
+from apps.leaves.models import Holiday, LeaveBalance, LeaveRequest, LeaveType, WorkingCalendar
+
+
+@pytest.fixture
+def hr_client(db):
+    tenant = Tenant.objects.create(name='Acme', slug='acme')
+    hr = get_user_model().objects.create_user(
+        email='hr@acme.test', password='password123', role='HR_MANAGER', tenant=tenant,
+    )
+    client = APIClient()
+    client.force_authenticate(user=hr)
+    return client, tenant
+
+
+def _employee(tenant, n):
+    user = get_user_model().objects.create_user(email=f'emp{n}@acme.test', password='password123', tenant=tenant)
+    return EmployeeProfile.objects.create(
+        tenant=tenant, user=user, employee_id=f'E{n}',
+        base_salary=Decimal('1000.00'), joining_date=date(2024, 1, 1),
+    )
+
+
+def test_bulk_decide_approves_pending_and_sends_one_notification_batch(hr_client):
+    client, tenant = hr_client
+    other_tenant = Tenant.objects.create(name='Other', slug='other')
+    leave_type = LeaveType.objects.create(tenant=tenant, name='Annual', max_days_per_year=20)
+    pending = []
+    for n in range(3):
+        employee = _employee(tenant, n)
+        LeaveBalance.objects.create(
+            tenant=tenant, employee=employee, leave_type=leave_type, year=2026, available_days=Decimal('20.0'),
+        )
+        pending.append(LeaveRequest.objects.create(
+            tenant=tenant, employee=employee, leave_type=leave_type, start_date=date(2026, 3, 2),
+            end_date=date(2026, 3, 3), duration_days=Decimal('2.0'), reason='Trip',
+        ))
+    foreign = LeaveRequest.objects.create(
+        tenant=other_tenant, employee=_employee(other_tenant, 9), leave_type=None, start_date=date(2026, 3, 2),
+        end_date=date(2026, 3, 2), duration_days=Decimal('1.0'), reason='Trip',
+    )
+
+    ids = [r.pk for r in pending] + [foreign.pk]
+    with mock.patch('apps.core.tasks.dispatch_email_outbox.delay') as delay, \
+            mock.patch('django.db.transaction.on_commit', side_effect=lambda func: func()):
+        response = client.post('/api/leaves/requests/bulk_decide/', {'ids': ids, 'status': 'APPROVED'}, format='json')
+
+    assert response.status_code == 200
+    assert sorted(response.data['updated']) == sorted(r.pk for r in pending)
+    assert response.data['skipped'] == [foreign.pk]
+    delay.assert_called_once_with()
+    assert sorted(EmailOutbox.objects.values_list('recipients', flat=True)) == [
+        ['emp0@acme.test'], ['emp1@acme.test'], ['emp2@acme.test'],
+    ]
+    assert set(LeaveBalance.objects.values_list('used_days', flat=True)) == {Decimal('2.0')}
+    foreign.refresh_from_db()
+    assert foreign.status == 'PENDING'
+
+
+def test_bulk_decide_validates_status(hr_client):
+    client, _ = hr_client
+    response = client.post('/api/leaves/requests/bulk_decide/', {'ids': [1], 'status': 'MAYBE'}, format='json')
+    assert response.status_code == 400
+
+
+def test_calendar_returns_per_day_matrix_for_overlapping_leave(hr_client):
+    from apps.employees.models import Department
+
+    client, tenant = hr_client
+    engineering = Department.objects.create(tenant=tenant, name='Engineering')
+    sales = Department.objects.create(tenant=tenant, name='Sales')
+    alice, bob, carol = (_employee(tenant, n) for n in range(3))
+    for employee, department in ((alice, engineering), (bob, engineering), (carol, sales)):
+        employee.department = department
+        employee.save()
+
+    def leave(employee, start, end, status):
+        LeaveRequest.objects.create(
+            tenant=tenant, employee=employee, start_date=start, end_date=end,
+            duration_days=Decimal('1.0'), reason='Trip', status=status,
+        )
+
+    leave(alice, date(2026, 3, 4), date(2026, 3, 10), 'APPROVED')  # Wed to next Tue
+    leave(bob, date(2026, 3, 2), date(2026, 3, 2), 'PENDING')  # before the window
+    leave(bob, date(2026, 3, 6), date(2026, 3, 6), 'PENDING')
+    leave(bob, date(2026, 3, 5), date(2026, 3, 5), 'REJECTED')
+    leave(carol, date(2026, 3, 5), date(2026, 3, 5), 'APPROVED')
+
+    response = client.get('/api/leaves/requests/calendar/', {
+        'start': '2026-03-05', 'end': '2026-03-09', 'department': engineering.pk,
+    })
+
+    assert response.status_code == 200
+    data = response.data
+    assert data['headcount'] == 2
+    rows = {row['employee_id']: row['days'] for row in data['employees']}
+    assert rows == {alice.pk: 'AA--A', bob.pk: '.P--.'}
+    assert data['available'] == [1, 1, None, None, 1]
+
+
+def test_calendar_rejects_oversized_window(hr_client):
+    client, _ = hr_client
+    response = client.get('/api/leaves/requests/calendar/', {'start': '2026-01-01', 'end': '2026-12-31'})
+    assert response.status_code == 400
+
+
+def test_duplicate_holiday_or_calendar_is_rejected(hr_client):
+    client, tenant = hr_client
+    other_tenant = Tenant.objects.create(name='Other', slug='other')
+    Holiday.objects.create(tenant=other_tenant, date=date(2026, 12, 25), name='Christmas')
+
+    payload = {'date': '2026-12-25', 'name': 'Christmas'}
+    assert client.post('/api/leaves/holidays/', payload).status_code == 201
+    response = client.post('/api/leaves/holidays/', payload)
+    assert response.status_code == 400
+    assert 'date' in response.data
+
+    assert client.post('/api/leaves/working-calendar/', {'weekend_days': [5, 6]}, format='json').status_code == 201
+    assert client.post('/api/leaves/working-calendar/', {'weekend_days': [4, 5]}, format='json').status_code == 400
+    assert WorkingCalendar.objects.get(tenant=tenant).weekend_days == [5, 6]
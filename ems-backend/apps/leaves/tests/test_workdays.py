@@ -0,0 +1,55 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+from django.core.cache import cache
+
+from apps.core.models import Tenant
+from apps.leaves.models import Holiday, WorkingCalendar
+from apps.leaves.workdays import WorkingDayCalendar, get_calendar
+
+
+@pytest.fixture(autouse=True)
+def clear_calendar_cache():
+    # get_calendar caches per tenant id, and the next test's tenant can reuse the id
+    yield
+    cache.clear()
+
+
+def _walk(calendar, start, end):
+    days, cur = 0, start
+    while cur <= end:
+        days += calendar.is_working_day(cur)
+        cur += timedelta(days=1)
+    return days
+
+
+def test_working_days_matches_day_by_day_walk():
+    rng = random.Random(7)
+    holidays = [date(2026, 1, 1), date(2026, 4, 3), date(2026, 12, 25), date(2026, 12, 26)]
+    for weekend in [(5, 6), (4, 5), (6,)]:
+        calendar = WorkingDayCalendar(weekend, holidays)
+        starts, ends = [], []
+        for _ in range(200):
+            start = date(2025, 12, 1) + timedelta(days=rng.randrange(400))
+            end = start + timedelta(days=rng.randrange(-3, 60))
+            starts.append(start)
+            ends.append(end)
+            assert calendar.working_days(start, end) == _walk(calendar, start, end)
+        assert list(calendar.working_days_bulk(starts, ends)) == [
+            calendar.working_days(s, e) for s, e in zip(starts, ends)
+        ]
+
+
+@pytest.mark.django_db
+def test_tenant_calendar_uses_weekend_and_holidays_and_invalidates():
+    tenant = Tenant.objects.create(name='Acme', slug='acme')
+    week = (date(2026, 1, 5), date(2026, 1, 11))  # Monday to Sunday
+
+    assert get_calendar(tenant).working_days(*week) == 5
+
+    WorkingCalendar.objects.create(tenant=tenant, weekend_days=[4, 5])
+    Holiday.objects.create(tenant=tenant, date=date(2026, 1, 6), name='Epiphany')
+    Holiday.objects.create(tenant=tenant, date=date(2026, 1, 9), name='Friday holiday')
+
+    assert get_calendar(tenant).working_days(*week) == 4
@@ -1,10 +1,19 @@
 from rest_framework.routers import DefaultRouter
-from .views import LeaveBalanceViewSet, LeavePolicyWindowViewSet, LeaveRequestViewSet, LeaveTypeViewSet
+from .views import (
+    HolidayViewSet,
+    LeaveBalanceViewSet,
+    LeavePolicyWindowViewSet,
+    LeaveRequestViewSet,
+    LeaveTypeViewSet,
+    WorkingCalendarViewSet,
+)
 
 router = DefaultRouter()
 router.register('types', LeaveTypeViewSet)
 router.register('policy-windows', LeavePolicyWindowViewSet)
 router.register('balances', LeaveBalanceViewSet)
 router.register('requests', LeaveRequestViewSet)
+router.register('holidays', HolidayViewSet)
+router.register('working-calendar', WorkingCalendarViewSet)
 
 urlpatterns = router.urls
@@ -1,11 +1,26 @@
-from datetime import timedelta
+from .workdays import WorkingDayCalendar, get_calendar
 
 
-def business_days(start_date, end_date):
-    days = 0
-    cur = start_date
-    while cur <= end_date:
-        if cur.weekday() < 5:
-            days += 1
-        cur += timedelta(days=1)
-    return days
+def business_days(start_date, end_date, tenant=None):
+    """Working days between two dates inclusive, using the tenant's calendar when given."""
+    calendar = get_calendar(tenant) if tenant is not None else WorkingDayCalendar()
+    return calendar.working_days(start_date, end_date)
+
+
+def leave_decision_email(leave_request):
+    """Subject and body of the email telling an employee their request was approved or rejected."""
+    user = leave_request.employee.user
+    subject = f"Leave Request {leave_request.status.title()}"
+
+    leave_name = leave_request.leave_type.name if leave_request.leave_type else 'General'
+    message = f"Hello {user.first_name},\n\nYour recent leave request has been marked as **{leave_request.status}**.\n\n"
+    message += f"Details:\n"
+    message += f"Leave Type: {leave_name}\n"
+    message += f"Duration: {leave_request.start_date} to {leave_request.end_date} ({leave_request.duration_days} days)\n"
+
+    hr_notes = getattr(leave_request, 'hr_notes', '')
+    if hr_notes:
+        message += f"\nHR Notes:\n{hr_notes}\n"
+
+    message += "\nLog in to the EMS Dashboard for full details regarding your leave balance.\n\nBest,\nHR Management"
+    return subject, message
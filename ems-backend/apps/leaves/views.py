@@ -1,9 +1,24 @@
+from django.db import transaction
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
 
-from apps.core.permissions import IsAdminOrHRManager, IsSelfOrAdminOrHR
+from apps.core.permissions import IsAdminOrHRManager, IsSelfOrAdminOrHR, IsStaffMember
 from apps.core.tenancy import resolve_tenant
-from .models import LeaveBalance, LeavePolicyWindow, LeaveRequest, LeaveType
-from .serializers import LeaveBalanceSerializer, LeavePolicyWindowSerializer, LeaveRequestSerializer, LeaveTypeSerializer
+from ems_core.utils_email import queue_emails
+from .availability import MAX_WINDOW_DAYS, team_calendar
+from .models import Holiday, LeaveBalance, LeavePolicyWindow, LeaveRequest, LeaveType, WorkingCalendar
+from .services import decide_pending, with_pending_days
+from .utils import leave_decision_email
+from .serializers import (
+    HolidaySerializer,
+    LeaveDecisionSerializer,
+    LeaveBalanceSerializer,
+    LeavePolicyWindowSerializer,
+    LeaveRequestSerializer,
+    LeaveTypeSerializer,
+    WorkingCalendarSerializer,
+)
 
 
 class LeaveTypeViewSet(viewsets.ModelViewSet):
@@ -43,6 +58,43 @@ class LeavePolicyWindowViewSet(viewsets.ModelViewSet):
         serializer.save(tenant=resolve_tenant(self.request))
 
 
+class HolidayViewSet(viewsets.ModelViewSet):
+    queryset = Holiday.objects.all()
+    serializer_class = HolidaySerializer
+
+    def get_queryset(self):
+        user = self.request.user
+        tenant = resolve_tenant(self.request)
+        if not user.is_superuser and not tenant:
+            return Holiday.objects.none()
+        return Holiday.objects.filter(tenant=tenant)
+
+    def get_permissions(self):
+        from rest_framework.permissions import IsAuthenticated
+        if self.action in {'list', 'retrieve'}:
+            return [IsAuthenticated()]
+        return [IsAdminOrHRManager()]
+
+    def perform_create(self, serializer):
+        serializer.save(tenant=resolve_tenant(self.request))
+
+
+class WorkingCalendarViewSet(viewsets.ModelViewSet):
+    queryset = WorkingCalendar.objects.all()
+    serializer_class = WorkingCalendarSerializer
+    permission_classes = [IsAdminOrHRManager]
+
+    def get_queryset(self):
+        user = self.request.user
+        tenant = resolve_tenant(self.request)
+        if not user.is_superuser and not tenant:
+            return WorkingCalendar.objects.none()
+        return WorkingCalendar.objects.filter(tenant=tenant)
+
+    def perform_create(self, serializer):
+        serializer.save(tenant=resolve_tenant(self.request))
+
+
 class LeaveBalanceViewSet(viewsets.ModelViewSet):
     queryset = LeaveBalance.objects.select_related('employee', 'leave_type').all()
     serializer_class = LeaveBalanceSerializer
@@ -52,7 +104,9 @@ class LeaveBalanceViewSet(viewsets.ModelViewSet):
         tenant = resolve_tenant(self.request)
         if not user.is_superuser and not tenant:
             return LeaveBalance.objects.none()
-        return LeaveBalance.objects.select_related('employee', 'leave_type').filter(tenant=tenant)
+        return with_pending_days(
+            LeaveBalance.objects.select_related('employee', 'leave_type').filter(tenant=tenant)
+        )
 
     def get_permissions(self):
         if self.action in {'list', 'create', 'update', 'partial_update', 'destroy'}:
@@ -82,10 +136,93 @@ class LeaveRequestViewSet(viewsets.ModelViewSet):
         return queryset.filter(employee__user=user)
 
     def get_permissions(self):
-        if self.action in {'update', 'partial_update', 'destroy'}:
+        if self.action in {'update', 'partial_update', 'destroy', 'bulk_decide'}:
             return [IsAdminOrHRManager()]
+        if self.action == 'calendar':
+            return [IsStaffMember()]
         return [IsSelfOrAdminOrHR()]
 
+    @action(detail=False, methods=['get'])
+    def calendar(self, request):
+        """
+        Who is off between ?start= and ?end= (at most MAX_WINDOW_DAYS apart),
+        optionally for one ?department=. Admins and HR see any department;
+        other staff see their own department and those they manage.
+        """
+        from django.utils.dateparse import parse_date
+        from apps.employees.models import EmployeeProfile
+
+        tenant = resolve_tenant(request)
+        if not tenant:
+            return Response({'detail': 'Tenant context missing.'}, status=400)
+        try:
+            start = parse_date(request.query_params.get('start', ''))
+            end = parse_date(request.query_params.get('end', ''))
+        except ValueError:
+            start = end = None
+        if not start or not end:
+            return Response({'detail': 'start and end dates (YYYY-MM-DD) are required.'}, status=400)
+        if end < start or (end - start).days >= MAX_WINDOW_DAYS:
+            return Response({'detail': f'end must be on or after start and within {MAX_WINDOW_DAYS} days.'}, status=400)
+
+        employees = EmployeeProfile.objects.filter(tenant=tenant, is_deleted=False)
+        department = request.query_params.get('department')
+        if department and not department.isdigit():
+            return Response({'detail': 'department must be an id.'}, status=400)
+        user = request.user
+        if user.role not in {'ADMIN', 'HR_MANAGER'}:
+            own = getattr(getattr(user, 'employee_profile', None), 'department_id', None)
+            allowed = set(user.managed_departments.values_list('id', flat=True)) | ({own} if own else set())
+            if not department and own:
+                department = own
+            if not department or str(department) not in {str(d) for d in allowed}:
+                return Response({'detail': 'You can only view your own or managed departments.'}, status=403)
+        if department:
+            employees = employees.filter(department_id=department)
+
+        statuses = ('APPROVED',) if request.query_params.get('status') == 'APPROVED' else ('APPROVED', 'PENDING')
+        return Response(team_calendar(tenant, start, end, employees, statuses=statuses))
+
+    @action(detail=False, methods=['post'])
+    def bulk_decide(self, request):
+        """
+        Approve or reject many pending requests in one transaction:
+        {"ids": [...], "status": "APPROVED" | "REJECTED"}.
+        """
+        serializer = LeaveDecisionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = set(serializer.validated_data['ids'])
+        new_status = serializer.validated_data['status']
+
+        with transaction.atomic():
+            decided, insufficient = decide_pending(
+                LeaveRequest.objects.filter(pk__in=self.get_queryset().filter(pk__in=ids).values('pk')),
+                new_status,
+            )
+            decided_ids = [leave_request.pk for leave_request in decided]
+            # Notifications go into the outbox with the decisions and are sent in one batch.
+            # Only row-locked PENDING requests are decided, so each decision queues one email;
+            # no dedupe key, so a request that is re-opened and decided again still notifies.
+            emails = []
+            for leave_request in LeaveRequest.objects.select_related(
+                'tenant', 'employee__user', 'leave_type'
+            ).filter(pk__in=decided_ids):
+                subject, message = leave_decision_email(leave_request)
+                emails.append({
+                    'subject': subject,
+                    'message': message,
+                    'recipient_list': [leave_request.employee.user.email],
+                    'tenant': leave_request.tenant,
+                })
+            queue_emails(emails)
+
+        return Response({
+            'status': new_status,
+            'updated': decided_ids,
+            'skipped': sorted(ids - set(decided_ids)),
+            'insufficient_balance': insufficient,
+        })
+
     def perform_create(self, serializer):
         user = self.request.user
         tenant = resolve_tenant(self.request)
@@ -3,9 +3,13 @@ from decimal import Decimal
 import logging
 from django.db import transaction
 from .models import PayrollRun, Payslip, PayslipComponent
+from .utils import month_bounds, pro_rata_deduction, unpaid_days_by_employee
 
 logger = logging.getLogger(__name__)
 
+# Employees per batch when aggregating unpaid leave and absences
+PAYROLL_CHUNK_SIZE = 500
+
 @shared_task(bind=True, max_retries=2)
 def generate_payslips_task(self, payroll_run_id, tenant_id=None, employee_ids=None):
     """
@@ -14,6 +18,7 @@ def generate_payslips_task(self, payroll_run_id, tenant_id=None, employee_ids=No
     """
     try:
         from apps.employees.models import EmployeeProfile
+        from apps.leaves.workdays import get_calendar
         from .models import SalaryStructure, PayrollRun
 
         # Fetch the run once
@@ -49,58 +54,77 @@ def generate_payslips_task(self, payroll_run_id, tenant_id=None, employee_ids=No
             payslips_to_create = []
             components_data_map = {} # employee_id -> list of component dicts
 
-            for employee in qs:
-                # Deduplication check via local set
-                if employee.id in existing_employee_ids:
-                    continue
+            # Unpaid leave and absences are deducted at the month's daily rate
+            work_calendar = get_calendar(tenant_id)
+            working_days_in_month = work_calendar.working_days(*month_bounds(payroll_run.month))
+
+            # Deduplication check via local set
+            employees = [employee for employee in qs.order_by('id') if employee.id not in existing_employee_ids]
+            for offset in range(0, len(employees), PAYROLL_CHUNK_SIZE):
+                chunk = employees[offset:offset + PAYROLL_CHUNK_SIZE]
+                unpaid_days = unpaid_days_by_employee([employee.id for employee in chunk], payroll_run.month, work_calendar)
 
-                base_salary = Decimal(str(employee.base_salary))
-                total_earnings = Decimal('0.00')
-                total_deductions = Decimal('0.00')
+                for employee in chunk:
+                    base_salary = Decimal(str(employee.base_salary))
+                    total_earnings = Decimal('0.00')
+                    total_deductions = Decimal('0.00')
                 
-                # Check for SalaryStructure (OneToOne)
-                structure = None
-                try:
-                    # Accessing via select_related is now cached
-                    structure = employee.salary_structure
-                except Exception:
+                    # Check for SalaryStructure (OneToOne)
                     structure = None
+                    try:
+                        # Accessing via select_related is now cached
+                        structure = employee.salary_structure
+                    except Exception:
+                        structure = None
                     
-                pending_components = []
+                    pending_components = []
                 
-                if structure:
-                    # Accessing prefetched components
-                    components = structure.components.all()
-                    for struct_comp in components:
-                        val = Decimal(str(struct_comp.value))
-                        comp_name = struct_comp.name or (struct_comp.component.name if struct_comp.component else 'Custom Component')
-                        comp_type = struct_comp.component_type or (struct_comp.component.component_type if struct_comp.component else 'EARNING')
+                    if structure:
+                        # Accessing prefetched components
+                        components = structure.components.all()
+                        for struct_comp in components:
+                            val = Decimal(str(struct_comp.value))
+                            comp_name = struct_comp.name or (struct_comp.component.name if struct_comp.component else 'Custom Component')
+                            comp_type = struct_comp.component_type or (struct_comp.component.component_type if struct_comp.component else 'EARNING')
                         
-                        if comp_type == 'EARNING':
-                            total_earnings += val
-                        else:
-                            total_deductions += val
+                            if comp_type == 'EARNING':
+                                total_earnings += val
+                            else:
+                                total_deductions += val
                         
-                        pending_components.append({
-                            'name': comp_name,
-                            'component_type': comp_type,
-                            'value': struct_comp.value
-                        })
-
-                gross = base_salary + total_earnings
-                net = gross - total_deductions
+                            pending_components.append({
+                                'name': comp_name,
+                                'component_type': comp_type,
+                                'value': struct_comp.value
+                            })
+
+                    leave_days, absent_days = unpaid_days.get(employee.id, (0, 0))
+                    # Never deduct more days than the month has
+                    absent_days = min(absent_days, max(working_days_in_month - leave_days, 0))
+                    for label, days in (('Unpaid Leave', leave_days), ('Absence', absent_days)):
+                        amount = pro_rata_deduction(base_salary, days, working_days_in_month)
+                        if amount:
+                            total_deductions += amount
+                            pending_components.append({
+                                'name': f'{label} ({days} days)',
+                                'component_type': 'DEDUCTION',
+                                'value': amount
+                            })
+
+                    gross = base_salary + total_earnings
+                    net = gross - total_deductions
                 
-                ps = Payslip(
-                    tenant_id=tenant_id,
-                    payroll_run=payroll_run,
-                    employee=employee,
-                    gross_salary=gross,
-                    total_deductions=total_deductions,
-                    tax_deduction=Decimal('0.00'),
-                    net_salary=net,
-                )
-                payslips_to_create.append(ps)
-                components_data_map[employee.id] = pending_components
+                    ps = Payslip(
+                        tenant_id=tenant_id,
+                        payroll_run=payroll_run,
+                        employee=employee,
+                        gross_salary=gross,
+                        total_deductions=total_deductions,
+                        tax_deduction=Decimal('0.00'),
+                        net_salary=net,
+                    )
+                    payslips_to_create.append(ps)
+                    components_data_map[employee.id] = pending_components
 
             # 3. Bulk create Payslips
             # Note: We don't use ignore_conflicts=True to ensure we get IDs back where supported
@@ -0,0 +1,59 @@
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from apps.attendance.models import AttendanceLog
+from apps.core.models import Tenant
+from apps.employees.models import EmployeeProfile
+from apps.leaves.models import LeaveRequest, LeaveType
+from apps.payroll.models import PayrollRun, Payslip
+from apps.payroll.tasks import generate_payslips_task
+
+
+def _employee(tenant, n):
+    user = get_user_model().objects.create_user(email=f'emp{n}@acme.test', password='password123', tenant=tenant)
+    return EmployeeProfile.objects.create(
+        tenant=tenant, user=user, employee_id=f'E{n}',
+        base_salary=Decimal('2200.00'), joining_date=date(2024, 1, 1),
+    )
+
+
+@pytest.mark.django_db
+def test_unpaid_leave_and_absences_are_deducted_pro_rata():
+    cache.clear()
+    tenant = Tenant.objects.create(name='Acme', slug='acme')
+    unpaid = LeaveType.objects.create(tenant=tenant, name='Unpaid', max_days_per_year=30, is_paid=False)
+    annual = LeaveType.objects.create(tenant=tenant, name='Annual', max_days_per_year=20)
+    absent, present, untouched = (_employee(tenant, n) for n in range(3))
+
+    def leave(employee, leave_type, start, end, status='APPROVED'):
+        LeaveRequest.objects.create(
+            tenant=tenant, employee=employee, leave_type=leave_type, start_date=start, end_date=end,
+            duration_days=Decimal('1.0'), reason='Trip', status=status,
+        )
+
+    # March 2026 has 22 working days, so a day is worth 100.00
+    leave(absent, unpaid, date(2026, 3, 30), date(2026, 4, 3))  # 2 days fall in March
+    leave(absent, unpaid, date(2026, 3, 31), date(2026, 3, 31))  # Overlaps the above; not deducted twice
+    leave(absent, annual, date(2026, 3, 9), date(2026, 3, 10))
+    leave(present, unpaid, date(2026, 3, 2), date(2026, 3, 6), status='PENDING')
+    for day in (10, 11, 14):  # on paid leave, a working day, a Saturday
+        AttendanceLog.objects.create(tenant=tenant, employee=absent, date=date(2026, 3, day), status='ABSENT')
+
+    run = PayrollRun.objects.create(tenant=tenant, month=date(2026, 3, 1))
+    with mock.patch('apps.payroll.tasks.PAYROLL_CHUNK_SIZE', 2):
+        generate_payslips_task(payroll_run_id=run.pk, tenant_id=tenant.pk)
+
+    payslip = Payslip.objects.get(employee=absent)
+    assert sorted(payslip.breakdown.values_list('name', 'value')) == [
+        ('Absence (1 days)', Decimal('100.00')),
+        ('Unpaid Leave (2 days)', Decimal('200.00')),
+    ]
+    assert (payslip.total_deductions, payslip.net_salary) == (Decimal('300.00'), Decimal('1900.00'))
+    for employee in (present, untouched):
+        payslip = Payslip.objects.get(employee=employee)
+        assert (payslip.total_deductions, payslip.breakdown.count()) == (Decimal('0.00'), 0)
@@ -1,4 +1,6 @@
-from decimal import Decimal
+import calendar
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal
 
 
 def compute_component_amount(base_salary: Decimal, calculation_type: str, value: Decimal) -> Decimal:
@@ -41,3 +43,76 @@ def calculate_payroll(component_rows, base_salary=Decimal('0'), tax_slabs=()):
         'tax': tax,
         'net': (gross - total_deductions).quantize(Decimal('0.01')),
     }
+
+
+def month_bounds(month):
+    """First and last day of the month containing ``month``."""
+    return month.replace(day=1), month.replace(day=calendar.monthrange(month.year, month.month)[1])
+
+
+def unpaid_days_by_employee(employee_ids, month, work_calendar):
+    """
+    ``{employee_id: (unpaid_leave_days, absent_days)}`` for one chunk of employees.
+
+    Unpaid leave is approved leave of a type with ``is_paid=False``, clipped to
+    the month, merged where an employee's requests overlap and counted in
+    working days (vectorised over the whole chunk).
+    Absences are ABSENT attendance logs in the month on working days not
+    already covered by approved leave, counted per employee in the database.
+    One query each, whatever the chunk size.
+    """
+    from django.db.models import Count, Exists, OuterRef
+    from apps.attendance.models import AttendanceLog
+    from apps.leaves.availability import overlapping
+    from apps.leaves.models import LeaveRequest
+
+    first, last = month_bounds(month)
+    days = defaultdict(lambda: [0, 0])
+
+    unpaid = overlapping(
+        LeaveRequest.objects.filter(employee_id__in=employee_ids, status='APPROVED', leave_type__is_paid=False),
+        first, last,
+    ).values_list('employee_id', 'start_date', 'end_date')
+    # Merge each employee's overlapping leaves so a day on two unpaid requests is deducted once
+    ranges = []
+    for employee_id, start, end in sorted(unpaid):
+        start, end = max(start, first), min(end, last)
+        if ranges and ranges[-1][0] == employee_id and start <= ranges[-1][2]:
+            ranges[-1][2] = max(ranges[-1][2], end)
+        else:
+            ranges.append([employee_id, start, end])
+    if ranges:
+        counts = work_calendar.working_days_bulk([start for _, start, _ in ranges], [end for _, _, end in ranges])
+        for (employee_id, _, _), count in zip(ranges, counts):
+            days[employee_id][0] += int(count)
+
+    on_leave = LeaveRequest.objects.filter(
+        employee_id=OuterRef('employee_id'),
+        status='APPROVED',
+        start_date__lte=OuterRef('date'),
+        end_date__gte=OuterRef('date'),
+    )
+    holidays = [day for day in work_calendar.holidays if first <= day <= last]
+    absences = (
+        AttendanceLog.objects.filter(employee_id__in=employee_ids, status='ABSENT', date__range=(first, last))
+        # __week_day counts Sunday=1 ... Saturday=7
+        .exclude(date__week_day__in=[(weekday + 1) % 7 + 1 for weekday in work_calendar.weekend])
+        .exclude(date__in=holidays)
+        .exclude(Exists(on_leave))
+        .order_by()
+        .values('employee_id')
+        .annotate(days=Count('id'))
+        .values_list('employee_id', 'days')
+    )
+    for employee_id, count in absences:
+        days[employee_id][1] += count
+
+    return {employee_id: tuple(counts) for employee_id, counts in days.items()}
+
+
+def pro_rata_deduction(base_salary, days, working_days_in_month):
+    """Pay for ``days`` working days at the month's daily rate, never more than the base salary."""
+    if not days or not working_days_in_month:
+        return Decimal('0.00')
+    amount = Decimal(str(base_salary)) * Decimal(days) / Decimal(working_days_in_month)
+    return min(amount, Decimal(str(base_salary))).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
@@ -0,0 +1,160 @@
+"""
+Shared HTTP client for Gemini calls.
+
+One pooled ``requests.Session`` per worker process keeps TLS connections alive
+across calls, every request carries a timeout, transient failures are retried
+with jittered exponential backoff, and a circuit breaker stops hammering the API
+while it is down.
+"""
+import logging
+import os
+import random
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = 'gemini-2.5-flash'
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class AIClientError(Exception):
+    """The AI API could not be reached after retries."""
+
+
+class CircuitOpenError(AIClientError):
+    """Calls are short-circuited because the API has been failing."""
+
+
+class CircuitBreaker:
+    """
+    Opens after ``failure_threshold`` consecutive failures and rejects calls for
+    ``reset_timeout`` seconds, then lets a single trial call through (half-open).
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                # Half-open: admit one trial call and re-arm the timer for the rest.
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning(f"AI circuit opened after {self._failures} consecutive failures")
+                self._opened_at = time.monotonic()
+
+
+class GeminiClient:
+    def __init__(self, base_url=None, timeout=None, max_retries=None, backoff_base=None,
+                 pool_size=None, breaker=None):
+        self.base_url = (base_url or getattr(settings, 'GEMINI_API_BASE_URL',
+                                             'https://generativelanguage.googleapis.com/v1beta')).rstrip('/')
+        self.timeout = timeout or (
+            getattr(settings, 'AI_HTTP_CONNECT_TIMEOUT', 5),
+            getattr(settings, 'AI_HTTP_READ_TIMEOUT', 60),
+        )
+        self.max_retries = getattr(settings, 'AI_HTTP_MAX_RETRIES', 2) if max_retries is None else max_retries
+        self.backoff_base = getattr(settings, 'AI_HTTP_BACKOFF_BASE', 0.5) if backoff_base is None else backoff_base
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=getattr(settings, 'AI_CIRCUIT_FAILURE_THRESHOLD', 5),
+            reset_timeout=getattr(settings, 'AI_CIRCUIT_RESET_SECONDS', 30),
+        )
+
+        pool_size = pool_size or max(10, getattr(settings, 'AI_RESCORE_MAX_WORKERS', 4))
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({'Content-Type': 'application/json'})
+
+    def _backoff(self, attempt):
+        # Full jitter: sleep a random amount up to the exponential ceiling.
+        return random.uniform(0, self.backoff_base * (2 ** attempt))
+
+    def generate_content(self, api_key, prompt, model=DEFAULT_MODEL, json_response=False, timeout=None):
+        """
+        POST a single-prompt generateContent request and return the final response.
+        Non-retryable HTTP errors (bad key, bad request) are returned for the caller
+        to inspect; transport failures that outlast the retries raise AIClientError.
+        """
+        payload = {'contents': [{'parts': [{'text': prompt}]}]}
+        if json_response:
+            payload['generationConfig'] = {'responseMimeType': 'application/json'}
+        url = f"{self.base_url}/models/{model}:generateContent"
+        return self.post(url, payload, params={'key': api_key}, timeout=timeout)
+
+    def post(self, url, payload, params=None, timeout=None):
+        if not self.breaker.allow():
+            raise CircuitOpenError('AI service is temporarily unavailable; try again shortly.')
+
+        response = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(url, json=payload, params=params, timeout=timeout or self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    self.breaker.record_failure()
+                    raise AIClientError(f"AI request failed: {e}") from e
+                logger.warning(f"AI request failed ({e}); retrying")
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    self.breaker.record_success()
+                    return response
+                if attempt == self.max_retries:
+                    break
+                logger.warning(f"AI request returned {response.status_code}; retrying")
+            time.sleep(self._backoff(attempt))
+
+        # 429 is a per-key quota problem, not an outage, so it does not trip the breaker.
+        if response.status_code != 429:
+            self.breaker.record_failure()
+        return response
+
+
+def extract_response_text(response_data):
+    """Text of the first candidate part in a generateContent response."""
+    return response_data['candidates'][0]['content']['parts'][0]['text']
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_ai_client():
+    """The worker's shared client; rebuilt after a fork so processes never share sockets."""
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                _client = GeminiClient()
+                _client_pid = pid
+    return _client
@@ -0,0 +1,226 @@
+"""
+Bulk parsing of resumes that were uploaded before a tenant enabled AI parsing.
+
+Rows are walked in primary-key order in fixed-size chunks. Each chunk is parsed
+with bounded concurrency and written back with one bulk_update. The id before
+the first unfinished row is checkpointed in the cache so an interrupted run
+resumes where it stopped; rows that failed stay pending and the checkpoint never
+moves past them. A run that reaches the end clears its checkpoint, so later runs
+see rows added (or tenants enabled) since.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from django.core.cache import cache
+from django.db import connections
+
+from .models import AISettings, ApplicantProfile, Candidate, ResumeParseCache
+from .ratelimit import ai_bucket_key, get_ai_rate_limiter
+from .search import candidate_search_document
+from .utils import (
+    RESCORE_FIELDS,
+    analyze_candidate,
+    extract_resume_texts,
+    parse_resume,
+    resume_content_hash,
+    resume_prompt_version,
+)
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_KEY = 'resume_backfill:{kind}:{scope}'
+CHECKPOINT_TIMEOUT = 7 * 24 * 60 * 60
+# Longest a backfill item waits for a rate-limit token before counting as failed
+RATE_LIMIT_WAIT = 120
+
+PROFILE_FIELDS = ['resume_parsed_data', 'skills', 'education', 'experience', 'years_of_experience', 'headline']
+
+
+@dataclass
+class BackfillStats:
+    kind: str
+    processed: int = 0
+    failed: int = 0
+    chunks: int = 0
+    last_id: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self):
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        return (
+            f"{self.kind}: {self.processed} parsed, {self.failed} failed in {self.chunks} chunks, "
+            f"{self.elapsed:.1f}s ({self.rate:.2f}/s), last id {self.last_id}"
+        )
+
+
+def pending_candidates(tenant_id=None):
+    queryset = Candidate.objects.filter(
+        parsed_resume_data={},
+        tenant__ai_settings__is_active=True,
+    ).exclude(resume='').exclude(resume__isnull=True).exclude(tenant__ai_settings__gemini_api_key='')
+    if tenant_id:
+        queryset = queryset.filter(tenant_id=tenant_id)
+    return queryset.select_related('tenant', 'job').order_by('id')
+
+
+def pending_profiles(tenant_id=None):
+    queryset = ApplicantProfile.objects.filter(
+        resume_parsed_data={},
+        user__tenant__ai_settings__is_active=True,
+    ).exclude(current_resume='').exclude(current_resume__isnull=True).exclude(
+        user__tenant__ai_settings__gemini_api_key=''
+    )
+    if tenant_id:
+        queryset = queryset.filter(user__tenant_id=tenant_id)
+    return queryset.select_related('user__tenant').order_by('id')
+
+
+def _checkpoint_key(kind, tenant_id):
+    return CHECKPOINT_KEY.format(kind=kind, scope=tenant_id or 'all')
+
+
+def reset_checkpoint(kind, tenant_id=None):
+    cache.delete(_checkpoint_key(kind, tenant_id))
+
+
+def _prime_extracted_text(items, file_attr, tenant_of, extract_workers):
+    """
+    Extract PDF text for a whole chunk on a process pool and store it in the parse
+    cache, so the threaded parse step only waits on Gemini.
+    """
+    documents, entries = [], []
+    for item in items:
+        file = getattr(item, file_attr)
+        try:
+            with file.open('rb'):
+                data = file.read()
+                content_hash = resume_content_hash(file)
+        except Exception as e:
+            logger.warning(f"Backfill could not read {file.name}: {e}")
+            continue
+        settings = AISettings.get_settings(tenant_of(item))
+        documents.append(data)
+        entries.append((content_hash, resume_prompt_version(settings.prompt_template)))
+
+    for (content_hash, prompt_version), text in zip(entries, extract_resume_texts(documents, extract_workers)):
+        if isinstance(text, str):
+            ResumeParseCache.objects.get_or_create(
+                content_hash=content_hash, prompt_version=prompt_version,
+                defaults={'extracted_text': text},
+            )
+
+
+def _throttle(api_key):
+    if not get_ai_rate_limiter().wait(ai_bucket_key(api_key), timeout=RATE_LIMIT_WAIT):
+        raise ValueError('Timed out waiting for AI rate limit')
+
+
+def _parse(item, file_attr, tenant):
+    # Parse cache hits skip the throttle and spend no rate-limit token
+    return parse_resume(getattr(item, file_attr), tenant=tenant, throttle=_throttle)
+
+
+def _run_chunk(items, work, workers):
+    """Apply ``work`` to every item, at most ``workers`` at a time. Returns (item, result | exception) pairs."""
+    def guarded(item):
+        try:
+            return item, work(item)
+        except Exception as e:
+            return item, e
+        finally:
+            if workers > 1:
+                connections.close_all()
+
+    if workers <= 1:
+        return [guarded(item) for item in items]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(guarded, items))
+
+
+def _backfill(kind, queryset, file_attr, tenant_of, apply_result, fields, model,
+              chunk_size, workers, extract_workers, limit, tenant_id, progress):
+    stats = BackfillStats(kind=kind)
+    checkpoint = _checkpoint_key(kind, tenant_id)
+    stats.last_id = cache.get(checkpoint) or 0
+    first_failed = None
+
+    while limit is None or stats.processed + stats.failed < limit:
+        size = chunk_size if limit is None else min(chunk_size, limit - stats.processed - stats.failed)
+        items = list(queryset.filter(id__gt=stats.last_id)[:size])
+        if not items:
+            cache.delete(checkpoint)
+            break
+
+        if extract_workers and extract_workers > 1:
+            _prime_extracted_text(items, file_attr, tenant_of, extract_workers)
+
+        def work(item):
+            # Apply in the worker too: for candidates this runs the job-match analysis,
+            # another Gemini round trip that would otherwise serialize the chunk
+            result = _parse(item, file_attr, tenant_of(item))
+            if result:
+                apply_result(item, result)
+            return result
+
+        updated = []
+        for item, result in _run_chunk(items, work, workers):
+            if isinstance(result, Exception) or not result:
+                stats.failed += 1
+                first_failed = item.id if first_failed is None else min(first_failed, item.id)
+                logger.warning(f"Backfill failed for {kind} {item.id}: {result}")
+                continue
+            updated.append(item)
+
+        model.objects.bulk_update(updated, fields, batch_size=chunk_size)
+        stats.processed += len(updated)
+        stats.chunks += 1
+        stats.last_id = items[-1].id
+        resume_after = stats.last_id if first_failed is None else min(stats.last_id, first_failed - 1)
+        cache.set(checkpoint, resume_after, CHECKPOINT_TIMEOUT)
+        if progress:
+            progress(stats)
+
+    return stats
+
+
+def _apply_candidate(candidate, parsed):
+    candidate.parsed_resume_data = parsed
+    candidate.search_document = candidate_search_document(candidate.full_name, candidate.email, parsed)
+    if candidate.job:
+        analysis = analyze_candidate(candidate, candidate.job)
+        for name in RESCORE_FIELDS:
+            setattr(candidate, name, analysis[name])
+
+
+def _apply_profile(profile, parsed):
+    profile.resume_parsed_data = parsed
+    profile.skills = parsed.get('skills', [])
+    profile.education = parsed.get('education', [])
+    profile.experience = parsed.get('experience', [])
+    profile.years_of_experience = parsed.get('experience_years', 0)
+    profile.headline = parsed.get('headline', '')
+
+
+def backfill_candidates(tenant_id=None, chunk_size=50, workers=4, extract_workers=None, limit=None, progress=None):
+    return _backfill(
+        'candidates', pending_candidates(tenant_id), 'resume', lambda c: c.tenant,
+        _apply_candidate, ['parsed_resume_data', 'search_document', *RESCORE_FIELDS], Candidate,
+        chunk_size, workers, extract_workers, limit, tenant_id, progress,
+    )
+
+
+def backfill_profiles(tenant_id=None, chunk_size=50, workers=4, extract_workers=None, limit=None, progress=None):
+    return _backfill(
+        'profiles', pending_profiles(tenant_id), 'current_resume', lambda p: p.user.tenant,
+        _apply_profile, PROFILE_FIELDS, ApplicantProfile,
+        chunk_size, workers, extract_workers, limit, tenant_id, progress,
+    )
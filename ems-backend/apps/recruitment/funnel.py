@@ -0,0 +1,102 @@
+"""
+Candidate pipeline funnel.
+
+CandidateFunnelStat keeps, per job and status, how many candidates are there
+now, how many have ever entered and left, and the total time spent by those who
+left. Candidate.save() and delete() call record_move() on every application,
+status change and removal, in the same transaction as the row, so funnel reads
+are a single indexed query over a handful of counter rows. Writes that bypass
+save() (queryset updates, raw SQL) are repaired by reconcile_funnel_counts().
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from .models import Candidate, CandidateFunnelStat
+
+FUNNEL_STAGES = [status for status, _ in Candidate.STATUS_CHOICES]
+
+
+def _bump(tenant_id, job_id, status, **deltas):
+    counter = CandidateFunnelStat.objects.filter(job_id=job_id, status=status)
+    if counter.update(**{field: F(field) + delta for field, delta in deltas.items()}):
+        return
+    try:
+        with transaction.atomic():
+            CandidateFunnelStat.objects.create(tenant_id=tenant_id, job_id=job_id, status=status, **deltas)
+    except IntegrityError:
+        # A concurrent request created the row first; fall back to the atomic increment.
+        counter.update(**{field: F(field) + delta for field, delta in deltas.items()})
+
+
+def record_move(tenant_id, previous, current, moved_at):
+    """
+    Move one candidate between funnel cells. ``previous`` is the
+    ``(job_id, status, stage_entered_at)`` it leaves (None for a new application)
+    and ``current`` the ``(job_id, status)`` it enters (None when deleted).
+    """
+    if previous is not None and previous[0] is not None:
+        job_id, status, entered_at = previous
+        seconds = int((moved_at - entered_at).total_seconds()) if entered_at else 0
+        _bump(tenant_id, job_id, status, current_count=-1, exited_count=1, seconds_in_stage=max(seconds, 0))
+    if current is not None and current[0] is not None:
+        job_id, status = current
+        _bump(tenant_id, job_id, status, current_count=1, entered_count=1)
+
+
+def reconcile_funnel_counts():
+    """
+    Recount candidates per job and status and correct every cell whose
+    current_count has drifted. entered_count moves by the same amount, keeping
+    entered = exited + current. Returns the number of cells corrected.
+    """
+    actual = {
+        (row['job_id'], row['status']): row
+        for row in Candidate.objects.filter(job__isnull=False).order_by()
+        .values('job_id', 'job__tenant_id', 'status').annotate(total=Count('id'))
+    }
+    recorded = {
+        (row['job_id'], row['status']): row
+        for row in CandidateFunnelStat.objects.values('job_id', 'tenant_id', 'status', 'current_count')
+    }
+
+    corrected = 0
+    for key in actual.keys() | recorded.keys():
+        expected = actual[key]['total'] if key in actual else 0
+        delta = expected - recorded[key]['current_count'] if key in recorded else expected
+        if delta:
+            tenant_id = recorded[key]['tenant_id'] if key in recorded else actual[key]['job__tenant_id']
+            # Applied as a delta so moves made while recounting are not overwritten
+            _bump(tenant_id, key[0], key[1], current_count=delta, entered_count=delta)
+            corrected += 1
+    return corrected
+
+
+def job_funnels(jobs):
+    """
+    ``{job_id: [stage, ...]}`` for a JobPosting queryset, in pipeline order.
+    Each stage has its current and cumulative counts, conversion from
+    application, and the average days candidates spent in it.
+    """
+    stats = {}
+    for row in CandidateFunnelStat.objects.filter(job__in=jobs).values(
+        'job_id', 'status', 'current_count', 'entered_count', 'exited_count', 'seconds_in_stage',
+    ):
+        stats[(row['job_id'], row['status'])] = row
+
+    funnels = {}
+    for job_id in jobs.values_list('id', flat=True):
+        applied = stats.get((job_id, 'APPLIED'), {}).get('entered_count', 0)
+        stages = []
+        for status in FUNNEL_STAGES:
+            row = stats.get((job_id, status), {})
+            entered = row.get('entered_count', 0)
+            exited = row.get('exited_count', 0)
+            stages.append({
+                'status': status,
+                'current': row.get('current_count', 0),
+                'entered': entered,
+                'conversion_rate': round(entered / applied * 100, 1) if applied else 0.0,
+                'avg_days_in_stage': round(row['seconds_in_stage'] / exited / 86400, 2) if exited else None,
+            })
+        funnels[job_id] = stages
+    return funnels
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Parses resumes of candidates and applicant profiles that have no parsed data yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', type=int, help='Only backfill this tenant id')
+        parser.add_argument('--only', choices=['candidates', 'profiles'], help='Limit to one kind of record')
+        parser.add_argument('--chunk-size', type=int, default=50)
+        parser.add_argument('--workers', type=int, default=4, help='Concurrent Gemini calls per chunk')
+        parser.add_argument('--extract-workers', type=int, default=0,
+                            help='Processes for PDF text extraction (0 = extract inline)')
+        parser.add_argument('--limit', type=int, help='Stop after this many records')
+        parser.add_argument('--reset', action='store_true', help='Ignore the saved checkpoint and start over')
+        parser.add_argument('--async', dest='run_async', action='store_true',
+                            help='Queue the backfill on Celery instead of running it here')
+
+    def handle(self, *args, **options):
+        from apps.recruitment.backfill import backfill_candidates, backfill_profiles, reset_checkpoint
+        from apps.recruitment.tasks import backfill_resumes_task
+
+        kinds = [options['only']] if options['only'] else ['candidates', 'profiles']
+        tenant_id = options['tenant']
+
+        if options['reset']:
+            for kind in kinds:
+                reset_checkpoint(kind, tenant_id)
+
+        if options['run_async']:
+            task = backfill_resumes_task.delay(
+                tenant_id=tenant_id, kinds=kinds, chunk_size=options['chunk_size'],
+                workers=options['workers'], limit=options['limit'],
+            )
+            self.stdout.write(self.style.SUCCESS(f'Queued resume backfill task {task.id}'))
+            return
+
+        def progress(stats):
+            self.stdout.write(f'  {stats.summary()}')
+
+        runners = {'candidates': backfill_candidates, 'profiles': backfill_profiles}
+        for kind in kinds:
+            self.stdout.write(f'Backfilling {kind}...')
+            stats = runners[kind](
+                tenant_id=tenant_id,
+                chunk_size=options['chunk_size'],
+                workers=options['workers'],
+                extract_workers=options['extract_workers'],
+                limit=options['limit'],
+                progress=progress,
+            )
+            self.stdout.write(self.style.SUCCESS(stats.summary()))
@@ -0,0 +1,98 @@
+# Generated by Django 4.2 on 2026-10-19 12:03
+
+from django.db import OperationalError, migrations, models
+
+# Frozen copies of apps.recruitment.search as of this migration, so later changes
+# to the live module cannot alter what it does.
+SEARCH_DOCUMENT_MAX_LENGTH = 20000
+FTS_TABLE = 'recruitment_candidate_fts'
+FTS_TRIGGERS = [
+    (
+        f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON recruitment_candidate BEGIN '
+        f'INSERT INTO {FTS_TABLE}(rowid, search_document) VALUES (new.id, new.search_document); END'
+    ),
+    (
+        f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON recruitment_candidate BEGIN '
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_document) VALUES ('delete', old.id, old.search_document); END"
+    ),
+    (
+        f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF search_document ON recruitment_candidate BEGIN '
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_document) VALUES ('delete', old.id, old.search_document); "
+        f'INSERT INTO {FTS_TABLE}(rowid, search_document) VALUES (new.id, new.search_document); END'
+    ),
+]
+
+
+def _flatten(value, out):
+    if isinstance(value, str):
+        if value.strip():
+            out.append(value.strip())
+    elif isinstance(value, dict):
+        for item in value.values():
+            _flatten(item, out)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _flatten(item, out)
+
+
+def backfill_search_document(apps, schema_editor):
+    Candidate = apps.get_model('recruitment', 'Candidate')
+    candidates = list(Candidate.objects.only('id', 'full_name', 'email', 'parsed_resume_data'))
+    for candidate in candidates:
+        parts = [candidate.full_name or '', candidate.email or '']
+        _flatten(candidate.parsed_resume_data or {}, parts)
+        candidate.search_document = ' '.join(p for p in parts if p)[:SEARCH_DOCUMENT_MAX_LENGTH]
+    Candidate.objects.bulk_update(candidates, ['search_document'], batch_size=500)
+
+
+def add_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS recruitment_candidate_search_gin ON recruitment_candidate '
+            "USING GIN (to_tsvector('english'::regconfig, COALESCE(search_document, '')))"
+        )
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS recruitment_candidate_search_trgm ON recruitment_candidate '
+            'USING GIN (search_document gin_trgm_ops)'
+        )
+    elif vendor == 'sqlite':
+        try:
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"search_document, content='recruitment_candidate', content_rowid='id')"
+            )
+        except OperationalError:
+            return  # No FTS5; search falls back to icontains
+        for sql in FTS_TRIGGERS:
+            schema_editor.execute(sql)
+        schema_editor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def remove_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS recruitment_candidate_search_gin')
+        schema_editor.execute('DROP INDEX IF EXISTS recruitment_candidate_search_trgm')
+    elif vendor == 'sqlite':
+        for suffix in ('ai', 'ad', 'au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0009_resumeparsecache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='search_document',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(backfill_search_document, migrations.RunPython.noop),
+        migrations.RunPython(add_search_index, remove_search_index),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 4.2 on 2026-10-19 12:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_funnel(apps, schema_editor):
+    """
+    Seed the counters from existing candidates and their status history: every
+    candidate entered APPLIED at applied_at, then each recorded status change
+    leaves one stage and enters the next.
+    """
+    Candidate = apps.get_model('recruitment', 'Candidate')
+    CandidateStatusHistory = apps.get_model('recruitment', 'CandidateStatusHistory')
+    CandidateFunnelStat = apps.get_model('recruitment', 'CandidateFunnelStat')
+
+    history = {}
+    for candidate_id, status, created_at in CandidateStatusHistory.objects.order_by(
+        'candidate_id', 'created_at', 'id'
+    ).values_list('candidate_id', 'status', 'created_at').iterator():
+        history.setdefault(candidate_id, []).append((status, created_at))
+
+    stats = {}
+    candidates = []
+    for candidate in Candidate.objects.only('id', 'tenant_id', 'job_id', 'status', 'applied_at').iterator():
+        # Stage timeline: application, recorded changes, then the current status
+        stages = [('APPLIED', candidate.applied_at)]
+        for status, changed_at in history.get(candidate.id, []):
+            if status != stages[-1][0]:
+                stages.append((status, changed_at))
+        if candidate.status != stages[-1][0]:
+            stages.append((candidate.status, stages[-1][1]))
+        candidate.stage_entered_at = stages[-1][1]
+        candidates.append(candidate)
+        if candidate.job_id is None:
+            continue
+
+        def cell(status):
+            key = (candidate.job_id, status)
+            if key not in stats:
+                stats[key] = CandidateFunnelStat(tenant_id=candidate.tenant_id, job_id=candidate.job_id, status=status)
+            return stats[key]
+
+        for (status, entered_at), (_, left_at) in zip(stages, stages[1:]):
+            stat = cell(status)
+            stat.entered_count += 1
+            stat.exited_count += 1
+            stat.seconds_in_stage += max(int((left_at - entered_at).total_seconds()), 0)
+        stat = cell(stages[-1][0])
+        stat.entered_count += 1
+        stat.current_count += 1
+
+    Candidate.objects.bulk_update(candidates, ['stage_entered_at'], batch_size=500)
+    CandidateFunnelStat.objects.bulk_create(stats.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_emailoutbox'),
+        ('recruitment', '0010_candidate_search_document'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='stage_entered_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='CandidateFunnelStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('APPLIED', 'Application Submitted'), ('UNDER_REVIEW', 'Under Review'), ('SHORTLISTED', 'Shortlisted'), ('INTERVIEWING', 'Interview Scheduled'), ('HIRED', 'Hired'), ('REJECTED', 'Not Selected')], max_length=20)),
+                ('current_count', models.IntegerField(default=0, help_text='Candidates in this status now')),
+                ('entered_count', models.PositiveIntegerField(default=0, help_text='Times a candidate has entered this status')),
+                ('exited_count', models.PositiveIntegerField(default=0, help_text='Times a candidate has left this status')),
+                ('seconds_in_stage', models.BigIntegerField(default=0, help_text='Total time spent in this status by candidates who left it')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='funnel_stats', to='recruitment.jobposting')),
+                ('tenant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='candidate_funnel_stats', to='core.tenant')),
+            ],
+            options={
+                'unique_together': {('job', 'status')},
+            },
+        ),
+        migrations.RunPython(backfill_funnel, migrations.RunPython.noop),
+    ]
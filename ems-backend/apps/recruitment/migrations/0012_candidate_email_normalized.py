@@ -0,0 +1,74 @@
+# Generated by Django 4.2 on 2026-10-19 12:32
+
+from django.db import migrations, models
+from django.db.models.functions import Lower, Trim
+
+FTS_TABLE = 'recruitment_candidate_fts'
+FTS_TRIGGERS = [
+    (
+        f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON recruitment_candidate BEGIN '
+        f'INSERT INTO {FTS_TABLE}(rowid, search_document) VALUES (new.id, new.search_document); END'
+    ),
+    (
+        f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON recruitment_candidate BEGIN '
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_document) VALUES ('delete', old.id, old.search_document); END"
+    ),
+    (
+        f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF search_document ON recruitment_candidate BEGIN '
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_document) VALUES ('delete', old.id, old.search_document); "
+        f'INSERT INTO {FTS_TABLE}(rowid, search_document) VALUES (new.id, new.search_document); END'
+    ),
+]
+
+
+def backfill_email_normalized(apps, schema_editor):
+    """
+    Fill email_normalized for existing candidates. Where a job already has several
+    applications from the same address, the earliest keeps it and the later ones
+    are left NULL so the unique constraint can be added.
+    """
+    Candidate = apps.get_model('recruitment', 'Candidate')
+    Candidate.objects.update(email_normalized=Lower(Trim('email')))
+
+    duplicates = []
+    previous = None
+    for candidate_id, job_id, email in Candidate.objects.filter(job__isnull=False).order_by(
+        'job_id', 'email_normalized', 'applied_at', 'id'
+    ).values_list('id', 'job_id', 'email_normalized').iterator():
+        if (job_id, email) == previous:
+            duplicates.append(candidate_id)
+        previous = (job_id, email)
+    for start in range(0, len(duplicates), 500):
+        Candidate.objects.filter(id__in=duplicates[start:start + 500]).update(email_normalized=None)
+
+
+def restore_search_triggers(apps, schema_editor):
+    # SQLite rebuilds recruitment_candidate for the new constraint, dropping the FTS triggers
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    if FTS_TABLE not in schema_editor.connection.introspection.table_names():
+        return  # No FTS5; search falls back to icontains
+    for sql in FTS_TRIGGERS:
+        schema_editor.execute(sql)
+    schema_editor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruitment', '0011_candidate_funnel'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='email_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=254, null=True),
+        ),
+        migrations.RunPython(backfill_email_normalized, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='candidate',
+            unique_together={('job', 'email_normalized')},
+        ),
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from django.utils import timezone
 
 
 class JobPosting(models.Model):
@@ -31,6 +32,18 @@ class JobPosting(models.Model):
     def __str__(self):
         return f"{self.title} - {self.department}"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        from .utils import invalidate_public_job_feed
+        invalidate_public_job_feed(self.tenant_id)
+
+    def delete(self, *args, **kwargs):
+        tenant_id = self.tenant_id
+        result = super().delete(*args, **kwargs)
+        from .utils import invalidate_public_job_feed
+        invalidate_public_job_feed(tenant_id)
+        return result
+
 
 class Candidate(models.Model):
     tenant = models.ForeignKey('core.Tenant', on_delete=models.CASCADE, null=True, blank=True, related_name='candidates')
@@ -55,6 +68,9 @@ class Candidate(models.Model):
     # Basic Information
     full_name = models.CharField(max_length=150)
     email = models.EmailField()
+    # Lower-cased email, unique per job so duplicate applications are an index lookup.
+    # NULL only for legacy duplicates left over when the constraint was introduced.
+    email_normalized = models.CharField(max_length=254, null=True, blank=True, editable=False)
     phone = models.CharField(max_length=20, blank=True)
     
     # Job Reference
@@ -104,6 +120,9 @@ class Candidate(models.Model):
 
     # HR Notes (Hidden from Applicants)
     hr_notes = models.TextField(blank=True)
+
+    # Flattened name/email/parsed resume text; indexed for full-text search (see search.py)
+    search_document = models.TextField(blank=True, editable=False)
     
     # Interview Details
     interview_scheduled_at = models.DateTimeField(null=True, blank=True)
@@ -114,14 +133,64 @@ class Candidate(models.Model):
     applied_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     reviewed_at = models.DateTimeField(null=True, blank=True)
+    # When the candidate entered their current status (for time-in-stage analytics)
+    stage_entered_at = models.DateTimeField(null=True, blank=True, editable=False)
     
     class Meta:
         ordering = ['-applied_at']
+        unique_together = ('job', 'email_normalized')
         indexes = [
             models.Index(fields=['status', 'applied_at']),
             models.Index(fields=['user', 'status']),
         ]
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if {'job_id', 'status', 'stage_entered_at'} <= set(field_names):
+            instance._funnel_stage = (instance.job_id, instance.status, instance.stage_entered_at)
+        return instance
+
+    def save(self, *args, **kwargs):
+        from .search import candidate_search_document
+
+        self.search_document = candidate_search_document(self.full_name, self.email, self.parsed_resume_data)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'full_name', 'email', 'parsed_resume_data'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'search_document'}
+        if self._state.adding or self.email_normalized is not None:
+            self.email_normalized = self.email.strip().lower()
+            if update_fields is not None and 'email' in update_fields:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'email_normalized'}
+
+        # Keep the per-job funnel counters in step with applications and status changes.
+        # Instances loaded without job/status/stage_entered_at are not tracked.
+        previous = None if self._state.adding else getattr(self, '_funnel_stage', None)
+        moved = self._state.adding or (previous is not None and previous[:2] != (self.job_id, self.status))
+        if moved:
+            self.stage_entered_at = timezone.now()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'stage_entered_at'}
+        if moved:
+            from .funnel import record_move
+            # Counters commit or roll back together with the row they describe
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                record_move(self.tenant_id, previous, (self.job_id, self.status), self.stage_entered_at)
+        else:
+            super().save(*args, **kwargs)
+        self._funnel_stage = (self.job_id, self.status, self.stage_entered_at)
+
+    def delete(self, *args, **kwargs):
+        stage = getattr(self, '_funnel_stage', None)
+        if stage is None:
+            return super().delete(*args, **kwargs)
+        from .funnel import record_move
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            record_move(self.tenant_id, stage, None, timezone.now())
+        return result
+
     def __str__(self):
         job_title = self.job.title if self.job else "Unknown Position"
         return f"{self.full_name} - {job_title}"
@@ -252,3 +321,44 @@ class CandidateStatusHistory(models.Model):
 
     def __str__(self):
         return f"{self.candidate.full_name} -> {self.status} at {self.created_at}"
+
+
+class ResumeParseCache(models.Model):
+    """
+    Content-addressed store of resume parsing results.
+    Keyed by the SHA-256 of the uploaded file and a hash of the prompt template, so
+    the same resume uploaded to several jobs or tenants is only parsed once.
+    """
+    content_hash = models.CharField(max_length=64)
+    prompt_version = models.CharField(max_length=64)
+    extracted_text = models.TextField(blank=True)
+    parsed_data = models.JSONField(default=dict, blank=True)
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('content_hash', 'prompt_version')
+
+    def __str__(self):
+        return f"Resume cache {self.content_hash[:12]} (v {self.prompt_version[:8]})"
+
+
+class CandidateFunnelStat(models.Model):
+    """
+    Per-job, per-status pipeline counters, maintained by Candidate.save()/delete()
+    (see funnel.py) so funnel analytics never scan candidates or their history.
+    """
+    tenant = models.ForeignKey('core.Tenant', on_delete=models.CASCADE, null=True, blank=True, related_name='candidate_funnel_stats')
+    job = models.ForeignKey(JobPosting, on_delete=models.CASCADE, related_name='funnel_stats')
+    status = models.CharField(max_length=20, choices=Candidate.STATUS_CHOICES)
+    current_count = models.IntegerField(default=0, help_text="Candidates in this status now")
+    entered_count = models.PositiveIntegerField(default=0, help_text="Times a candidate has entered this status")
+    exited_count = models.PositiveIntegerField(default=0, help_text="Times a candidate has left this status")
+    seconds_in_stage = models.BigIntegerField(default=0, help_text="Total time spent in this status by candidates who left it")
+
+    class Meta:
+        unique_together = ('job', 'status')
+
+    def __str__(self):
+        return f"{self.job_id} {self.status}: {self.current_count}"
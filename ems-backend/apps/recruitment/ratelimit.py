@@ -0,0 +1,140 @@
+"""
+Token-bucket rate limiting for outbound Gemini calls.
+
+Buckets are keyed by API key (Gemini quotas are per key) and shared across all
+workers through Redis when REDIS_CACHE_URL is configured; without Redis each
+process keeps its own buckets, which is enough for development and tests.
+Work that finds its bucket empty reserves a future token (the balance goes
+negative, so each deferred task gets its own slot) and is retried once that slot
+comes up; the number of such deferred tasks is tracked per tenant.
+"""
+import hashlib
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.core.cache import cache
+
+QUEUE_DEPTH_KEY = 'ai:queued:{}'
+
+# KEYS[1] bucket; ARGV rate (tokens/s), capacity, requested, reserve (1/0).
+# Returns seconds to wait (0 = granted). With reserve the tokens are taken even
+# when that leaves the balance negative, and the wait is when they are due.
+_TOKEN_BUCKET_LUA = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local reserve = ARGV[4] == '1'
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens < requested then
+    wait = (requested - tokens) / rate
+end
+if wait == 0 or reserve then
+    tokens = tokens - requested
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil((capacity - math.min(tokens, 0)) / rate) + 1)
+return tostring(wait)
+"""
+
+
+def ai_bucket_key(api_key):
+    return 'ai:bucket:' + hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+class TokenBucket(ABC):
+    def __init__(self, rate_per_minute, burst):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = burst
+
+    @abstractmethod
+    def acquire(self, key, tokens=1, reserve=False):
+        """
+        Take ``tokens`` if available. Returns 0 when granted, else seconds until they
+        would be. With ``reserve`` the tokens are taken regardless and the returned
+        wait is when the caller may use them.
+        """
+
+    def wait(self, key, timeout, tokens=1):
+        """Block until ``tokens`` are granted or ``timeout`` seconds pass. Returns True if granted."""
+        deadline = time.monotonic() + timeout
+        while True:
+            delay = self.acquire(key, tokens)
+            if not delay:
+                return True
+            if time.monotonic() + delay > deadline:
+                return False
+            time.sleep(delay)
+
+
+class RedisTokenBucket(TokenBucket):
+    def __init__(self, rate_per_minute, burst, client):
+        super().__init__(rate_per_minute, burst)
+        self._script = client.register_script(_TOKEN_BUCKET_LUA)
+
+    def acquire(self, key, tokens=1, reserve=False):
+        return float(self._script(keys=[key], args=[self.rate, self.capacity, tokens, int(reserve)]))
+
+
+class LocalTokenBucket(TokenBucket):
+    def __init__(self, rate_per_minute, burst):
+        super().__init__(rate_per_minute, burst)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key, tokens=1, reserve=False):
+        with self._lock:
+            now = time.monotonic()
+            available, updated = self._buckets.get(key, (self.capacity, now))
+            available = min(self.capacity, available + (now - updated) * self.rate)
+            wait = max(0, tokens - available) / self.rate
+            if not wait or reserve:
+                available -= tokens
+            self._buckets[key] = (available, now)
+            return wait
+
+
+_limiter = None
+
+
+def get_ai_rate_limiter():
+    global _limiter
+    if _limiter is None:
+        rate = getattr(settings, 'AI_RATE_LIMIT_PER_MINUTE', 30)
+        burst = getattr(settings, 'AI_RATE_LIMIT_BURST', 10)
+        if getattr(settings, 'REDIS_CACHE_URL', ''):
+            from django_redis import get_redis_connection
+            _limiter = RedisTokenBucket(rate, burst, get_redis_connection('default'))
+        else:
+            _limiter = LocalTokenBucket(rate, burst)
+    return _limiter
+
+
+def increment_ai_queue_depth(tenant_id):
+    key = QUEUE_DEPTH_KEY.format(tenant_id)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def decrement_ai_queue_depth(tenant_id):
+    key = QUEUE_DEPTH_KEY.format(tenant_id)
+    try:
+        if cache.decr(key) < 0:
+            cache.set(key, 0, None)
+    except ValueError:
+        pass
+
+
+def get_ai_queue_depth(tenant_id):
+    """AI tasks currently deferred for this tenant by the rate limiter."""
+    return cache.get(QUEUE_DEPTH_KEY.format(tenant_id)) or 0
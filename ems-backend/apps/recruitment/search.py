@@ -0,0 +1,135 @@
+"""
+Full-text search over candidates.
+
+Each Candidate keeps a flattened ``search_document`` (name, email and every string
+in its parsed resume) that is rebuilt on save. The database indexes it natively:
+
+* PostgreSQL: a GIN index on ``to_tsvector('english', search_document)`` for
+  ranked matches, plus a pg_trgm GIN index used when a query has no lexeme
+  matches (typos, partial names). The fallback matches with ``<%``, so its cut-off
+  is the ``pg_trgm.word_similarity_threshold`` setting.
+* SQLite: an external-content FTS5 table kept in sync by triggers, ranked by bm25.
+  SQLite drops triggers when a migration rebuilds the table, so ensure_search_index()
+  runs after every migrate to put them back.
+
+Other backends (or SQLite without FTS5) fall back to ``icontains`` on the document.
+"""
+import re
+
+from django.db import connection, connections
+from django.db.models import F, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_DOCUMENT_MAX_LENGTH = 20000
+FTS_TABLE = 'recruitment_candidate_fts'
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _flatten(value, out):
+    if isinstance(value, str):
+        if value.strip():
+            out.append(value.strip())
+    elif isinstance(value, dict):
+        for item in value.values():
+            _flatten(item, out)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _flatten(item, out)
+
+
+def candidate_search_document(full_name, email, parsed_resume_data):
+    """Flatten a candidate's searchable text into one string."""
+    parts = [full_name or '', email or '']
+    _flatten(parsed_resume_data or {}, parts)
+    return ' '.join(p for p in parts if p)[:SEARCH_DOCUMENT_MAX_LENGTH]
+
+
+def search_candidates(queryset, query):
+    """Filter ``queryset`` to candidates matching ``query``, best matches first."""
+    words = _WORD_RE.findall(query or '')
+    if not words:
+        return queryset.none()
+
+    if connection.vendor == 'postgresql':
+        return _search_postgres(queryset, query)
+    if connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names():
+        return _search_sqlite(queryset, words)
+    return _search_contains(queryset, words)
+
+
+def _search_postgres(queryset, query):
+    from django.contrib.postgres.lookups import TrigramWordSimilar
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+
+    # Same expression as the GIN index, so the @@ match is an index scan.
+    vector = SearchVector('search_document', config='english')
+    search_query = SearchQuery(query, config='english', search_type='websearch')
+    ranked = queryset.annotate(search_vector=vector).filter(search_vector=search_query)
+    if ranked.exists():
+        return ranked.annotate(search_rank=SearchRank(vector, search_query)).order_by('-search_rank', '-applied_at')
+
+    # Filter with the <% operator so the trigram GIN index is used (a comparison on the
+    # similarity value is a sequential scan); the similarity itself only orders results.
+    return queryset.filter(
+        TrigramWordSimilar(F('search_document'), query),
+    ).annotate(
+        search_rank=TrigramWordSimilarity(query, 'search_document'),
+    ).order_by('-search_rank', '-applied_at')
+
+
+def _search_sqlite(queryset, words):
+    # Quote each word so user input cannot inject FTS5 syntax; '*' makes it a prefix match.
+    match = ' '.join('"{}"*'.format(w.replace('"', '')) for w in words)
+    table = queryset.model._meta.db_table
+    matches = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+    # bm25 is lower for better matches
+    rank = RawSQL(
+        f'SELECT bm25({FTS_TABLE}) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid = "{table}"."id"',
+        [match], output_field=FloatField(),
+    )
+    return queryset.filter(pk__in=matches).annotate(search_rank=rank).order_by('search_rank', '-applied_at')
+
+
+def _search_contains(queryset, words):
+    condition = Q()
+    for word in words:
+        condition &= Q(search_document__icontains=word)
+    return queryset.filter(condition)
+
+
+FTS_TRIGGERS = {
+    f'{FTS_TABLE}_ai': (
+        f'AFTER INSERT ON recruitment_candidate BEGIN '
+        f'INSERT INTO {FTS_TABLE}(rowid, search_document) VALUES (new.id, new.search_document); END'
+    ),
+    f'{FTS_TABLE}_ad': (
+        f'AFTER DELETE ON recruitment_candidate BEGIN '
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_document) VALUES ('delete', old.id, old.search_document); END"
+    ),
+    f'{FTS_TABLE}_au': (
+        f'AFTER UPDATE OF search_document ON recruitment_candidate BEGIN '
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_document) VALUES ('delete', old.id, old.search_document); "
+        f'INSERT INTO {FTS_TABLE}(rowid, search_document) VALUES (new.id, new.search_document); END'
+    ),
+}
+
+
+def ensure_search_index(using='default', **kwargs):
+    """
+    post_migrate handler: recreate the SQLite FTS triggers if a table rebuild dropped
+    them, and rebuild the index from the rows changed while they were missing.
+    """
+    db = connections[using]
+    if db.vendor != 'sqlite' or FTS_TABLE not in db.introspection.table_names():
+        return
+    with db.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'recruitment_candidate'"
+        )
+        missing = set(FTS_TRIGGERS) - {row[0] for row in cursor.fetchall()}
+        if not missing:
+            return
+        for name in sorted(missing):
+            cursor.execute(f'CREATE TRIGGER {name} {FTS_TRIGGERS[name]}')
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
@@ -82,9 +82,27 @@ class CandidateSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Candidate
-        fields = '__all__'
+        exclude = ('search_document', 'email_normalized')
         read_only_fields = ('tenant', 'status_history')
 
+    def validate(self, attrs):
+        # email_normalized is excluded, so DRF adds no validator for the (job, email_normalized) constraint.
+        # Legacy duplicates (email_normalized NULL) are never renormalized on save and need no check.
+        instance = self.instance
+        if instance is not None and instance.email_normalized is None:
+            return attrs
+        job = attrs.get('job', getattr(instance, 'job', None))
+        email = attrs.get('email', getattr(instance, 'email', ''))
+        if job is not None and email:
+            duplicates = Candidate.objects.filter(job=job, email_normalized=email.strip().lower())
+            if instance is not None:
+                duplicates = duplicates.exclude(pk=instance.pk)
+            if duplicates.exists():
+                raise serializers.ValidationError(
+                    {'email': 'An application with this email already exists for this position.'}
+                )
+        return attrs
+
 
 class CandidateListSerializer(serializers.ModelSerializer):
     """Simplified candidate list for Admin/HR"""
@@ -0,0 +1,117 @@
+"""
+Skill matching for keyword fit scoring.
+
+A job's required skills are compiled once into a phrase index; each candidate is
+then matched in time linear in the size of their skill list instead of comparing
+every candidate skill against every job skill.
+"""
+import re
+from functools import lru_cache
+
+_TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#.]*')
+# Resolved candidate phrases remembered per matcher; bounded because matchers are shared.
+RESOLVED_CACHE_SIZE = 2048
+
+# Alternate spellings mapped to a canonical token sequence.
+SKILL_SYNONYMS = {
+    'js': ('javascript',),
+    'ts': ('typescript',),
+    'reactjs': ('react',),
+    'react.js': ('react',),
+    'vuejs': ('vue',),
+    'vue.js': ('vue',),
+    'nodejs': ('node.js',),
+    'node': ('node.js',),
+    'golang': ('go',),
+    'postgres': ('postgresql',),
+    'psql': ('postgresql',),
+    'k8s': ('kubernetes',),
+    'py': ('python',),
+    'ml': ('machine', 'learning'),
+    'ai': ('artificial', 'intelligence'),
+    'nlp': ('natural', 'language', 'processing'),
+    'gcp': ('google', 'cloud'),
+    'aws': ('amazon', 'web', 'services'),
+}
+
+
+@lru_cache(maxsize=4096)
+def _normalize(skill):
+    tokens = []
+    for token in _TOKEN_RE.findall(skill.lower()):
+        token = token.rstrip('.')
+        tokens.extend(SKILL_SYNONYMS.get(token, (token,)))
+    return tuple(tokens)
+
+
+def normalize_skill(skill):
+    """Lower-case, tokenize and canonicalize a skill into a tuple of tokens."""
+    return _normalize(str(skill))
+
+
+def _ngrams(tokens, max_len):
+    for start in range(len(tokens)):
+        for end in range(start + 1, min(len(tokens), start + max_len) + 1):
+            yield tokens[start:end]
+
+
+class SkillMatcher:
+    """
+    Compiled index of a job's required skills.
+
+    A job skill matches a candidate skill when one phrase appears inside the other
+    on token boundaries ("python" matches "python 3", "django" matches
+    "django rest framework"), after synonyms are applied ("js" matches "javascript").
+    """
+
+    def __init__(self, job_skills):
+        self.job_skills = list(job_skills)
+        # Whole job phrase -> job skill indices; lets candidate n-grams find job skills they contain.
+        self._phrases = {}
+        # Every n-gram of a job phrase -> indices; lets a whole candidate phrase find job skills containing it.
+        self._fragments = {}
+        self._max_len = 1
+        # Candidates of one job share most skills, so resolved phrases are memoized.
+        self._lookup = lru_cache(maxsize=RESOLVED_CACHE_SIZE)(self._resolve)
+
+        for index, skill in enumerate(self.job_skills):
+            tokens = normalize_skill(skill)
+            if not tokens:
+                continue
+            self._max_len = max(self._max_len, len(tokens))
+            self._phrases.setdefault(tokens, set()).add(index)
+            for fragment in _ngrams(tokens, len(tokens)):
+                self._fragments.setdefault(fragment, set()).add(index)
+
+    def match(self, candidate_skills):
+        """
+        Returns ``(matched, strengths)``: the set of matched job skill indices and
+        the candidate skills that matched at least one job skill, in input order.
+        """
+        matched = set()
+        strengths = []
+        for skill in candidate_skills:
+            hits = self._lookup(normalize_skill(skill))
+            if hits:
+                matched |= hits
+                strengths.append(skill)
+        return matched, strengths
+
+    def _resolve(self, tokens):
+        found = set(self._fragments.get(tokens, ()))
+        for gram in _ngrams(tokens, self._max_len):
+            found.update(self._phrases.get(gram, ()))
+        return frozenset(found)
+
+    def missing(self, matched):
+        return [skill for index, skill in enumerate(self.job_skills) if index not in matched]
+
+
+@lru_cache(maxsize=256)
+def _compile(job_skills):
+    return SkillMatcher(job_skills)
+
+
+def compile_skills(job_skills):
+    """Shared, memoized matcher for a job's skill list."""
+    return _compile(tuple(str(s) for s in job_skills or ()))
@@ -1,20 +1,82 @@
 from celery import shared_task
+from celery.exceptions import Retry
+from django.core.cache import cache
 import logging
-from .models import Candidate, ApplicantProfile, JobPosting
-from .utils import parse_resume, analyze_candidate
+import random
+import secrets
+from .models import AISettings, Candidate, ApplicantProfile, JobPosting, ResumeParseCache
+from .ratelimit import (
+    ai_bucket_key,
+    decrement_ai_queue_depth,
+    get_ai_rate_limiter,
+    increment_ai_queue_depth,
+)
+from .utils import (
+    AIProviderError,
+    analyze_candidate,
+    parse_resume,
+    rescore_candidates_for_job,
+    resume_content_hash,
+    resume_prompt_version,
+)
 
 logger = logging.getLogger(__name__)
 
+def _parse_is_cached(file, ai_settings):
+    try:
+        content_hash = resume_content_hash(file)
+    except Exception:
+        return False  # Let the parse itself report the unreadable file
+    parsed = ResumeParseCache.objects.filter(
+        content_hash=content_hash, prompt_version=resume_prompt_version(ai_settings.prompt_template),
+    ).values_list('parsed_data', flat=True).first()
+    return bool(parsed)
+
+
+def _defer_if_throttled(task, tenant, file, task_kwargs, analyze=False):
+    """
+    Take a token from the tenant's AI bucket before calling Gemini. When the bucket
+    is empty a future token is reserved and the task is retried (same task id, no
+    failure attempt spent) once it is due; the retry runs with ``queued=True`` and
+    does not acquire again. A resume already in the parse cache costs no API call,
+    so it takes no token unless a job analysis (``analyze``) will call Gemini anyway.
+    """
+    ai_settings = AISettings.get_settings(tenant)
+    if not (ai_settings.is_active and ai_settings.gemini_api_key):
+        return
+    if not analyze and _parse_is_cached(file, ai_settings):
+        return
+
+    wait = get_ai_rate_limiter().acquire(ai_bucket_key(ai_settings.gemini_api_key), reserve=True)
+    if not wait:
+        return
+
+    tenant_id = getattr(tenant, 'id', None)
+    increment_ai_queue_depth(tenant_id)
+    logger.info(f"AI rate limit reached for tenant {tenant_id}; resume parsing deferred {wait:.1f}s")
+    raise task.retry(
+        kwargs={**task_kwargs, 'queued': True, 'queue_tenant_id': tenant_id}, countdown=wait, max_retries=None,
+    )
+
+
 @shared_task(bind=True, max_retries=3)
-def process_resume_parsing_task(self, candidate_id=None, profile_id=None, job_id=None):
+def process_resume_parsing_task(self, candidate_id=None, profile_id=None, job_id=None, queued=False, attempt=0,
+                                queue_tenant_id=None):
     """
     Background task to parse a resume and update the candidate or profile.
+    Rate-limit deferrals and failures both retry under the same task id, so
+    callers polling it see the final result; only failures count towards
+    max_retries (tracked in ``attempt``). A deferred run leaves the tenant's
+    queue depth however it ends.
     """
+    task_kwargs = {'candidate_id': candidate_id, 'profile_id': profile_id, 'job_id': job_id, 'attempt': attempt}
     try:
         if candidate_id:
-            candidate = Candidate.objects.get(id=candidate_id)
+            candidate = Candidate.objects.select_related('tenant', 'job').get(id=candidate_id)
             if not candidate.resume:
                 return "No resume file found for candidate"
+            if not queued:
+                _defer_if_throttled(self, candidate.tenant, candidate.resume, task_kwargs, analyze=bool(candidate.job))
             
             # 1. Parse Resume
             parsed_data = parse_resume(candidate.resume, tenant=candidate.tenant)
@@ -31,12 +93,15 @@ def process_resume_parsing_task(self, candidate_id=None, profile_id=None, job_id
             return f"Processed candidate {candidate_id} resume"
 
         elif profile_id:
-            profile = ApplicantProfile.objects.get(id=profile_id)
+            profile = ApplicantProfile.objects.select_related('user__tenant').get(id=profile_id)
+            tenant = profile.user.tenant
             if not profile.current_resume:
                 return "No resume file found for profile"
+            if not queued:
+                _defer_if_throttled(self, tenant, profile.current_resume, task_kwargs)
                 
             # Parse Resume
-            parsed_data = parse_resume(profile.current_resume, tenant=profile.tenant)
+            parsed_data = parse_resume(profile.current_resume, tenant=tenant)
             profile.resume_parsed_data = parsed_data
             
             # Update Profile fields
@@ -49,8 +114,108 @@ def process_resume_parsing_task(self, candidate_id=None, profile_id=None, job_id
             
             return f"Processed profile {profile_id} resume"
 
-    except Exception as exc:
+    except Retry:
+        raise
+    except AIProviderError as exc:
+        # The AI client already retried transient errors; another round here would multiply the calls
         logger.error(f"Resume processing failed: {exc}")
-        if hasattr(self, 'retry'):
-            raise self.retry(exc=exc)
         raise
+    except Exception as exc:
+        logger.error(f"Resume processing failed: {exc}")
+        if attempt >= self.max_retries:
+            raise
+        # Exponential backoff with jitter so failed parses do not retry in lockstep
+        countdown = 30 * (2 ** attempt) + random.uniform(0, 15)
+        raise self.retry(
+            exc=exc, countdown=countdown, max_retries=None,
+            kwargs={**task_kwargs, 'queued': False, 'attempt': attempt + 1},
+        )
+    finally:
+        if queued:
+            decrement_ai_queue_depth(queue_tenant_id)
+
+
+@shared_task
+def rescore_job_candidates_task(job_id, semantic=False):
+    """Re-score every candidate of a job after its requirements change."""
+    job = JobPosting.objects.filter(id=job_id).select_related('tenant').first()
+    if not job:
+        return f"Job {job_id} not found"
+
+    updated = rescore_candidates_for_job(job, semantic=semantic)
+    logger.info(f"Re-scored {updated} candidates for job {job_id}")
+    return f"Re-scored {updated} candidates for job {job_id}"
+
+
+@shared_task
+def reconcile_funnel_counts_task():
+    """Nightly repair of the per-job funnel counters (see apps.recruitment.funnel)."""
+    from .funnel import reconcile_funnel_counts
+
+    corrected = reconcile_funnel_counts()
+    if corrected:
+        logger.warning(f"Reconciled {corrected} candidate funnel counters")
+    return f"Reconciled {corrected} funnel counters"
+
+
+@shared_task
+def backfill_resumes_task(tenant_id=None, kinds=('candidates', 'profiles'), chunk_size=50, workers=4, limit=None):
+    """Parse every pending resume in checkpointed chunks (see apps.recruitment.backfill)."""
+    from .backfill import backfill_candidates, backfill_profiles
+
+    runners = {'candidates': backfill_candidates, 'profiles': backfill_profiles}
+    summaries = []
+    for kind in kinds:
+        stats = runners[kind](tenant_id=tenant_id, chunk_size=chunk_size, workers=workers, limit=limit)
+        logger.info(f"Resume backfill {stats.summary()}")
+        summaries.append(stats.summary())
+    return "; ".join(summaries)
+
+
+CONNECTION_TEST_KEY = 'ai:connection-test:{}'
+CONNECTION_TEST_KEY_TIMEOUT = 10 * 60
+
+
+def stash_connection_test_key(api_key):
+    """
+    Park an unsaved API key in the cache for test_gemini_connection_task and return
+    the reference to queue instead, so the key never lands in the broker or result backend.
+    """
+    key_ref = secrets.token_urlsafe(16)
+    cache.set(CONNECTION_TEST_KEY.format(key_ref), api_key, CONNECTION_TEST_KEY_TIMEOUT)
+    return key_ref
+
+
+@shared_task(soft_time_limit=30)
+def test_gemini_connection_task(tenant_id, key_ref=None):
+    """
+    Verify a Gemini API key off the request path: the key stashed under ``key_ref``,
+    or the tenant's saved key when there is none.
+    Returns a JSON-serializable result that the task status endpoint hands back to the client.
+    """
+    from apps.core.tenancy import get_cached_tenant
+    from .ai_client import get_ai_client
+
+    if key_ref:
+        api_key = cache.get(CONNECTION_TEST_KEY.format(key_ref))
+        cache.delete(CONNECTION_TEST_KEY.format(key_ref))
+    else:
+        api_key = AISettings.get_settings(get_cached_tenant(tenant_id)).gemini_api_key
+    if not api_key:
+        return {'success': False, 'error': 'The API key to test has expired; please try again.'}
+
+    try:
+        # Simple reachability test using a dummy prompt
+        response = get_ai_client().generate_content(
+            api_key, "Hello, respond with 'OK' if you can read this.",
+            model='gemini-1.5-flash', timeout=(5, 10),
+        )
+        if response.ok:
+            return {'success': True, 'message': 'API Key verified successfully!'}
+        return {
+            'success': False,
+            'error': f"API rejected the request: {response.status_code}",
+            'details': response.text,
+        }
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
@@ -0,0 +1,99 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from apps.recruitment.ai_client import (
+    AIClientError,
+    CircuitBreaker,
+    CircuitOpenError,
+    GeminiClient,
+    extract_response_text,
+)
+
+
+class _StubGemini(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, so connection reuse is observable
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        server.requests.append({'path': self.path, 'body': body, 'client': self.client_address})
+
+        status = server.statuses.pop(0) if server.statuses else 200
+        payload = json.dumps({'candidates': [{'content': {'parts': [{'text': 'OK'}]}}]}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StubGemini)
+    server.requests = []
+    server.statuses = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _client(server, **kwargs):
+    kwargs.setdefault('max_retries', 2)
+    kwargs.setdefault('backoff_base', 0)
+    return GeminiClient(base_url=f'http://127.0.0.1:{server.server_port}', timeout=(1, 2), **kwargs)
+
+
+def test_client_reuses_one_connection_across_calls(stub_server):
+    client = _client(stub_server)
+
+    for _ in range(3):
+        response = client.generate_content('key-1', 'hello', json_response=True)
+        assert extract_response_text(response.json()) == 'OK'
+
+    assert len({r['client'] for r in stub_server.requests}) == 1
+    first = stub_server.requests[0]
+    assert first['path'] == '/models/gemini-2.5-flash:generateContent?key=key-1'
+    assert first['body']['generationConfig'] == {'responseMimeType': 'application/json'}
+
+
+def test_client_retries_transient_errors(stub_server):
+    stub_server.statuses = [503, 502]
+    client = _client(stub_server)
+
+    assert client.generate_content('key', 'hello').status_code == 200
+    assert len(stub_server.requests) == 3
+
+
+def test_client_returns_client_errors_without_retrying(stub_server):
+    stub_server.statuses = [400]
+    client = _client(stub_server)
+
+    assert client.generate_content('bad-key', 'hello').status_code == 400
+    assert len(stub_server.requests) == 1
+    assert not client.breaker.is_open
+
+
+def test_circuit_opens_after_repeated_failures(stub_server):
+    stub_server.statuses = [500] * 10
+    client = _client(stub_server, max_retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+
+    client.generate_content('key', 'hello')
+    client.generate_content('key', 'hello')
+    with pytest.raises(CircuitOpenError):
+        client.generate_content('key', 'hello')
+    assert len(stub_server.requests) == 2
+
+
+def test_unreachable_server_raises_after_retries():
+    client = GeminiClient(base_url='http://127.0.0.1:9', timeout=(0.2, 0.2), max_retries=1, backoff_base=0)
+
+    with pytest.raises(AIClientError):
+        client.generate_content('key', 'hello')
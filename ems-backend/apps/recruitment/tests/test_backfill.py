@@ -0,0 +1,93 @@
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+
+from apps.core.models import Tenant
+from apps.recruitment.backfill import backfill_candidates
+from apps.recruitment.models import AISettings, Candidate, JobPosting, ResumeParseCache
+from apps.recruitment.utils import resume_content_hash, resume_prompt_version
+
+
+@pytest.mark.django_db
+def test_backfill_resumes_parses_pending_candidates_in_chunks():
+    cache.clear()
+    tenant = Tenant.objects.create(name='Acme', slug='acme')
+    AISettings.objects.create(tenant=tenant, gemini_api_key='test-key')
+    job = JobPosting.objects.create(
+        tenant=tenant, title='Engineer', department='Engineering', required_skills=['Python'],
+    )
+    pending = [
+        Candidate.objects.create(
+            tenant=tenant, job=job, full_name=f'Candidate {i}', email=f'c{i}@example.com',
+            resume=SimpleUploadedFile(f'cv{i}.pdf', b'%PDF-1.4'),
+        )
+        for i in range(3)
+    ]
+    done = Candidate.objects.create(
+        tenant=tenant, job=job, full_name='Done', email='done@example.com',
+        resume=SimpleUploadedFile('done.pdf', b'%PDF-1.4'), parsed_resume_data={'skills': ['Go']},
+    )
+    # Uploaded before its tenant enabled AI parsing
+    globex = Tenant.objects.create(name='Globex', slug='globex')
+    later = Candidate.objects.create(
+        tenant=globex, full_name='Later', email='later@example.com',
+        resume=SimpleUploadedFile('later.pdf', b'%PDF-1.4'),
+    )
+    parsed = {'skills': ['Python'], 'experience_years': 3}
+    flaky = {pending[0].resume.name}
+
+    def parse_resume(file, tenant=None, throttle=None):
+        if file.name in flaky:
+            flaky.clear()
+            raise ValueError('AI API returned an error: 503')
+        return parsed
+
+    out = StringIO()
+    with mock.patch('apps.recruitment.backfill.parse_resume', side_effect=parse_resume) as parse, \
+            mock.patch('apps.recruitment.utils.semantic_analyze_candidate', return_value=None):
+        call_command('backfill_resumes', '--only', 'candidates', '--chunk-size', '2', '--workers', '1', stdout=out)
+        assert parse.call_count == 3
+        assert 'candidates: 2 parsed, 1 failed in 2 chunks' in out.getvalue()
+
+        # A finished run leaves no checkpoint: the failed row and rows that became
+        # pending since are picked up by the next run.
+        AISettings.objects.create(tenant=globex, gemini_api_key='globex-key')
+        call_command('backfill_resumes', '--only', 'candidates', '--workers', '1', stdout=out)
+        assert parse.call_count == 5
+
+    assert 'candidates: 2 parsed, 0 failed in 1 chunks' in out.getvalue()
+    for candidate in pending:
+        candidate.refresh_from_db()
+        assert candidate.parsed_resume_data == parsed
+        assert candidate.ai_fit_score == 100
+    later.refresh_from_db()
+    assert later.parsed_resume_data == parsed
+    done.refresh_from_db()
+    assert done.parsed_resume_data == {'skills': ['Go']}
+
+
+@pytest.mark.django_db
+def test_backfill_spends_rate_limit_tokens_only_on_parse_cache_misses():
+    cache.clear()
+    tenant = Tenant.objects.create(name='Acme', slug='acme')
+    settings = AISettings.objects.create(tenant=tenant, gemini_api_key='test-key')
+    resume = SimpleUploadedFile('cv.pdf', b'%PDF-1.4 cached')
+    candidate = Candidate.objects.create(tenant=tenant, full_name='Jane', email='j@example.com', resume=resume)
+    ResumeParseCache.objects.create(
+        content_hash=resume_content_hash(candidate.resume),
+        prompt_version=resume_prompt_version(settings.prompt_template),
+        parsed_data={'skills': ['Python']},
+    )
+    limiter = mock.Mock()
+
+    with mock.patch('apps.recruitment.backfill.get_ai_rate_limiter', return_value=limiter):
+        stats = backfill_candidates(workers=1)
+
+    assert stats.processed == 1
+    limiter.wait.assert_not_called()
+    candidate.refresh_from_db()
+    assert candidate.parsed_resume_data == {'skills': ['Python']}
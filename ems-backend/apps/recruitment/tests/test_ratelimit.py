@@ -0,0 +1,138 @@
+from unittest import mock
+
+import pytest
+from celery.exceptions import Retry
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from apps.core.models import Tenant
+from apps.recruitment.models import AISettings, ApplicantProfile, Candidate, ResumeParseCache
+from apps.recruitment.ratelimit import LocalTokenBucket, get_ai_queue_depth, increment_ai_queue_depth
+from apps.recruitment.tasks import process_resume_parsing_task
+from apps.recruitment.utils import AIProviderError, resume_content_hash, resume_prompt_version
+
+
+def test_local_token_bucket_grants_burst_then_reports_wait():
+    bucket = LocalTokenBucket(rate_per_minute=60, burst=2)
+
+    assert bucket.acquire('k') == 0
+    assert bucket.acquire('k') == 0
+    assert 0 < bucket.acquire('k') <= 1
+    assert bucket.acquire('other') == 0
+
+
+def test_local_token_bucket_reservations_get_successive_slots():
+    bucket = LocalTokenBucket(rate_per_minute=60, burst=1)
+
+    assert bucket.acquire('k') == 0
+    waits = [bucket.acquire('k', reserve=True) for _ in range(3)]
+    assert waits[0] == pytest.approx(1, abs=0.05)
+    assert waits[1] == pytest.approx(2, abs=0.05)
+    assert waits[2] == pytest.approx(3, abs=0.05)
+    # Non-reserving callers queue behind the reservations without taking a token
+    assert bucket.acquire('k') == pytest.approx(4, abs=0.05)
+    assert bucket.acquire('k') == pytest.approx(4, abs=0.05)
+
+
+@pytest.mark.django_db
+def test_throttled_resume_task_is_requeued_and_counted():
+    cache.clear()
+    tenant = Tenant.objects.create(name='Acme', slug='acme')
+    AISettings.objects.create(tenant=tenant, gemini_api_key='test-key')
+    candidate = Candidate.objects.create(
+        tenant=tenant, full_name='Jane', email='j@example.com',
+        resume=SimpleUploadedFile('cv.pdf', b'%PDF-1.4'),
+    )
+    limiter = mock.Mock()
+
+    with mock.patch('apps.recruitment.tasks.get_ai_rate_limiter', return_value=limiter), \
+            mock.patch('apps.recruitment.tasks.parse_resume', return_value={'skills': []}) as parse, \
+            mock.patch.object(process_resume_parsing_task, 'retry', side_effect=Retry()) as retry:
+        limiter.acquire.return_value = 4.0
+        with pytest.raises(Retry):
+            process_resume_parsing_task(candidate_id=candidate.id)
+
+        parse.assert_not_called()
+        assert limiter.acquire.call_args.kwargs['reserve'] is True
+        assert retry.call_args.kwargs['kwargs']['queued'] is True
+        assert retry.call_args.kwargs['countdown'] == 4.0
+        assert get_ai_queue_depth(tenant.id) == 1
+
+        # The retry already holds a reserved token and does not acquire again
+        process_resume_parsing_task(**retry.call_args.kwargs['kwargs'])
+
+    parse.assert_called_once()
+    assert limiter.acquire.call_count == 1
+    assert get_ai_queue_depth(tenant.id) == 0
+
+
+@pytest.mark.django_db
+def test_cached_resume_takes_no_token_and_failed_retries_leave_the_queue():
+    cache.clear()
+    tenant = Tenant.objects.create(name='Acme', slug='acme')
+    ai_settings = AISettings.objects.create(tenant=tenant, gemini_api_key='test-key')
+    candidate = Candidate.objects.create(
+        tenant=tenant, full_name='Jane', email='j@example.com',
+        resume=SimpleUploadedFile('cv.pdf', b'%PDF-1.4 cached'),
+    )
+    ResumeParseCache.objects.create(
+        content_hash=resume_content_hash(candidate.resume),
+        prompt_version=resume_prompt_version(ai_settings.prompt_template),
+        parsed_data={'skills': ['Go']},
+    )
+    limiter = mock.Mock(**{'acquire.return_value': 4.0})
+
+    with mock.patch('apps.recruitment.tasks.get_ai_rate_limiter', return_value=limiter):
+        process_resume_parsing_task(candidate_id=candidate.id)
+    limiter.acquire.assert_not_called()
+    candidate.refresh_from_db()
+    assert candidate.parsed_resume_data == {'skills': ['Go']}
+
+    # A deferred run whose candidate has since been deleted still leaves the queue
+    increment_ai_queue_depth(tenant.id)
+    Candidate.objects.filter(pk=candidate.pk).delete()
+    with mock.patch.object(process_resume_parsing_task, 'retry', side_effect=Retry()), pytest.raises(Retry):
+        process_resume_parsing_task(candidate_id=candidate.id, queued=True, queue_tenant_id=tenant.id)
+    assert get_ai_queue_depth(tenant.id) == 0
+
+
+@pytest.mark.django_db
+def test_exhausted_ai_errors_are_not_retried_by_the_task():
+    cache.clear()
+    tenant = Tenant.objects.create(name='Acme', slug='acme')
+    AISettings.objects.create(tenant=tenant, gemini_api_key='test-key')
+    candidate = Candidate.objects.create(
+        tenant=tenant, full_name='Jane', email='j@example.com',
+        resume=SimpleUploadedFile('cv.pdf', b'%PDF-1.4'),
+    )
+    unavailable = mock.Mock(ok=False, status_code=503, text='overloaded')
+
+    with mock.patch('apps.recruitment.tasks.get_ai_rate_limiter', return_value=mock.Mock(**{'acquire.return_value': 0})), \
+            mock.patch('apps.recruitment.utils.extract_resume_text', return_value='Python developer'), \
+            mock.patch('apps.recruitment.utils.get_ai_client') as client, \
+            mock.patch.object(process_resume_parsing_task, 'retry') as retry:
+        client.return_value.generate_content.return_value = unavailable
+        with pytest.raises(AIProviderError):
+            process_resume_parsing_task(candidate_id=candidate.id)
+
+    client.return_value.generate_content.assert_called_once()
+    retry.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_profile_resume_is_parsed_with_the_applicants_tenant():
+    # ApplicantProfile has no tenant of its own; the parse runs under the user's tenant settings
+    cache.clear()
+    tenant = Tenant.objects.create(name='Acme', slug='acme')
+    user = get_user_model().objects.create_user(
+        email='applicant@example.com', password='password123', role='APPLICANT', tenant=tenant,
+    )
+    profile = ApplicantProfile.objects.create(user=user, current_resume=SimpleUploadedFile('cv.pdf', b'%PDF-1.4'))
+
+    with mock.patch('apps.recruitment.tasks.parse_resume', return_value={'skills': ['Go']}) as parse:
+        process_resume_parsing_task(profile_id=profile.id)
+
+    assert parse.call_args.kwargs['tenant'] == tenant
+    profile.refresh_from_db()
+    assert profile.skills == ['Go']
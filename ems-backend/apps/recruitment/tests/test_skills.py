@@ -0,0 +1,27 @@
+from apps.recruitment.skills import RESOLVED_CACHE_SIZE, SkillMatcher, normalize_skill
+
+
+def test_normalize_skill_applies_synonyms():
+    assert normalize_skill(' ReactJS ') == ('react',)
+    assert normalize_skill('Postgres') == ('postgresql',)
+    assert normalize_skill('ML') == ('machine', 'learning')
+
+
+def test_matcher_matches_phrases_in_both_directions():
+    matcher = SkillMatcher(['Python', 'Django REST Framework', 'Kubernetes', 'Java'])
+
+    matched, strengths = matcher.match(['python 3', 'Django', 'k8s', 'JavaScript'])
+
+    assert matched == {0, 1, 2}
+    assert strengths == ['python 3', 'Django', 'k8s']
+    assert matcher.missing(matched) == ['Java']
+
+
+def test_matcher_memo_is_bounded():
+    matcher = SkillMatcher(['Python'])
+
+    for n in range(RESOLVED_CACHE_SIZE + 100):
+        matcher.match([f'skill{n}'])
+
+    assert matcher.match(['python'])[0] == {0}
+    assert matcher._lookup.cache_info().currsize == RESOLVED_CACHE_SIZE
@@ -0,0 +1,128 @@
+import io
+import json
+from unittest import mock
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from reportlab.pdfgen import canvas
+
+from apps.core.models import Tenant
+from apps.recruitment.models import AISettings, Candidate, JobPosting, ResumeParseCache
+from apps.recruitment.utils import (
+    extract_resume_text,
+    extract_resume_texts,
+    parse_resume,
+    rescore_candidates_for_job,
+)
+
+
+def _pdf_bytes(text='Jane Doe - Python, Django - 5 years'):
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    pdf.drawString(72, 720, text)
+    pdf.save()
+    return buffer.getvalue()
+
+
+def _multipage_pdf_bytes(pages):
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for number in range(1, pages + 1):
+        pdf.drawString(72, 720, f'Page {number} ' + 'experience ' * 20)
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def _gemini_response(payload):
+    response = mock.Mock(ok=True, status_code=200)
+    response.json.return_value = {
+        'candidates': [{'content': {'parts': [{'text': json.dumps(payload)}]}}]
+    }
+    return response
+
+
+@pytest.mark.django_db
+def test_parse_resume_reuses_cached_result_for_identical_file():
+    tenant_a = Tenant.objects.create(name='Acme', slug='acme')
+    tenant_b = Tenant.objects.create(name='Globex', slug='globex')
+    for tenant in (tenant_a, tenant_b):
+        AISettings.objects.create(tenant=tenant, gemini_api_key='test-key')
+
+    content = _pdf_bytes()
+    parsed = {'name': 'Jane Doe', 'skills': ['Python', 'Django'], 'experience_years': 5}
+    with mock.patch('apps.recruitment.ai_client.GeminiClient.post', return_value=_gemini_response(parsed)) as post:
+        assert parse_resume(SimpleUploadedFile('cv.pdf', content), tenant=tenant_a) == parsed
+        assert parse_resume(SimpleUploadedFile('resume.pdf', content), tenant=tenant_b) == parsed
+
+    assert post.call_count == 1
+    entry = ResumeParseCache.objects.get()
+    assert entry.hit_count == 1
+    assert 'Jane Doe' in entry.extracted_text
+
+
+@pytest.mark.django_db
+def test_rescore_candidates_for_job_updates_scores_in_bulk(django_assert_max_num_queries):
+    tenant = Tenant.objects.create(name='Acme', slug='acme')
+    job = JobPosting.objects.create(
+        tenant=tenant, title='Engineer', department='Engineering',
+        required_skills=['Python', 'Django'], minimum_experience=2,
+    )
+    strong = Candidate.objects.create(
+        tenant=tenant, job=job, full_name='Strong', email='s@example.com',
+        parsed_resume_data={'skills': ['Python', 'Django'], 'experience_years': 4},
+    )
+    weak = Candidate.objects.create(
+        tenant=tenant, job=job, full_name='Weak', email='w@example.com',
+        parsed_resume_data={'skills': ['Excel'], 'experience_years': 1},
+    )
+
+    with django_assert_max_num_queries(3):
+        assert rescore_candidates_for_job(job) == 2
+
+    strong.refresh_from_db()
+    weak.refresh_from_db()
+    assert strong.ai_fit_score == 100
+    assert weak.ai_fit_score == 15
+    assert weak.ai_analysis['missing_skills'] == ['Python', 'Django']
+
+
+@pytest.mark.django_db
+def test_rescore_candidates_for_job_falls_back_when_semantic_fails():
+    tenant = Tenant.objects.create(name='Acme', slug='acme')
+    AISettings.objects.create(tenant=tenant, gemini_api_key='test-key')
+    job = JobPosting.objects.create(
+        tenant=tenant, title='Engineer', department='Engineering', required_skills=['Python'],
+    )
+    candidate = Candidate.objects.create(
+        tenant=tenant, job=job, full_name='Jane', email='j@example.com',
+        parsed_resume_data={'skills': ['Python'], 'experience_years': 3},
+    )
+
+    with mock.patch('apps.recruitment.utils.semantic_analyze_candidate', return_value=None) as semantic:
+        rescore_candidates_for_job(job, semantic=True, max_workers=2)
+
+    semantic.assert_called_once()
+    candidate.refresh_from_db()
+    assert candidate.ai_fit_score == 100
+
+
+def test_extract_resume_text_stops_at_character_budget():
+    content = _multipage_pdf_bytes(6)
+
+    full = extract_resume_text(io.BytesIO(content), max_chars=None)
+    truncated = extract_resume_text(io.BytesIO(content), max_chars=300)
+
+    assert 'Page 6' in full
+    assert len(truncated) == 300
+    assert truncated.startswith('Page 1') and 'Page 3' not in truncated
+
+
+def test_extract_resume_texts_process_pool_keeps_order_and_errors():
+    documents = [_pdf_bytes('First resume'), b'not a pdf', _pdf_bytes('Third resume')]
+
+    results = extract_resume_texts(documents, max_workers=2)
+
+    assert 'First resume' in results[0]
+    assert isinstance(results[1], ValueError)
+    assert 'Third resume' in results[2]
@@ -0,0 +1,295 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.core.models import Tenant
+from apps.recruitment.models import Candidate, JobPosting
+
+
+@pytest.fixture
+def hr_client():
+    tenant = Tenant.objects.create(name='Acme', slug='acme', subscription_tier='BUSINESS')
+    user = get_user_model().objects.create_user(
+        email='hr@acme.test', password='password123', role='HR_MANAGER', tenant=tenant,
+    )
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client, tenant
+
+
+@pytest.mark.django_db
+def test_parse_resume_is_queued_and_returns_status_url(hr_client):
+    client, tenant = hr_client
+    job = JobPosting.objects.create(tenant=tenant, title='Engineer', department='Engineering')
+    candidate = Candidate.objects.create(
+        tenant=tenant, job=job, full_name='Jane Doe', email='jane@example.com',
+        resume=SimpleUploadedFile('cv.pdf', b'%PDF-1.4'),
+    )
+
+    with mock.patch('apps.recruitment.tasks.process_resume_parsing_task.delay') as delay:
+        delay.return_value.id = 'abc123'
+        response = client.post(f'/api/recruitment/candidates/{candidate.id}/parse_resume/')
+
+    assert response.status_code == 202
+    delay.assert_called_once_with(candidate_id=candidate.id)
+    assert response.data['task_id'] == 'abc123'
+    assert response.data['status_url'] == '/api/recruitment/tasks/abc123/'
+
+    pending = mock.Mock(state='PENDING', **{
+        'ready.return_value': False, 'successful.return_value': False, 'failed.return_value': False,
+    })
+    with mock.patch('celery.result.AsyncResult', return_value=pending):
+        assert client.get(response.data['status_url']).data['state'] == 'PENDING'
+
+        other_tenant = Tenant.objects.create(name='Globex', slug='globex', subscription_tier='BUSINESS')
+        other = APIClient()
+        other.force_authenticate(user=get_user_model().objects.create_user(
+            email='hr@globex.test', password='password123', role='HR_MANAGER', tenant=other_tenant,
+        ))
+        assert other.get(response.data['status_url']).status_code == 404
+        assert other.get('/api/recruitment/tasks/never-queued/').status_code == 404
+
+
+@pytest.mark.django_db
+def test_test_connection_is_queued(hr_client):
+    client, tenant = hr_client
+
+    with mock.patch('apps.recruitment.tasks.test_gemini_connection_task.delay') as delay:
+        delay.return_value.id = 'def456'
+        response = client.post('/api/recruitment/ai-settings/test_connection/', {'gemini_api_key': 'k'})
+
+    assert response.status_code == 202
+    tenant_id, key_ref = delay.call_args.args
+    assert tenant_id == tenant.id and key_ref != 'k'
+    assert response.data['status_url'] == '/api/recruitment/tasks/def456/'
+
+    with mock.patch('apps.recruitment.ai_client.get_ai_client') as get_client:
+        get_client.return_value.generate_content.return_value.ok = True
+        from apps.recruitment.tasks import test_gemini_connection_task
+        assert test_gemini_connection_task(tenant_id, key_ref)['success'] is True
+    assert get_client.return_value.generate_content.call_args.args[0] == 'k'
+    # The stashed key is single use
+    assert test_gemini_connection_task(tenant_id, key_ref)['success'] is False
+
+
+@pytest.mark.django_db
+def test_candidate_search_ranks_parsed_resume_matches(hr_client):
+    client, tenant = hr_client
+    other = Tenant.objects.create(name='Globex', slug='globex')
+    Candidate.objects.create(
+        tenant=tenant, full_name='Ada Lovelace', email='ada@example.com',
+        parsed_resume_data={'skills': ['Python', 'Django'], 'experience': [{'company': 'Initech'}]},
+    )
+    Candidate.objects.create(
+        tenant=tenant, full_name='Grace Hopper', email='grace@example.com',
+        parsed_resume_data={'skills': ['COBOL'], 'education': [{'school': 'Yale'}]},
+    )
+    Candidate.objects.create(
+        tenant=other, full_name='Other Tenant', email='o@example.com',
+        parsed_resume_data={'skills': ['Python']},
+    )
+
+    response = client.get('/api/recruitment/candidates/search/', {'q': 'python initech'})
+    assert response.status_code == 200
+    assert [c['full_name'] for c in response.data['results']] == ['Ada Lovelace']
+
+    response = client.get('/api/recruitment/candidates/search/', {'q': 'yal'})
+    assert [c['full_name'] for c in response.data['results']] == ['Grace Hopper']
+
+    assert client.get('/api/recruitment/candidates/search/').status_code == 400
+
+
+@pytest.mark.django_db
+def test_post_migrate_restores_dropped_search_triggers(hr_client):
+    from django.db import connection
+
+    from apps.recruitment.search import FTS_TABLE, ensure_search_index
+
+    if connection.vendor != 'sqlite' or FTS_TABLE not in connection.introspection.table_names():
+        pytest.skip('SQLite FTS5 search index not available')
+    client, tenant = hr_client
+    with connection.cursor() as cursor:
+        for suffix in ('ai', 'ad', 'au'):
+            cursor.execute(f'DROP TRIGGER {FTS_TABLE}_{suffix}')
+    Candidate.objects.create(
+        tenant=tenant, full_name='Ada Lovelace', email='ada@example.com', parsed_resume_data={'skills': ['Rust']},
+    )
+
+    ensure_search_index()
+
+    response = client.get('/api/recruitment/candidates/search/', {'q': 'rust'})
+    assert [c['full_name'] for c in response.data['results']] == ['Ada Lovelace']
+
+
+@pytest.mark.django_db
+def test_public_job_board_is_cached_and_supports_conditional_requests(django_assert_num_queries):
+    cache.clear()
+    tenant = Tenant.objects.create(name='Acme', slug='acme')
+    job = JobPosting.objects.create(tenant=tenant, title='Engineer', department='Engineering')
+    JobPosting.objects.create(tenant=tenant, title='Draft', department='Engineering', status='DRAFT')
+    client = APIClient()
+
+    response = client.get('/api/recruitment/public/jobs/', {'tenant': 'acme'})
+    assert response.status_code == 200
+    assert [j['title'] for j in response.data] == ['Engineer']
+    etag = response['ETag']
+    assert 'Last-Modified' in response
+
+    with django_assert_num_queries(0):
+        cached = client.get('/api/recruitment/public/jobs/', {'tenant': 'acme'})
+        not_modified = client.get('/api/recruitment/public/jobs/', {'tenant': 'acme'}, HTTP_IF_NONE_MATCH=etag)
+    assert cached.data == response.data
+    assert not_modified.status_code == 304
+
+    job.title = 'Senior Engineer'
+    job.save()
+    changed = client.get('/api/recruitment/public/jobs/', {'tenant': 'acme'}, HTTP_IF_NONE_MATCH=etag)
+    assert changed.status_code == 200
+    assert changed['ETag'] != etag
+    assert [j['title'] for j in changed.data] == ['Senior Engineer']
+
+    tenant.slug = 'acme-corp'
+    tenant.save()
+    assert client.get('/api/recruitment/public/jobs/', {'tenant': 'acme'}).status_code == 404
+    renamed = client.get('/api/recruitment/public/jobs/', {'tenant': 'acme-corp'})
+    assert [j['title'] for j in renamed.data] == ['Senior Engineer']
+
+
+@pytest.mark.django_db
+def test_public_job_board_does_not_cache_unknown_tenants():
+    cache.clear()
+    client = APIClient()
+
+    for slug in ('nope-1', 'nope-2'):
+        response = client.get('/api/recruitment/public/jobs/', {'tenant': slug})
+        assert response.status_code == 404
+        assert cache.get(f'public_jobs:{slug}') is None
+
+
+@pytest.mark.django_db
+def test_funnel_counters_follow_status_transitions(hr_client, django_assert_max_num_queries):
+    client, tenant = hr_client
+    job = JobPosting.objects.create(tenant=tenant, title='Engineer', department='Engineering')
+    alice = Candidate.objects.create(tenant=tenant, job=job, full_name='Alice', email='alice@example.com')
+    bob = Candidate.objects.create(tenant=tenant, job=job, full_name='Bob', email='bob@example.com')
+    gone = Candidate.objects.create(tenant=tenant, job=job, full_name='Gone', email='gone@example.com')
+    Candidate.objects.filter(pk=alice.pk).update(stage_entered_at=timezone.now() - timedelta(days=4))
+    Candidate.objects.get(pk=gone.pk).delete()
+
+    assert client.post(f'/api/recruitment/candidates/{alice.id}/schedule_interview/', {
+        'scheduled_at': '2026-11-02T10:00:00Z', 'location': 'HQ',
+    }).status_code == 200
+    assert client.post(f'/api/recruitment/candidates/{alice.id}/hire/').status_code == 200
+    assert client.post(f'/api/recruitment/candidates/{bob.id}/reject/').status_code == 200
+
+    with django_assert_max_num_queries(4):
+        response = client.get(f'/api/recruitment/jobs/{job.id}/funnel/')
+
+    assert response.status_code == 200
+    stages = {stage['status']: stage for stage in response.data['stages']}
+    assert [stage['status'] for stage in response.data['stages']][0] == 'APPLIED'
+    assert (stages['APPLIED']['current'], stages['APPLIED']['entered']) == (0, 3)
+    assert stages['APPLIED']['avg_days_in_stage'] == pytest.approx(4 / 3, abs=0.01)
+    assert (stages['INTERVIEWING']['current'], stages['INTERVIEWING']['entered']) == (0, 1)
+    assert stages['HIRED']['current'] == stages['REJECTED']['current'] == 1
+    assert stages['HIRED']['conversion_rate'] == 33.3
+    assert stages['SHORTLISTED'] == {
+        'status': 'SHORTLISTED', 'current': 0, 'entered': 0, 'conversion_rate': 0.0, 'avg_days_in_stage': None,
+    }
+
+    response = client.get('/api/recruitment/jobs/funnels/')
+    assert [funnel['job'] for funnel in response.data] == [job.id]
+
+
+@pytest.mark.django_db
+def test_reconcile_repairs_funnel_counters_after_bulk_updates(hr_client):
+    from apps.recruitment.funnel import reconcile_funnel_counts
+    from apps.recruitment.models import CandidateFunnelStat
+
+    _, tenant = hr_client
+    job = JobPosting.objects.create(tenant=tenant, title='Engineer', department='Engineering')
+    for name in ('alice', 'bob', 'carol'):
+        Candidate.objects.create(tenant=tenant, job=job, full_name=name, email=f'{name}@example.com')
+    # Queryset updates bypass Candidate.save()
+    Candidate.objects.filter(email__in=['alice@example.com', 'bob@example.com']).update(status='SHORTLISTED')
+
+    assert reconcile_funnel_counts() == 2
+    counts = {
+        stat.status: (stat.current_count, stat.entered_count, stat.exited_count)
+        for stat in CandidateFunnelStat.objects.filter(job=job)
+    }
+    assert counts == {'APPLIED': (1, 1, 0), 'SHORTLISTED': (2, 2, 0)}
+    assert reconcile_funnel_counts() == 0
+
+
+@pytest.mark.django_db
+def test_public_apply_rejects_duplicate_email_case_insensitively():
+    tenant = Tenant.objects.create(name='Acme', slug='acme')
+    job = JobPosting.objects.create(tenant=tenant, title='Engineer', department='Engineering')
+    Candidate.objects.create(tenant=tenant, job=job, full_name='Alice', email=' Alice@Example.com')
+    client = APIClient()
+
+    def apply(email):
+        return client.post('/api/recruitment/public/apply/', {
+            'job': job.id, 'full_name': 'Alice', 'email': email,
+        }, format='multipart')
+
+    response = apply('ALICE@example.com')
+    assert response.status_code == 400
+    assert 'already exists' in response.data['error']
+
+    # A double-submit that slips past the lookup is rejected by the unique constraint
+    with mock.patch('django.db.models.QuerySet.exists', return_value=False):
+        response = apply('alice@EXAMPLE.com')
+    assert response.status_code == 400
+    assert Candidate.objects.filter(job=job).count() == 1
+
+    response = apply('bob@example.com')
+    assert response.status_code == 201
+    assert Candidate.objects.get(pk=response.data['id']).email_normalized == 'bob@example.com'
+
+
+@pytest.mark.django_db
+def test_hr_candidate_writes_reject_duplicate_email_for_job(hr_client):
+    client, tenant = hr_client
+    job = JobPosting.objects.create(tenant=tenant, title='Engineer', department='Engineering')
+    Candidate.objects.create(tenant=tenant, job=job, full_name='Alice', email='alice@example.com')
+    bob = Candidate.objects.create(tenant=tenant, job=job, full_name='Bob', email='bob@example.com')
+
+    response = client.post('/api/recruitment/candidates/', {
+        'job': job.id, 'full_name': 'Alice Again', 'email': 'ALICE@example.com',
+    })
+    assert response.status_code == 400
+    assert 'email' in response.data
+
+    def put(email):
+        return client.put(f'/api/recruitment/candidates/{bob.id}/', {'job': job.id, 'full_name': 'Bob', 'email': email})
+
+    assert put('Alice@Example.com').status_code == 400
+    assert put('BOB@example.com').status_code == 200
+
+
+@pytest.mark.django_db
+def test_applicant_sees_legacy_duplicate_applications():
+    tenant = Tenant.objects.create(name='Acme', slug='acme')
+    job = JobPosting.objects.create(tenant=tenant, title='Engineer', department='Engineering')
+    first = Candidate.objects.create(tenant=tenant, job=job, full_name='Alice', email='alice@example.com')
+    legacy = Candidate.objects.create(tenant=tenant, job=job, full_name='Alice', email='placeholder@example.com')
+    # As left by migration 0012 for a pre-existing duplicate
+    Candidate.objects.filter(pk=legacy.pk).update(email='Alice@Example.com', email_normalized=None)
+    user = get_user_model().objects.create_user(
+        email='alice@example.com', password='password123', role='APPLICANT', is_active=True,
+    )
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    response = client.get('/api/recruitment/applicant/applications/')
+
+    assert response.status_code == 200
+    assert sorted(application['id'] for application in response.data) == [first.id, legacy.id]
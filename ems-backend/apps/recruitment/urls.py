@@ -5,6 +5,9 @@ from .views import (
     JobPostingViewSet,
     CandidateViewSet,
     AISettingsView,
+    AISettingsTestConnectionView,
+    AIQueueStatusView,
+    AITaskStatusView,
     # Applicant Views
     PublicJobListView,
     PublicApplicationViewSet,
@@ -25,6 +28,9 @@ urlpatterns = [
     
     # AI Settings
     path('ai-settings/', AISettingsView.as_view(), name='ai-settings'),
+    path('ai-settings/test_connection/', AISettingsTestConnectionView.as_view(), name='ai-settings-test-connection'),
+    path('ai-settings/queue/', AIQueueStatusView.as_view(), name='ai-queue-status'),
+    path('tasks/<str:task_id>/', AITaskStatusView.as_view(), name='ai-task-status'),
     
     # Public job listings (for applicants)
     path('public/jobs/', PublicJobListView.as_view(), name='public-jobs'),
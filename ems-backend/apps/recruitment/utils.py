@@ -1,20 +1,133 @@
+import io
 import os
 import random
 import time
 import json
-import requests
+import hashlib
 from decimal import Decimal
 import logging
+from django.core.cache import cache
+from django.db.models import F
 from pypdf import PdfReader
-from .models import AISettings
+from .ai_client import AIClientError, extract_response_text, get_ai_client
+from .models import AISettings, ResumeParseCache
+from .ratelimit import ai_bucket_key, get_ai_rate_limiter
+from .skills import compile_skills
 
 logger = logging.getLogger(__name__)
 
-def parse_resume(file, tenant=None):
+# Bump when the extraction or Gemini request format changes so cached parses are not reused.
+RESUME_PARSER_VERSION = '1'
+RESUME_CACHE_METRICS_KEY = 'resume_parse_cache:{}'
+# Characters of resume text sent to Gemini; extraction stops once it has this many
+RESUME_TEXT_BUDGET = 15000
+# (connect, read) seconds; semantic scoring has a keyword fallback so it should fail fast
+SEMANTIC_ANALYSIS_TIMEOUT = (5, 10)
+# Seconds semantic scoring may wait for a rate-limit token before falling back
+SEMANTIC_RATE_LIMIT_WAIT = 10
+
+
+def resume_content_hash(file):
+    """SHA-256 of the uploaded resume, read in chunks and rewound for the parser."""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def resume_prompt_version(prompt_template):
+    return hashlib.sha256(f"{RESUME_PARSER_VERSION}:{prompt_template}".encode('utf-8')).hexdigest()
+
+
+def _record_cache_metric(outcome):
+    key = RESUME_CACHE_METRICS_KEY.format(outcome)
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def get_resume_cache_stats():
+    """Process-independent hit/miss counters for the resume parse cache."""
+    hits = cache.get(RESUME_CACHE_METRICS_KEY.format('hits'), 0)
+    misses = cache.get(RESUME_CACHE_METRICS_KEY.format('misses'), 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total * 100, 2) if total else 0,
+    }
+
+
+def extract_resume_text(file, max_chars=RESUME_TEXT_BUDGET):
+    """
+    Text of a PDF resume, page by page, stopping once ``max_chars`` have been
+    collected; later pages of long CVs and portfolios are never parsed.
+    """
+    parts = []
+    collected = 0
+    try:
+        reader = PdfReader(file)
+        for page in reader.pages:
+            extracted = page.extract_text()
+            if extracted:
+                parts.append(extracted)
+                collected += len(extracted) + 1
+                if max_chars and collected >= max_chars:
+                    break
+    except Exception as e:
+        logger.error(f"Failed to read PDF: {e}")
+        raise ValueError("Failed to read document text. Please ensure you uploaded a valid, text-searchable PDF file (DOCX is currently not supported for AI Parsing).")
+
+    text = "\n".join(parts)
+    if not text.strip():
+        logger.warning("No text extracted from PDF.")
+        raise ValueError("No text could be extracted from the PDF. It might be a scanned image.")
+    return text[:max_chars] if max_chars else text
+
+
+def _extract_text_from_bytes(args):
+    data, max_chars = args
+    try:
+        return extract_resume_text(io.BytesIO(data), max_chars=max_chars)
+    except ValueError as e:
+        return e
+
+
+def extract_resume_texts(documents, max_workers=None, max_chars=RESUME_TEXT_BUDGET):
+    """
+    Extract text from many PDFs (raw bytes) on a process pool, for backfills.
+    Returns one entry per document in input order: the text, or the ValueError
+    raised for an unreadable file.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    documents = list(documents)
+    if max_workers == 1 or len(documents) < 2:
+        return [_extract_text_from_bytes((data, max_chars)) for data in documents]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_extract_text_from_bytes, [(data, max_chars) for data in documents]))
+
+
+class AIProviderError(ValueError):
+    """
+    The AI API failed after the client's own retries (or rejected the request).
+    Callers should not retry it again on top of that.
+    """
+
+
+def parse_resume(file, tenant=None, throttle=None):
     """
     Extracts text from a resume file and parses it using Google Gemini AI if enabled.
     Falls back to mock data if AI is disabled or an error occurs.
 
+    Results are cached by file content and prompt version (see ResumeParseCache):
+    a resume that was parsed before costs neither PDF extraction nor an API call.
+    ``throttle(api_key)``, if given, is called only when the API is about to be hit.
+
     BILLING: Tenants are strictly responsible for their own AI parsing costs.
     The Gemini API key is fetched dynamically from each tenant's AISettings record.
     If a tenant does not provide a key, AI parsing will safely fall back to mock data.
@@ -32,49 +145,45 @@ def parse_resume(file, tenant=None):
         return {}
         
     try:
-        # 2. Extract Text from PDF
-        text = ""
-        try:
-            reader = PdfReader(file)
-            for page in reader.pages:
-                extracted = page.extract_text()
-                if extracted:
-                    text += extracted + "\n"
-        except Exception as e:
-            logger.error(f"Failed to read PDF: {e}")
-            raise ValueError("Failed to read document text. Please ensure you uploaded a valid, text-searchable PDF file (DOCX is currently not supported for AI Parsing).")
-            
-        if not text.strip():
-            logger.warning("No text extracted from PDF.")
-            raise ValueError("No text could be extracted from the PDF. It might be a scanned image.")
+        content_hash = resume_content_hash(file)
+        prompt_version = resume_prompt_version(settings.prompt_template)
+
+        cached = ResumeParseCache.objects.filter(content_hash=content_hash, prompt_version=prompt_version).first()
+        if cached and cached.parsed_data:
+            ResumeParseCache.objects.filter(pk=cached.pk).update(hit_count=F('hit_count') + 1)
+            _record_cache_metric('hits')
+            logger.info(f"Resume parse cache hit for {content_hash[:12]}")
+            return cached.parsed_data
+        _record_cache_metric('misses')
+
+        # 2. Extract Text from PDF (reusing text cached under any prompt version)
+        text = ResumeParseCache.objects.filter(content_hash=content_hash).exclude(
+            extracted_text=''
+        ).values_list('extracted_text', flat=True).first()
+        if not text:
+            text = extract_resume_text(file)
             
-        # 3. Call Gemini API via REST request
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key={gemini_api_key}"
-        
-        full_prompt = f"{settings.prompt_template}\n\nResume Text:\n{text[:15000]}"
-        
-        payload = {
-            "contents": [{
-                "parts": [{"text": full_prompt}]
-            }],
-            "generationConfig": {
-                "responseMimeType": "application/json"
-            }
-        }
-        
-        headers = {'Content-Type': 'application/json'}
-        response = requests.post(url, headers=headers, json=payload)
+        # 3. Call Gemini API over the shared pooled session
+        if throttle:
+            throttle(gemini_api_key)
+        full_prompt = f"{settings.prompt_template}\n\nResume Text:\n{text[:RESUME_TEXT_BUDGET]}"
+        response = get_ai_client().generate_content(gemini_api_key, full_prompt, json_response=True)
         
         if not response.ok:
             error_msg = f"Gemini API Error: {response.text}"
             logger.error(error_msg)
-            raise ValueError(f"AI API returned an error: {response.status_code}")
+            # Keep the extracted text so a retry skips PDF parsing
+            ResumeParseCache.objects.update_or_create(
+                content_hash=content_hash, prompt_version=prompt_version,
+                defaults={'extracted_text': text},
+            )
+            raise AIProviderError(f"AI API returned an error: {response.status_code}")
             
         response_data = response.json()
         
         # Parse the JSON response
         try:
-            raw_text = response_data['candidates'][0]['content']['parts'][0]['text']
+            raw_text = extract_response_text(response_data)
             # Clean up markdown formatting if present
             if raw_text.startswith('```json'):
                 raw_text = raw_text.split('```json')[1].split('```')[0].strip()
@@ -82,8 +191,12 @@ def parse_resume(file, tenant=None):
             parsed_json = json.loads(raw_text)
             
             # Increment parse count
-            settings.resume_parse_count += 1
-            settings.save(update_fields=['resume_parse_count'])
+            AISettings.objects.filter(pk=settings.pk).update(resume_parse_count=F('resume_parse_count') + 1)
+
+            ResumeParseCache.objects.update_or_create(
+                content_hash=content_hash, prompt_version=prompt_version,
+                defaults={'extracted_text': text, 'parsed_data': parsed_json},
+            )
             
             return parsed_json
         except (KeyError, IndexError, json.JSONDecodeError) as e:
@@ -92,6 +205,9 @@ def parse_resume(file, tenant=None):
             
     except ValueError:
         raise
+    except AIClientError as e:
+        logger.error(f"AI Parsing failed: {e}")
+        raise AIProviderError(str(e)) from e
     except Exception as e:
         logger.error(f"AI Parsing failed: {e}")
         raise ValueError(f"An unexpected error occurred during AI parsing: {str(e)}")
@@ -152,8 +268,6 @@ def semantic_analyze_candidate(candidate, job_posting, settings):
     resume_text = str(candidate.parsed_resume_data) if candidate.parsed_resume_data else "No resume data"
     job_text = f"Title: {job_posting.title}\nDescription: {job_posting.description}\nSkills: {job_posting.required_skills}"
 
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key={gemini_api_key}"
-    
     analysis_prompt = f"""
     Compare the following candidate profile against the job description.
     Provide a semantic match analysis. Do NOT just match keywords; consider role relevance and transferable skills.
@@ -171,16 +285,18 @@ def semantic_analyze_candidate(candidate, job_posting, settings):
     4. summary: a concise 2-sentence professional verdict.
     """
 
+    # Share the tenant's Gemini quota with resume parsing; keyword scoring covers a timeout.
+    if not get_ai_rate_limiter().wait(ai_bucket_key(gemini_api_key), timeout=SEMANTIC_RATE_LIMIT_WAIT):
+        logger.info("AI rate limit reached; using keyword analysis")
+        return None
+
     try:
-        payload = {
-            "contents": [{"parts": [{"text": analysis_prompt}]}],
-            "generationConfig": {"responseMimeType": "application/json"}
-        }
-        headers = {'Content-Type': 'application/json'}
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
+        response = get_ai_client().generate_content(
+            gemini_api_key, analysis_prompt, json_response=True, timeout=SEMANTIC_ANALYSIS_TIMEOUT,
+        )
         
         if response.ok:
-            raw_text = response.json()['candidates'][0]['content']['parts'][0]['text']
+            raw_text = extract_response_text(response.json())
             # Clean up markdown
             if '```json' in raw_text:
                 raw_text = raw_text.split('```json')[1].split('```')[0].strip()
@@ -202,22 +318,18 @@ def semantic_analyze_candidate(candidate, job_posting, settings):
     return None
 
 
-def calculate_fit_score(candidate_skills, job_skills, candidate_exp, job_min_exp):
+def calculate_fit_score(candidate_skills, job_skills, candidate_exp, job_min_exp, matcher=None):
     """
     Legacy keyword-based fallback for fit score.
+    Pass a precompiled ``matcher`` when scoring many candidates for the same job.
     """
     if not job_skills:
         return Decimal('50.00')
 
-    job_skills_lower = [s.lower() for s in job_skills]
-    cand_skills_lower = [s.lower() for s in candidate_skills]
-    
-    matched_skills = [
-        s for s in job_skills_lower 
-        if any(cs in s or s in cs for cs in cand_skills_lower)
-    ]
+    matcher = matcher or compile_skills(job_skills)
+    matched, _ = matcher.match(candidate_skills)
     
-    skill_score = (len(matched_skills) / len(job_skills)) * 100
+    skill_score = (len(matched) / len(job_skills)) * 100
     exp_score = 100 if candidate_exp >= job_min_exp else (candidate_exp / max(1, job_min_exp)) * 100
     
     total_score = (skill_score * 0.7) + (exp_score * 0.3)
@@ -238,6 +350,11 @@ def analyze_candidate(candidate, job_posting):
             return semantic_result
             
     # 2. Fallback to Keyword Math
+    return keyword_analyze_candidate(candidate, job_posting)
+
+
+def keyword_analyze_candidate(candidate, job_posting, matcher=None):
+    """Keyword-based analysis of a candidate's parsed resume against a job posting."""
     parsed_data = candidate.parsed_resume_data or {}
     cand_skills = parsed_data.get('skills', [])
     cand_exp = parsed_data.get('experience_years', 0)
@@ -245,11 +362,13 @@ def analyze_candidate(candidate, job_posting):
     job_skills = job_posting.required_skills
     job_min_exp = job_posting.minimum_experience
     
-    fit_score = calculate_fit_score(cand_skills, job_skills, cand_exp, job_min_exp)
+    matcher = matcher or compile_skills(job_skills)
+    matched, strengths = matcher.match(cand_skills)
+    fit_score = calculate_fit_score(cand_skills, job_skills, cand_exp, job_min_exp, matcher=matcher)
     
     analysis = {
-        'strengths': [s for s in cand_skills if s.lower() in [js.lower() for js in job_skills]],
-        'missing_skills': [s for s in job_skills if s.lower() not in [cs.lower() for cs in cand_skills]],
+        'strengths': strengths,
+        'missing_skills': matcher.missing(matched),
         'experience_check': 'Pass' if cand_exp >= job_min_exp else 'Below Requirement',
         'summary': f"Keyword match: Candidate has {cand_exp} years vs {job_min_exp} required."
     }
@@ -259,3 +378,99 @@ def analyze_candidate(candidate, job_posting):
         'ai_analysis': analysis,
         'ai_skill_match': analysis['strengths']
     }
+
+
+RESCORE_FIELDS = ['ai_fit_score', 'ai_analysis', 'ai_skill_match']
+
+
+def rescore_candidates_for_job(job_posting, semantic=False, max_workers=None):
+    """
+    Recompute fit scores for every candidate of a job posting.
+
+    Candidates are loaded in one query and written back with a single bulk_update.
+    With ``semantic=True`` and an active Gemini key, AI calls run on a bounded thread
+    pool (AI_RESCORE_MAX_WORKERS) so at most that many requests are in flight; any
+    candidate the AI cannot score falls back to keyword matching.
+    Returns the number of candidates updated.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from django.conf import settings as django_settings
+    from .models import Candidate
+
+    candidates = list(
+        Candidate.objects.filter(job=job_posting).only('id', 'parsed_resume_data', *RESCORE_FIELDS)
+    )
+    if not candidates:
+        return 0
+
+    results = [None] * len(candidates)
+    if semantic:
+        ai_settings = AISettings.get_settings(job_posting.tenant)
+        if ai_settings.is_active and ai_settings.gemini_api_key:
+            workers = max_workers or getattr(django_settings, 'AI_RESCORE_MAX_WORKERS', 4)
+            with ThreadPoolExecutor(max_workers=min(workers, len(candidates))) as pool:
+                results = list(pool.map(
+                    lambda c: semantic_analyze_candidate(c, job_posting, ai_settings), candidates
+                ))
+
+    matcher = compile_skills(job_posting.required_skills)
+    for candidate, result in zip(candidates, results):
+        result = result or keyword_analyze_candidate(candidate, job_posting, matcher=matcher)
+        for field in RESCORE_FIELDS:
+            setattr(candidate, field, result[field])
+
+    Candidate.objects.bulk_update(candidates, RESCORE_FIELDS, batch_size=500)
+    return len(candidates)
+
+
+PUBLIC_JOBS_CACHE_KEY = 'public_jobs:{}'
+PUBLIC_JOBS_CACHE_TIMEOUT = 10 * 60
+
+
+def _public_jobs_key(tenant_slug):
+    return PUBLIC_JOBS_CACHE_KEY.format(tenant_slug or '*')
+
+
+def get_public_job_feed(tenant_slug=None):
+    """
+    Serialized open job postings for the public board, optionally for one tenant.
+    Returns a dict with ``jobs``, an ``etag`` over the payload and the
+    ``last_modified`` time it was built; served from cache until a posting changes.
+    Returns None for an unknown tenant slug, which is never cached, so arbitrary
+    slugs cannot fill the cache.
+    """
+    key = _public_jobs_key(tenant_slug)
+    feed = cache.get(key)
+    if feed is None:
+        from django.core.serializers.json import DjangoJSONEncoder
+        from django.utils import timezone
+        from apps.core.models import Tenant
+        from .models import JobPosting
+        from .serializers import JobPostingPublicSerializer
+
+        queryset = JobPosting.objects.filter(status='OPEN', is_active=True)
+        if tenant_slug:
+            tenant_id = Tenant.objects.filter(slug=tenant_slug).values_list('id', flat=True).first()
+            if tenant_id is None:
+                return None
+            queryset = queryset.filter(tenant_id=tenant_id)
+        jobs = JobPostingPublicSerializer(queryset, many=True).data
+        body = json.dumps(jobs, cls=DjangoJSONEncoder, sort_keys=True)
+        feed = {
+            'jobs': json.loads(body),
+            'etag': hashlib.sha1(body.encode()).hexdigest(),
+            'last_modified': timezone.now().replace(microsecond=0),
+        }
+        cache.set(key, feed, PUBLIC_JOBS_CACHE_TIMEOUT)
+    return feed
+
+
+def invalidate_public_job_feed(tenant_id, *slugs):
+    """Drop the cached board for a tenant (and any extra ``slugs``) and the unfiltered board."""
+    keys = [_public_jobs_key(None), *(_public_jobs_key(slug) for slug in slugs if slug)]
+    if tenant_id:
+        from apps.core.tenancy import get_cached_tenant
+        tenant = get_cached_tenant(tenant_id)
+        if tenant is not None:
+            keys.append(_public_jobs_key(tenant.slug))
+    cache.delete_many(keys)
@@ -1,15 +1,26 @@
+import logging
+
 from rest_framework import viewsets, status, generics
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from rest_framework.views import APIView
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
 from django.utils import timezone
+from django.db import IntegrityError, transaction
 from django.db.models import Q
 
 from apps.core.permissions import IsAdminOrHRManager, IsApplicant, IsApplicantOwner, HasBusinessTier
 from apps.core.tenancy import resolve_tenant
 from apps.core.utils import increment_feature_usage
 from .models import Candidate, JobPosting, ApplicantProfile, AISettings, CandidateStatusHistory
+from .funnel import job_funnels
+from .search import search_candidates
+from .utils import get_public_job_feed
 from .serializers import (
     CandidateSerializer,
     CandidateListSerializer,
@@ -22,7 +33,8 @@ from .serializers import (
     AISettingsSerializer,
     PublicCandidateApplicationSerializer,
 )
-from .utils import parse_resume, analyze_candidate
+
+logger = logging.getLogger(__name__)
 
 
 # ---------------------------------------------------------------------------
@@ -56,6 +68,27 @@ def _validate_resume_file(file):
         )
 
 
+AI_TASK_OWNER_KEY = 'ai:task:{}:owner'
+AI_TASK_OWNER_TIMEOUT = 24 * 60 * 60
+
+
+def _task_accepted(request, task, detail):
+    """
+    202 response pointing the client at the task status endpoint. The task id is
+    recorded against the caller's tenant so only that tenant can read its result.
+    """
+    tenant = resolve_tenant(request)
+    cache.set(AI_TASK_OWNER_KEY.format(task.id), {'tenant_id': getattr(tenant, 'id', None)}, AI_TASK_OWNER_TIMEOUT)
+    return Response(
+        {
+            'detail': detail,
+            'task_id': task.id,
+            'status_url': reverse('ai-task-status', kwargs={'task_id': task.id}),
+        },
+        status=status.HTTP_202_ACCEPTED,
+    )
+
+
 # ============================================
 # ADMIN/HR VIEWS - Full access to recruitment
 # ============================================
@@ -81,6 +114,42 @@ class JobPostingViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(tenant=resolve_tenant(self.request))
 
+    def perform_update(self, serializer):
+        previous = (serializer.instance.required_skills, serializer.instance.minimum_experience)
+        job = serializer.save()
+        if (job.required_skills, job.minimum_experience) != previous:
+            from .tasks import rescore_job_candidates_task
+            try:
+                rescore_job_candidates_task.delay(job.id)
+            except Exception as e:
+                logger.error(f"Failed to enqueue re-scoring for job {job.id}: {e}")
+
+    @action(detail=True, methods=['post'])
+    def rescore(self, request, pk=None):
+        """Queue a re-score of all candidates for this job; pass semantic=true to use Gemini."""
+        job = self.get_object()
+        semantic = str(request.data.get('semantic', '')).lower() in ('1', 'true', 'yes')
+
+        from .tasks import rescore_job_candidates_task
+        try:
+            task = rescore_job_candidates_task.delay(job.id, semantic=semantic)
+        except Exception as e:
+            return Response({'error': f"Failed to enqueue re-scoring: {str(e)}"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        return _task_accepted(request, task, 'Candidate re-scoring queued.')
+
+    @action(detail=True, methods=['get'])
+    def funnel(self, request, pk=None):
+        """Pipeline funnel for one job: per-status counts, conversion and time in stage."""
+        job = self.get_object()
+        return Response({'job': job.id, 'stages': job_funnels(JobPosting.objects.filter(pk=job.pk))[job.id]})
+
+    @action(detail=False, methods=['get'])
+    def funnels(self, request):
+        """Pipeline funnels for every job visible in the list (honours ?status=)."""
+        funnels = job_funnels(self.get_queryset())
+        return Response([{'job': job_id, 'stages': stages} for job_id, stages in funnels.items()])
+
 
 class AISettingsView(generics.RetrieveUpdateAPIView):
     """Admin/HR management of AI Resume Parsing Settings. 
@@ -92,32 +161,65 @@ class AISettingsView(generics.RetrieveUpdateAPIView):
         tenant = resolve_tenant(self.request)
         return AISettings.get_settings(tenant)
 
-    @action(detail=False, methods=['post'])
-    def test_connection(self, request):
-        """Verify the provided Gemini API key actually works."""
+
+
+class AIQueueStatusView(APIView):
+    """How much of the tenant's AI work is waiting on the rate limiter."""
+    permission_classes = [IsAdminOrHRManager]
+
+    def get(self, request):
+        from django.conf import settings
+        from .ratelimit import get_ai_queue_depth
+
+        tenant = resolve_tenant(request)
+        return Response({
+            'queued': get_ai_queue_depth(getattr(tenant, 'id', None)),
+            'rate_limit_per_minute': settings.AI_RATE_LIMIT_PER_MINUTE,
+            'burst': settings.AI_RATE_LIMIT_BURST,
+        })
+
+
+class AISettingsTestConnectionView(APIView):
+    """Queue a Gemini API key check; poll the returned status_url for the verdict."""
+    permission_classes = [IsAdminOrHRManager]
+
+    def post(self, request):
+        # Without a key in the request the tenant's saved key is tested
         api_key = request.data.get('gemini_api_key')
-        if not api_key:
+        tenant = resolve_tenant(request)
+        if not api_key and not AISettings.get_settings(tenant).gemini_api_key:
             return Response({'error': 'API Key is required for testing.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Simple reachability test using a dummy prompt
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={api_key}"
-        payload = {
-            "contents": [{"parts": [{"text": "Hello, respond with 'OK' if you can read this."}]}]
-        }
-        
+        from .tasks import stash_connection_test_key, test_gemini_connection_task
         try:
-            import requests
-            response = requests.post(url, json=payload, timeout=10)
-            if response.ok:
-                return Response({'success': True, 'message': 'API Key verified successfully!'})
-            else:
-                return Response({
-                    'success': False, 
-                    'error': f"API rejected the request: {response.status_code}",
-                    'details': response.text
-                }, status=status.HTTP_400_BAD_REQUEST)
+            # Queue a reference, not the key: task arguments are persisted by the broker
+            key_ref = stash_connection_test_key(api_key) if api_key else None
+            task = test_gemini_connection_task.delay(getattr(tenant, 'id', None), key_ref)
         except Exception as e:
-            return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return Response({'error': f"Failed to enqueue connection test: {str(e)}"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        return _task_accepted(request, task, 'Connection test queued.')
+
+
+class AITaskStatusView(APIView):
+    """Status of a queued AI task (resume parsing, connection tests) queued by the caller's tenant."""
+    permission_classes = [IsAdminOrHRManager]
+
+    def get(self, request, task_id):
+        from celery.result import AsyncResult
+
+        owner = cache.get(AI_TASK_OWNER_KEY.format(task_id))
+        tenant = resolve_tenant(request)
+        if owner is None or owner['tenant_id'] != getattr(tenant, 'id', None):
+            return Response({'error': 'Task not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        result = AsyncResult(task_id)
+        data = {'task_id': task_id, 'state': result.state, 'ready': result.ready()}
+        if result.successful():
+            data['result'] = result.result
+        elif result.failed():
+            data['error'] = str(result.result)
+        return Response(data)
 
 
 class CandidateViewSet(viewsets.ModelViewSet):
@@ -127,7 +229,7 @@ class CandidateViewSet(viewsets.ModelViewSet):
     feature_key = 'ai_resumes'
     
     def get_serializer_class(self):
-        if self.action == 'list':
+        if self.action in ['list', 'search']:
             return CandidateListSerializer
         if self.action in ['update_status', 'partial_update']:
             return CandidateStatusUpdateSerializer
@@ -156,6 +258,22 @@ class CandidateViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         serializer.save(tenant=resolve_tenant(self.request))
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Full-text search over candidate name, email and parsed resume content
+        (skills, companies, schools). ?q=<terms>; results are ranked best-first.
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': 'Query parameter q is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = search_candidates(self.get_queryset(), query)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(queryset, many=True).data)
     
     @action(detail=True, methods=['patch'])
     def update_status(self, request, pk=None):
@@ -250,43 +368,56 @@ class CandidateViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['post'])
     def parse_resume(self, request, pk=None):
-        """Manually trigger resume parsing"""
+        """
+        Queue resume parsing and fit-score analysis for this candidate.
+        Returns 202 immediately; Gemini latency never holds an HTTP worker.
+        """
         candidate = self.get_object()
         if not candidate.resume:
             return Response({'error': 'No resume file uploaded'}, status=status.HTTP_400_BAD_REQUEST)
-            
+
+        from .tasks import process_resume_parsing_task
         try:
-             parsed_data = parse_resume(candidate.resume, tenant=candidate.tenant)
-             candidate.parsed_resume_data = parsed_data
-             increment_feature_usage(self.request, self.feature_key)
-             
-             # Calculate Fit Score
-             analysis_results = analyze_candidate(candidate, candidate.job)
-             candidate.ai_fit_score = analysis_results['ai_fit_score']
-             candidate.ai_analysis = analysis_results['ai_analysis']
-             candidate.ai_skill_match = analysis_results['ai_skill_match']
-             candidate.save()
-             return Response(CandidateSerializer(candidate).data)
+            task = process_resume_parsing_task.delay(candidate_id=candidate.id)
         except Exception as e:
-             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return Response({'error': f"Failed to enqueue parsing: {str(e)}"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        increment_feature_usage(self.request, self.feature_key)
+        return _task_accepted(request, task, 'Resume parsing queued.')
 
 
 # ============================================
 # APPLICANT VIEWS - Limited access
 # ============================================
 
+# Browsers and CDNs may reuse the public job board this long before revalidating
+PUBLIC_JOBS_MAX_AGE = 60
+
+
 class PublicJobListView(generics.ListAPIView):
     """Public job listings - anyone can view open jobs"""
+    queryset = JobPosting.objects.none()  # Schema generation only; list() reads the cached feed
     serializer_class = JobPostingPublicSerializer
     permission_classes = [AllowAny]
     pagination_class = None
 
-    def get_queryset(self):
-        queryset = JobPosting.objects.filter(status='OPEN', is_active=True)
-        tenant_slug = self.request.query_params.get('tenant')
-        if tenant_slug:
-            queryset = queryset.filter(tenant__slug=tenant_slug)
-        return queryset
+    def list(self, request, *args, **kwargs):
+        """
+        Served from the cached feed, which also owns the query and the tenant slug
+        check; conditional requests get 304 without touching the DB.
+        """
+        feed = get_public_job_feed(request.query_params.get('tenant'))
+        if feed is None:
+            return Response({'error': 'Company not found.'}, status=status.HTTP_404_NOT_FOUND)
+        etag = quote_etag(feed['etag'])
+        last_modified = int(feed['last_modified'].timestamp())
+
+        not_modified = get_conditional_response(request._request, etag=etag, last_modified=last_modified)
+        response = not_modified or Response(feed['jobs'])
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, public=True, max_age=PUBLIC_JOBS_MAX_AGE)
+        return response
 
 
 class PublicApplicationViewSet(generics.CreateAPIView):
@@ -306,11 +437,12 @@ class PublicApplicationViewSet(generics.CreateAPIView):
             return Response({'error': 'Job not found.'}, status=status.HTTP_404_NOT_FOUND)
 
         email = request.data.get('email', '').strip().lower()  # normalise – prevents case-duplicate bypass
-        if Candidate.objects.filter(email__iexact=email, job_id=job_id).exists():
-            return Response(
-                {'error': 'An application with this email already exists for this position.'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        duplicate = Response(
+            {'error': 'An application with this email already exists for this position.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+        if Candidate.objects.filter(email_normalized=email, job_id=job_id).exists():
+            return duplicate
         
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -320,8 +452,13 @@ class PublicApplicationViewSet(generics.CreateAPIView):
         if resume_file:
             _validate_resume_file(resume_file)
 
-        # Link candidate to the job's tenant
-        candidate = serializer.save(tenant=job.tenant, status='APPLIED')
+        # Link candidate to the job's tenant. The unique (job, email_normalized)
+        # constraint rejects a concurrent double-submit that passed the check above.
+        try:
+            with transaction.atomic():
+                candidate = serializer.save(tenant=job.tenant, status='APPLIED')
+        except IntegrityError:
+            return duplicate
         
         if candidate.resume:
              try:
@@ -338,6 +475,15 @@ class PublicApplicationViewSet(generics.CreateAPIView):
         )
 
 
+def _applicant_applications(user):
+    # Legacy duplicate applications have no email_normalized (see migration 0012) and match case-insensitively
+    return Candidate.objects.filter(
+        Q(user=user)
+        | Q(email_normalized=user.email.strip().lower())
+        | Q(email_normalized__isnull=True, email__iexact=user.email.strip())
+    ).select_related('job', 'tenant').distinct()
+
+
 class ApplicantApplicationListView(generics.ListAPIView):
     """Applicant's own applications - read only"""
     serializer_class = ApplicantCandidateSerializer
@@ -345,10 +491,7 @@ class ApplicantApplicationListView(generics.ListAPIView):
     pagination_class = None
     
     def get_queryset(self):
-        user = self.request.user
-        return Candidate.objects.filter(
-            Q(user=user) | Q(email__iexact=user.email)
-        ).select_related('job', 'tenant').distinct()
+        return _applicant_applications(self.request.user)
 
 
 class ApplicantApplicationDetailView(generics.RetrieveAPIView):
@@ -357,10 +500,7 @@ class ApplicantApplicationDetailView(generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated, IsApplicant, IsApplicantOwner]
     
     def get_queryset(self):
-        user = self.request.user
-        return Candidate.objects.filter(
-            Q(user=user) | Q(email__iexact=user.email)
-        ).select_related('job', 'tenant').distinct()
+        return _applicant_applications(self.request.user)
 
 
 class ApplicantApplyView(generics.CreateAPIView):
@@ -394,7 +534,15 @@ class ApplicantApplyView(generics.CreateAPIView):
         if resume_file:
             _validate_resume_file(resume_file)
 
-        candidate = serializer.save(tenant=job.tenant)
+        try:
+            with transaction.atomic():
+                candidate = serializer.save(tenant=job.tenant)
+        except IntegrityError:
+            # Same email already applied to this job (e.g. through the public form)
+            return Response(
+                {'error': 'You have already applied for this position.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         # Trigger AI resume parsing (Background)
         if candidate.resume:
@@ -1,6 +1,8 @@
 from django.conf import settings
 from django.http import JsonResponse
 
+from apps.core.tenancy import tenant_for_user
+
 
 class IPWhitelistMiddleware:
     def __init__(self, get_response):
@@ -30,7 +32,7 @@ class TenantContextMiddleware:
         tenant = None
         user = getattr(request, 'user', None)
         if user and user.is_authenticated:
-            tenant = getattr(user, 'tenant', None)
+            tenant = tenant_for_user(user)
             
             # If tenant is suspended, block all non-superuser access
             if tenant and not tenant.is_active and not user.is_superuser:
@@ -17,6 +17,7 @@ def _patched_from_db(self, value, expression, connection):
     return _original_from_db(self, value, expression, connection)
 _JSONField.from_db_value = _patched_from_db
 
+from celery.schedules import crontab
 from decouple import config
 
 BASE_DIR = Path(__file__).resolve().parents[2]
@@ -202,6 +203,71 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://redis:6379/0')
 CELERY_RESULT_BACKEND = config('CELERY_RESULT_BACKEND', default='redis://redis:6379/1')
 CELERY_TASK_ALWAYS_EAGER = config('CELERY_TASK_ALWAYS_EAGER', cast=bool, default=False)
+CELERY_BEAT_SCHEDULE = {
+    'reconcile-employee-counts': {
+        'task': 'apps.core.tasks.reconcile_employee_counts',
+        'schedule': crontab(hour=2, minute=0),
+    },
+    'refresh-host-stats': {
+        'task': 'apps.core.tasks.refresh_host_stats',
+        'schedule': crontab(minute='*/5'),
+    },
+    'dispatch-email-outbox': {
+        'task': 'apps.core.tasks.dispatch_email_outbox',
+        'schedule': crontab(minute='*'),
+    },
+    'check-document-expiry': {
+        'task': 'apps.employees.tasks.check_document_expiry',
+        'schedule': crontab(hour=7, minute=0),
+    },
+    'reconcile-funnel-counts': {
+        'task': 'apps.recruitment.tasks.reconcile_funnel_counts_task',
+        'schedule': crontab(hour=2, minute=30),
+    },
+    'rollover-leave-balances': {
+        'task': 'apps.leaves.tasks.rollover_leave_balances_task',
+        'schedule': crontab(month_of_year=1, day_of_month=1, hour=0, minute=30),
+    },
+}
+
+# Shared cache (Redis in deployed environments, in-process memory otherwise)
+REDIS_CACHE_URL = config('REDIS_CACHE_URL', default='')
+if REDIS_CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': REDIS_CACHE_URL,
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+                'IGNORE_EXCEPTIONS': True,  # A cache outage degrades to DB reads, never 500s
+            },
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'ems-default',
+        }
+    }
+
+TENANT_CACHE_TIMEOUT = config('TENANT_CACHE_TIMEOUT', cast=int, default=60)  # seconds
+
+# Concurrent Gemini requests allowed when bulk re-scoring a job's candidates
+AI_RESCORE_MAX_WORKERS = config('AI_RESCORE_MAX_WORKERS', cast=int, default=4)
+
+# Shared Gemini HTTP client (apps.recruitment.ai_client)
+GEMINI_API_BASE_URL = config('GEMINI_API_BASE_URL', default='https://generativelanguage.googleapis.com/v1beta')
+AI_HTTP_CONNECT_TIMEOUT = config('AI_HTTP_CONNECT_TIMEOUT', cast=float, default=5)  # seconds
+AI_HTTP_READ_TIMEOUT = config('AI_HTTP_READ_TIMEOUT', cast=float, default=60)  # seconds
+AI_HTTP_MAX_RETRIES = config('AI_HTTP_MAX_RETRIES', cast=int, default=2)
+AI_HTTP_BACKOFF_BASE = config('AI_HTTP_BACKOFF_BASE', cast=float, default=0.5)  # seconds, doubled per retry
+AI_CIRCUIT_FAILURE_THRESHOLD = config('AI_CIRCUIT_FAILURE_THRESHOLD', cast=int, default=5)
+AI_CIRCUIT_RESET_SECONDS = config('AI_CIRCUIT_RESET_SECONDS', cast=float, default=30)
+
+# Token bucket per Gemini API key, shared across workers via REDIS_CACHE_URL
+AI_RATE_LIMIT_PER_MINUTE = config('AI_RATE_LIMIT_PER_MINUTE', cast=int, default=30)
+AI_RATE_LIMIT_BURST = config('AI_RATE_LIMIT_BURST', cast=int, default=10)
 
 CORS_ALLOW_ALL_ORIGINS = config('CORS_ALLOW_ALL_ORIGINS', cast=bool, default=False)
 CORS_ALLOWED_ORIGINS = [o.strip() for o in config('CORS_ALLOWED_ORIGINS', default='http://localhost:5173,http://localhost:3000').split(',') if o.strip()]
@@ -222,3 +288,10 @@ EMAIL_USE_TLS = False
 EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default=EMAIL_HOST_USER)
+
+# Email outbox dispatcher: emails per SMTP connection, delivery attempts, claim lease (seconds)
+# and how long sent or failed rows are kept
+EMAIL_OUTBOX_BATCH_SIZE = config('EMAIL_OUTBOX_BATCH_SIZE', cast=int, default=100)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', cast=int, default=5)
+EMAIL_OUTBOX_LEASE_SECONDS = config('EMAIL_OUTBOX_LEASE_SECONDS', cast=int, default=300)
+EMAIL_OUTBOX_RETENTION_DAYS = config('EMAIL_OUTBOX_RETENTION_DAYS', cast=int, default=7)
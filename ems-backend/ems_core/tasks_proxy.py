@@ -5,3 +5,9 @@ def send_email_task_proxy(*args, **kwargs):
     """
     from apps.core.tasks import send_email_task
     return send_email_task.delay(*args, **kwargs)
+
+
+def dispatch_email_outbox_proxy():
+    """Circular-import safe proxy to wake the outbox dispatcher."""
+    from apps.core.tasks import dispatch_email_outbox
+    return dispatch_email_outbox.delay()
@@ -1,29 +1,103 @@
 import logging
-from .tasks_proxy import send_email_task_proxy
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+from .tasks_proxy import dispatch_email_outbox_proxy
 
 logger = logging.getLogger(__name__)
 
-def send_email_in_background(subject, message, recipient_list, html_message=None):
+# Many emails queued in a burst (e.g. a bulk import) wake the dispatcher once
+OUTBOX_KICK_KEY = 'core:outbox:kick'
+OUTBOX_KICK_DEBOUNCE = 5
+
+
+def send_email_in_background(subject, message, recipient_list, html_message=None, tenant=None, dedupe_key=None):
     """
     Utility function to instantly return an HTTP response to the user while
-    dispatching an email (or bulk emails) via Celery background workers.
-    
-    This replaces the older threading-based implementation with a robust 
-    distributed task queue.
+    the email is delivered by a background worker.
+
+    The email is written to the outbox in the caller's transaction, so it is
+    only sent if that transaction commits, and a repeated ``dedupe_key`` is
+    queued once. Delivery happens in batches over a single SMTP connection
+    (see apps.core.tasks.dispatch_email_outbox).
     """
     if not recipient_list:
         return
-        
-    try:
-        # We use a proxy to avoid circular imports if any apps import from ems_core
-        send_email_task_proxy(
-            subject=subject,
-            message=message,
-            recipient_list=recipient_list,
-            html_message=html_message
+    queue_emails([{
+        'subject': subject,
+        'message': message,
+        'recipient_list': recipient_list,
+        'html_message': html_message,
+        'tenant': tenant,
+        'dedupe_key': dedupe_key,
+    }])
+
+
+def queue_emails(emails):
+    """
+    Write many emails to the outbox. Each item is a dict of
+    send_email_in_background's arguments; ``tenant`` may be a Tenant or its id.
+
+    Keys already in the outbox are filtered out up front and the rest are
+    inserted in one statement. If a concurrent writer queued one of the same keys
+    meanwhile, the rows are inserted one at a time and that key is skipped.
+    (bulk_create's ignore_conflicts is avoided: Oracle does not support it.)
+    """
+    # We import lazily to avoid circular imports if any apps import from ems_core
+    from apps.core.models import EmailOutbox
+
+    rows = [
+        EmailOutbox(
+            tenant_id=getattr(email.get('tenant'), 'pk', email.get('tenant')),
+            subject=email['subject'][:255],
+            body=email['message'],
+            html_body=email.get('html_message') or '',
+            recipients=list(email['recipient_list']),
+            dedupe_key=email.get('dedupe_key'),
         )
-        logger.info(f"Enqueued background email task: '{subject}'")
+        for email in emails
+        if email.get('recipient_list')
+    ]
+    keys = {row.dedupe_key for row in rows if row.dedupe_key}
+    if keys:
+        seen = set(EmailOutbox.objects.filter(dedupe_key__in=keys).values_list('dedupe_key', flat=True))
+        unique_rows = []
+        for row in rows:
+            if row.dedupe_key:
+                if row.dedupe_key in seen:
+                    continue
+                seen.add(row.dedupe_key)
+            unique_rows.append(row)
+        rows = unique_rows
+    if not rows:
+        return
+
+    try:
+        with transaction.atomic():
+            EmailOutbox.objects.bulk_create(rows)
+    except IntegrityError:
+        queued = []
+        for row in rows:
+            row.pk = None
+            try:
+                with transaction.atomic():
+                    row.save(force_insert=True)
+            except IntegrityError:
+                continue
+            queued.append(row)
+        rows = queued
+        if not rows:
+            return
+    logger.info(f"Queued {len(rows)} outbox email(s): '{rows[0].subject}'")
+    transaction.on_commit(kick_outbox_dispatcher)
+
+
+def kick_outbox_dispatcher():
+    if not cache.add(OUTBOX_KICK_KEY, 1, OUTBOX_KICK_DEBOUNCE):
+        return
+    try:
+        dispatch_email_outbox_proxy()
     except Exception as e:
-        # Fallback to standard logging if Celery is down; 
-        # normally delay() doesn't fail unless broker is unreachable.
-        logger.error(f"Failed to enqueue background email task '{subject}': {str(e)}")
+        # The periodic dispatcher picks the emails up once the broker is back
+        logger.error(f"Failed to enqueue outbox dispatch: {str(e)}")
@@ -0,0 +1,65 @@
+"""
+Microbenchmark: compiled SkillMatcher vs the old nested substring scan.
+
+    python scripts/benchmark_skill_matching.py [--candidates 2000] [--job-skills 40] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apps.recruitment.skills import SkillMatcher  # noqa: E402
+
+VOCABULARY = [
+    'Python', 'Django', 'Django REST Framework', 'Flask', 'FastAPI', 'JavaScript', 'TypeScript',
+    'React', 'Vue', 'Angular', 'Node.js', 'PostgreSQL', 'MySQL', 'Redis', 'Celery', 'Docker',
+    'Kubernetes', 'AWS', 'GCP', 'Terraform', 'Go', 'Rust', 'Java', 'Spring Boot', 'C#', '.NET',
+    'Machine Learning', 'Pandas', 'NumPy', 'SQL', 'GraphQL', 'REST APIs', 'CI/CD', 'Git', 'Linux',
+    'Kafka', 'RabbitMQ', 'Elasticsearch', 'Excel', 'Tableau', 'Power BI', 'Scrum', 'Jira',
+]
+
+
+def legacy_match_count(candidate_skills, job_skills):
+    job_skills_lower = [s.lower() for s in job_skills]
+    cand_skills_lower = [s.lower() for s in candidate_skills]
+    return len([s for s in job_skills_lower if any(cs in s or s in cs for cs in cand_skills_lower)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--candidates', type=int, default=2000)
+    parser.add_argument('--job-skills', type=int, default=40)
+    parser.add_argument('--candidate-skills', type=int, default=25)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    job_skills = rng.sample(VOCABULARY, min(args.job_skills, len(VOCABULARY)))
+    candidates = [
+        rng.sample(VOCABULARY, min(args.candidate_skills, len(VOCABULARY)))
+        for _ in range(args.candidates)
+    ]
+
+    def legacy():
+        for skills in candidates:
+            legacy_match_count(skills, job_skills)
+
+    def compiled():
+        matcher = SkillMatcher(job_skills)
+        for skills in candidates:
+            matcher.match(skills)
+
+    legacy_time = min(timeit.repeat(legacy, number=1, repeat=args.repeat))
+    compiled_time = min(timeit.repeat(compiled, number=1, repeat=args.repeat))
+
+    print(f"{args.candidates} candidates x {len(job_skills)} job skills x {args.candidate_skills} candidate skills")
+    print(f"legacy nested scan : {legacy_time * 1000:8.2f} ms")
+    print(f"compiled matcher   : {compiled_time * 1000:8.2f} ms")
+    print(f"speedup            : {legacy_time / compiled_time:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
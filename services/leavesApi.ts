@@ -154,6 +154,39 @@ export const leavesApi = {
         return transformLeaveRequest(response);
     },
 
+    // Approve or reject many pending requests in one call
+    bulkDecide: async (ids: string[], status: 'APPROVED' | 'REJECTED'): Promise<{
+        status: string;
+        updated: number[];
+        skipped: number[];
+        insufficient_balance: number[];
+    }> => {
+        return await api.post('/leaves/requests/bulk_decide/', { ids: ids.map(Number), status });
+    },
+
+    // Who is off in a date window: one character per day per employee
+    // (A approved, P pending, . available, - weekend/holiday)
+    getTeamCalendar: async (start: string, end: string, departmentId?: string): Promise<{
+        start: string;
+        end: string;
+        dates: string[];
+        headcount: number;
+        available: (number | null)[];
+        employees: {
+            employee_id: number;
+            employee_name: string;
+            department: string | null;
+            days: string;
+            requests: { id: number; leave_type: string; start_date: string; end_date: string; status: string }[];
+        }[];
+    }> => {
+        let endpoint = `/leaves/requests/calendar/?start=${start}&end=${end}`;
+        if (departmentId) {
+            endpoint += `&department=${departmentId}`;
+        }
+        return await api.get(endpoint);
+    },
+
     // Delete leave request (only if pending)
     deleteRequest: async (id: string): Promise<void> => {
         await api.delete(`/leaves/requests/${id}/`);
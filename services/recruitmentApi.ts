@@ -46,6 +46,38 @@ interface PaginatedResponse<T> {
     results: T[];
 }
 
+// Long-running AI work (resume parsing, key checks) is queued server-side
+interface QueuedTask {
+    detail: string;
+    task_id: string;
+    status_url: string;
+}
+
+interface TaskStatus<T> {
+    task_id: string;
+    state: string;
+    ready: boolean;
+    result?: T;
+    error?: string;
+}
+
+const TASK_POLL_INTERVAL_MS = 1500;
+const TASK_POLL_ATTEMPTS = 80;
+
+const waitForTask = async <T>(taskId: string): Promise<T> => {
+    for (let attempt = 0; attempt < TASK_POLL_ATTEMPTS; attempt++) {
+        const status = await api.get<TaskStatus<T>>(`/recruitment/tasks/${taskId}/`);
+        if (status.ready) {
+            if (status.state !== 'SUCCESS') {
+                throw new Error(status.error || 'Background task failed');
+            }
+            return status.result as T;
+        }
+        await new Promise(resolve => setTimeout(resolve, TASK_POLL_INTERVAL_MS));
+    }
+    throw new Error('Timed out waiting for background task');
+};
+
 // Transform job posting to frontend format
 const transformJobPosting = (job: BackendJobPosting): JobRequirement => ({
     id: String(job.id),
@@ -140,6 +172,20 @@ export const recruitmentApi = {
         await api.delete(`/recruitment/jobs/${id}/`);
     },
 
+    // Pipeline funnel: per-status counts, conversion from application and time in stage
+    getJobFunnel: async (id: string): Promise<{
+        job: number;
+        stages: {
+            status: string;
+            current: number;
+            entered: number;
+            conversion_rate: number;
+            avg_days_in_stage: number | null;
+        }[];
+    }> => {
+        return await api.get(`/recruitment/jobs/${id}/funnel/`);
+    },
+
     // ==================== CANDIDATES ====================
 
     listCandidates: async (jobId?: string): Promise<Candidate[]> => {
@@ -152,6 +198,15 @@ export const recruitmentApi = {
         return results.map(transformCandidate);
     },
 
+    // Ranked full-text search over names, emails and parsed resume content
+    searchCandidates: async (query: string): Promise<Candidate[]> => {
+        const response = await api.get<PaginatedResponse<BackendCandidate> | BackendCandidate[]>(
+            `/recruitment/candidates/search/?q=${encodeURIComponent(query)}`
+        );
+        const results = Array.isArray(response) ? response : response.results;
+        return results.map(transformCandidate);
+    },
+
     getCandidate: async (id: string): Promise<Candidate> => {
         const response = await api.get<BackendCandidate>(`/recruitment/candidates/${id}/`);
         return transformCandidate(response);
@@ -166,8 +221,9 @@ export const recruitmentApi = {
     },
 
     parseResume: async (id: string): Promise<Candidate> => {
-        const response = await api.post<BackendCandidate>(`/recruitment/candidates/${id}/parse_resume/`, {});
-        return transformCandidate(response);
+        const queued = await api.post<QueuedTask>(`/recruitment/candidates/${id}/parse_resume/`, {});
+        await waitForTask(queued.task_id);
+        return recruitmentApi.getCandidate(id);
     },
 
     // Admin manual add (rare, usually via apply)
@@ -212,7 +268,8 @@ export const recruitmentApi = {
     },
 
     testAIConnection: async (apiKey: string): Promise<any> => {
-        return await api.post('/recruitment/ai-settings/test_connection/', { gemini_api_key: apiKey });
+        const queued = await api.post<QueuedTask>('/recruitment/ai-settings/test_connection/', { gemini_api_key: apiKey });
+        return waitForTask(queued.task_id);
     },
 };
 